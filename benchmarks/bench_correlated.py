@@ -0,0 +1,75 @@
+"""Throughput and accuracy of the Gaussian-copula correlated sampler.
+
+Run with ``python benchmarks/bench_correlated.py``.  The first table compares
+``np.random.multivariate_normal`` (which factorizes the covariance on every
+call) with ``CorrelatedSampler`` and its cached factor for repeated small
+batches, as the Pareto tool generates them.  The second samples large
+batches in up to 64 dimensions with mixed marginals and reports rows per
+second, the largest error in the rank correlation of the normal scores and
+the largest relative error of the marginal means.
+"""
+import time
+
+import numpy as np
+
+from cven_app.engine import correlated
+from cven_app.engine.special import ndtri
+
+MARGINALS = [('lognormal', 0, 0.5), ('triangular', 1, 2, 5), ('beta', 2, 5, 10, 20), ('normal', 3, 2)]
+MEANS = [np.exp(0.125), 8 / 3, 10 + 10 * 2 / 7, 3]
+
+
+def random_correlation(d, rng):
+    a = rng.normal(size=(d, 2 * d))
+    cov = a @ a.T
+    scale = np.sqrt(np.diag(cov))
+    return cov / np.outer(scale, scale)
+
+
+def normal_scores(x):
+    # Rank-based normal scores, which do not depend on the marginals
+    ranks = np.argsort(np.argsort(x, axis=0), axis=0)
+    return ndtri((ranks + 0.5) / len(x))
+
+
+def repeated_batches(d=10, batch=200, calls=2000, seed=5):
+    rng = np.random.default_rng(seed)
+    corr = random_correlation(d, rng)
+    print(f'{calls} batches of {batch} rows in {d} dimensions')
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        rng.multivariate_normal(np.zeros(d), corr, batch)
+    legacy = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        correlated.CorrelatedSampler([('normal', 0, 1)] * d, corr).sample(batch, rng)
+    cached = time.perf_counter() - t0
+    print(f'  multivariate_normal {legacy * 1e6 / calls:8.1f} us/batch | cached sampler {cached * 1e6 / calls:8.1f} us/batch '
+          f'| {legacy / cached:5.1f}x')
+
+
+def large_batches(n=1_000_000, seed=5):
+    rng = np.random.default_rng(seed)
+    print(f'Batches of {n:,} rows with lognormal / triangular / beta / normal marginals')
+    for d in (4, 16, 32, 64):
+        corr = random_correlation(d, rng)
+        marginals = [MARGINALS[j % len(MARGINALS)] for j in range(d)]
+        sampler = correlated.CorrelatedSampler(marginals, corr)
+        t0 = time.perf_counter()
+        x = sampler.sample(n, rng)
+        elapsed = time.perf_counter() - t0
+        sub = x[:100_000]
+        corr_err = np.abs(np.corrcoef(normal_scores(sub).T) - corr).max()
+        means = np.array([MEANS[j % len(MEANS)] for j in range(d)])
+        mean_err = np.abs(x.mean(axis=0) / means - 1).max()
+        print(f'  d={d:>3} | {elapsed:6.2f}s ({n / elapsed:11,.0f} rows/s) | max corr err {corr_err:.4f} | '
+              f'max mean rel err {mean_err:.1e}')
+
+
+def main():
+    repeated_batches()
+    large_batches()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Throughput of the critical path method engine on large schedules.
+
+Run with ``python benchmarks/bench_cpm.py``.  Schedules are random
+activity networks: each activity follows 1-4 activities among the few
+hundred before it, and the activities are then shuffled so the engine has
+to find the order itself.  The first table times building the network
+(indexes and topological sort) and the CPM passes up to 10^6 activities,
+and checks ES, LF and free float against a plain-Python reference (a
+dictionary-based Kahn sort and passes) up to 10^5.  The second compares
+the engine with the original tab's method, which rescans the whole edge
+list for every activity, on small schedules.  The last runs the shapes
+that are hardest for level-by-level passes (one long chain, one wide
+level) and times finding a cycle.
+"""
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+
+from cven_app.engine import schedule
+
+
+def random_schedule(n, window=300, seed=0):
+    # Activity j follows 1-4 of the `window` activities before it; labels shuffled
+    rng = np.random.default_rng(seed)
+    count = rng.integers(1, 5, n)
+    count[0] = 0
+    succ = np.repeat(np.arange(n), count)
+    pred = np.maximum(succ - rng.integers(1, window + 1, len(succ)), 0)
+    edges = np.unique(np.c_[pred, succ], axis=0)
+    label = rng.permutation(n)
+    return rng.uniform(1, 20, n)[np.argsort(label)], label[edges]
+
+
+def reference(n, durations, edges):
+    # Plain-Python CPM: adjacency dictionaries, Kahn's queue, then the two passes
+    succ, pred = defaultdict(list), defaultdict(list)
+    indegree = [0] * n
+    for a, b in edges:
+        succ[a].append(b)
+        pred[b].append(a)
+        indegree[b] += 1
+    queue = deque(j for j in range(n) if indegree[j] == 0)
+    order = []
+    while queue:
+        j = queue.popleft()
+        order.append(j)
+        for k in succ[j]:
+            indegree[k] -= 1
+            if indegree[k] == 0:
+                queue.append(k)
+    d = durations.tolist()
+    es = [0.0] * n
+    for j in order:
+        es[j] = max((es[i] + d[i] for i in pred[j]), default=0.0)
+    finish = max(es[j] + d[j] for j in range(n))
+    lf = [finish] * n
+    for j in reversed(order):
+        lf[j] = min((lf[k] - d[k] for k in succ[j]), default=finish)
+    free = [min((es[k] for k in succ[j]), default=finish) - es[j] - d[j] for j in range(n)]
+    return np.array(es), np.array(lf), np.array(free)
+
+
+def rescan(n, durations, edges, order):
+    # The original tab's method: every activity scans the full edge list for its predecessors
+    links = [{'source': int(a), 'target': int(b)} for a, b in edges]
+    es = {j: 0.0 for j in range(n)}
+    for j in order:
+        incoming = [link for link in links if link['target'] == j]
+        if incoming:
+            es[j] = max(es[link['source']] + durations[link['source']] for link in incoming)
+    return es
+
+
+def throughput():
+    print('Random schedules')
+    for n in (10_000, 100_000, 1_000_000):
+        durations, edges = random_schedule(n)
+        t0 = time.perf_counter()
+        network = schedule.Network(durations, edges)
+        t1 = time.perf_counter()
+        result = network.cpm()
+        t2 = time.perf_counter()
+        line = (f'  {n:>9,} activities {len(edges):>9,} edges {len(network.level_ptr) - 1:>6,} levels '
+                f'| build {t1 - t0:6.3f} s | CPM {t2 - t1:6.3f} s ({n / (t2 - t1) / 1e6:5.2f} M activities/s) '
+                f'| {result.critical.sum():,} critical')
+        if n <= 100_000:
+            t3 = time.perf_counter()
+            es, lf, free = reference(n, durations, edges)
+            t4 = time.perf_counter()
+            error = max(np.abs(result.es - es).max(), np.abs(result.lf - lf).max(),
+                        np.abs(result.free_float - free).max())
+            line += f' | reference {t4 - t3:6.3f} s, max difference {error:.0e}'
+        print(line)
+
+
+def against_rescan():
+    print('Against rescanning the edge list per activity (forward pass only)')
+    for n in (500, 1000, 2000, 4000):
+        durations, edges = random_schedule(n)
+        network = schedule.Network(durations, edges)
+        t0 = time.perf_counter()
+        es = rescan(n, durations, edges, network.order)
+        t1 = time.perf_counter()
+        result = schedule.Network(durations, edges).cpm()
+        t2 = time.perf_counter()
+        assert np.allclose([es[j] for j in range(n)], result.es)
+        print(f'  {n:>5} activities | rescan {t1 - t0:7.3f} s | engine (build + CPM) {(t2 - t1) * 1e3:6.2f} ms '
+              f'| {(t1 - t0) / (t2 - t1):7.0f}x')
+
+
+def shapes(n=100_000):
+    print(f'Extreme shapes, {n:,} activities')
+    chain = np.c_[np.arange(n - 1), np.arange(1, n)]
+    middle = np.arange(1, n - 1)
+    wide = np.r_[np.c_[np.zeros(n - 2, dtype=int), middle], np.c_[middle, np.full(n - 2, n - 1)]]
+    for name, edges in (('serial chain', chain), ('one wide level', wide)):
+        t0 = time.perf_counter()
+        network = schedule.Network(np.ones(n), edges)
+        t1 = time.perf_counter()
+        result = network.cpm()
+        t2 = time.perf_counter()
+        print(f'  {name:15} {len(network.level_ptr) - 1:>7,} levels | build {t1 - t0:6.3f} s '
+              f'| CPM {t2 - t1:6.3f} s | duration {result.duration:,.0f}')
+    durations, edges = random_schedule(n)
+    order = schedule.Network(durations, edges).order
+    edges = np.r_[edges, [(order[-1], order[0])]]
+    t0 = time.perf_counter()
+    try:
+        schedule.Network(durations, edges)
+    except ValueError as e:
+        message = str(e)
+    print(f'  cycle found in {time.perf_counter() - t0:.3f} s: {message[:90]}...')
+
+
+def main():
+    throughput()
+    against_rescan()
+    shapes()
+
+
+if __name__ == '__main__':
+    main()
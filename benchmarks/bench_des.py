@@ -0,0 +1,71 @@
+"""Event throughput and accuracy of the discrete-event simulation kernel.
+
+Run with ``python benchmarks/bench_des.py [max_events]`` (``max_events``
+defaults to 10^7).  The throughput run simulates an M/M/3 queue for longer
+and longer horizons and reports events per second.  The accuracy check
+compares the mean wait in queue from kernel replications and from the
+vectorized ``queue_replications`` with the exact M/M/c (Erlang C) value.
+"""
+import math
+import sys
+import time
+
+import numpy as np
+
+from cven_app.engine import des
+
+# Arrival rate 2.7/min, service rate 1/min per server: 90% utilization on 3 servers
+RATE, SERVICE_RATE, SERVERS = 2.7, 1.0, 3
+ARRIVAL = ('exponential', 1 / RATE)
+SERVICE = ('exponential', 1 / SERVICE_RATE)
+
+
+def erlang_c_wait(rate, service_rate, servers):
+    a = rate / service_rate
+    tail = a**servers / math.factorial(servers) / (1 - a / servers)
+    p_wait = tail / (sum(a**k / math.factorial(k) for k in range(servers)) + tail)
+    return p_wait / (servers * service_rate - rate)
+
+
+def throughput(max_events):
+    print(f'M/M/{SERVERS} queue at 90% utilization, one long run')
+    # Each customer is an arrival and a departure event (about 2 * RATE events per minute)
+    events = 10**5
+    while events <= max_events:
+        sim = des.Simulation(np.random.default_rng(1))
+        resource, _ = des.queue_model(sim, ARRIVAL, SERVICE, SERVERS)
+        t0 = time.perf_counter()
+        sim.run(events / (2 * RATE))
+        elapsed = time.perf_counter() - t0
+        print(f'  {sim.events:>11,d} events | {elapsed:7.2f}s | {sim.events / elapsed:10,.0f} events/s | '
+              f'utilization {resource.utilization():.3f}')
+        events *= 10
+
+
+def accuracy(replications=20, horizon=20_000.0, customers=20_000, vector_replications=500):
+    exact = erlang_c_wait(RATE, SERVICE_RATE, SERVERS)
+    print(f'Mean wait in queue vs. Erlang C ({exact:.4f} min)')
+    t0 = time.perf_counter()
+    runs = des.replicate('queue', {'arrival': ARRIVAL, 'service': SERVICE, 'servers': SERVERS,
+                                   'horizon': horizon, 'warmup': 1000.0}, replications, seed=7)
+    elapsed = time.perf_counter() - t0
+    print(f'  kernel     {replications:>5} replications: {runs.mean("mean_wait"):.4f} +/- {runs.half_width("mean_wait"):.4f} '
+          f'| {runs.events:,} events in {elapsed:.2f}s')
+    t0 = time.perf_counter()
+    waits = des.queue_replications(ARRIVAL, SERVICE, SERVERS, customers, vector_replications, seed=7,
+                                   warmup=customers // 10)['mean_wait']
+    elapsed = time.perf_counter() - t0
+    half = des.t95(len(waits) - 1) * waits.std(ddof=1) / np.sqrt(len(waits))
+    print(f'  vectorized {vector_replications:>5} replications: {waits.mean():.4f} +/- {half:.4f} '
+          f'| {customers * vector_replications:,} customers in {elapsed:.2f}s '
+          f'({customers * vector_replications / elapsed:,.0f} customers/s)')
+
+
+def main():
+    max_events = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**7
+    throughput(max_events)
+    accuracy()
+
+
+if __name__ == '__main__':
+    main()
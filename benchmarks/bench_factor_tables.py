@@ -0,0 +1,54 @@
+"""Precomputed interest-factor table lookups vs. direct power computation.
+
+Run with ``python benchmarks/bench_factor_tables.py``.
+"""
+import time
+
+import numpy as np
+
+from cven_app.engine import factor_tables, tvm
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def direct_pa(i, n):
+    # The expression the calculators used before the shared table
+    return ((1 + i)**n - 1) / (i * (1 + i)**n)
+
+
+def main():
+    t0 = time.perf_counter()
+    table = factor_tables.InterestTable()
+    print(f'table build: {time.perf_counter() - t0:.4f}s, {table.values.nbytes / 1e6:.1f} MB')
+
+    rng = np.random.default_rng(322)
+    for m in (1, 1_000, 1_000_000):
+        i = rng.integers(1, 500, m) * table.i_step
+        n = rng.integers(1, 121, m).astype(float)
+        t_lookup = best_of(lambda: table.lookup('P/A', i, n))
+        t_closed = best_of(lambda: tvm.p_a(i, n))
+        t_direct = best_of(lambda: direct_pa(i, n))
+        print(f'{m:>9,d} pairs | lookup {t_lookup * 1e3:9.3f} ms | tvm closed form {t_closed * 1e3:9.3f} ms'
+              f' | direct power {t_direct * 1e3:9.3f} ms')
+
+    off = rng.uniform(0.001, 0.499, 100_000)
+    n = rng.integers(1, 121, 100_000)
+    rel = np.abs(table.lookup('P/A', off, n) / tvm.p_a(off, n) - 1)
+    print(f'off-grid interpolation: max relative error {rel.max():.2e}')
+
+    scalar = best_of(lambda: [table.lookup('P/A', 0.05, 10) for _ in range(10_000)]) / 10_000
+    direct = best_of(lambda: [direct_pa(0.05, 10) for _ in range(10_000)]) / 10_000
+    closed = best_of(lambda: [tvm.p_a(0.05, 10) for _ in range(10_000)]) / 10_000
+    print(f'single scalar: lookup {scalar * 1e6:.2f} us | tvm closed form {closed * 1e6:.2f} us'
+          f' | direct power {direct * 1e6:.2f} us')
+
+
+if __name__ == '__main__':
+    main()
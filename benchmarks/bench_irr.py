@@ -0,0 +1,65 @@
+"""Batched IRR solver vs. the legacy 20-step bisection used by the UI tools.
+
+Run with ``python benchmarks/bench_irr.py``.  Projects are uniform series with
+a known IRR, so both solvers can be scored against the exact answer.
+"""
+import time
+
+import numpy as np
+
+from cven_app.engine import cashflow, irr, tvm
+
+
+def legacy_bisection(c0, a, n):
+    # Verbatim logic of the original irr_visualizer_tool / incremental_irr_tool
+    low, high = 0.0001, 1.0
+    for _ in range(20):
+        mid = (low + high) / 2
+        f = ((1 + mid)**n - 1) / (mid * (1 + mid)**n)
+        if -c0 + a * f > 0: low = mid
+        else: high = mid
+    return low
+
+
+def make_projects(m, rng, low=-0.3, high=2.0):
+    true_rate = rng.uniform(low, high, m)
+    life = rng.integers(2, 40, m)
+    benefit = 1.0 / tvm.p_a(true_rate, life)
+    return true_rate, life, benefit
+
+
+def run(m, rng):
+    true_rate, life, benefit = make_projects(m, rng)
+    flows = cashflow.uniform_flows(1.0, benefit, life)
+
+    t0 = time.perf_counter()
+    legacy = np.array([legacy_bisection(1.0, a, n) for a, n in zip(benefit, life)])
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    result = irr.irr(flows)
+    t_batch = time.perf_counter() - t0
+
+    in_range = (true_rate > 0.0001) & (true_rate < 1.0)
+    err_legacy = np.abs(legacy - true_rate)
+    err_batch = np.abs(result.irr - true_rate)
+    print(f'{m:>8,d} projects | legacy {t_legacy:8.3f}s  batched {t_batch:8.3f}s  '
+          f'speed-up {t_legacy / t_batch:6.1f}x')
+    print(f'{"":>17} max |error| inside (0, 100%): legacy {err_legacy[in_range].max():.2e}  '
+          f'batched {err_batch[in_range].max():.2e}')
+    print(f'{"":>17} max |error| outside (0, 100%): legacy {err_legacy[~in_range].max():.2e}  '
+          f'batched {err_batch[~in_range].max():.2e}')
+
+
+def main():
+    rng = np.random.default_rng(322)
+    for m in (1_000, 10_000, 100_000):
+        run(m, rng)
+
+    # Non-conventional flows: two roots (10% and 20%) and no root at all
+    result = irr.irr([[-100, 230, -132], [100, 100, 100]])
+    print('roots:', result.roots.tolist(), 'n_roots:', result.n_roots.tolist())
+
+
+if __name__ == '__main__':
+    main()
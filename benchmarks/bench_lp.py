@@ -0,0 +1,186 @@
+"""Standard LP instances for the revised simplex solver.
+
+Run with ``python benchmarks/bench_lp.py`` (add ``large`` for the
+thousands-of-rows instances).  Each instance is generated from a fixed
+seed and solved with ``lp.solve``; the table reports its size, the time,
+simplex iterations (phase 1 in brackets) and the optimum, and checks the
+result against the optimality conditions: primal feasibility, dual
+feasibility of the duals and reduced costs for each row sense and bound,
+and complementary slackness.  Instances with a known optimum (Klee-Minty,
+assignment with a planted solution) are also checked against it.  The
+last table repeats one instance with the basis refactorized at every
+pivot, to show what the LU-plus-eta updates save.
+"""
+import sys
+import time
+
+import numpy as np
+
+from cven_app.engine import lp
+from cven_app.engine.sparse import CSCMatrix
+
+
+def klee_minty(n):
+    # max sum 2^(n-j) x_j, s.t. 2 sum_{j<i} 2^(i-j) x_j + x_i <= 5^i; Dantzig's rule visits all 2^n corners
+    a = np.zeros((n, n))
+    for i in range(n):
+        a[i, :i] = 2.0 ** (i - np.arange(i) + 1)
+        a[i, i] = 1
+    c = 2.0 ** (n - 1 - np.arange(n))
+    return lp.LinearProgram(c, a, 5.0 ** np.arange(1, n + 1), maximize=True), 5.0 ** n
+
+
+def transportation(sources, sinks, seed=0):
+    # Ship from supplies (<= rows) to demands (>= rows) at distance costs
+    rng = np.random.default_rng(seed)
+    supply = rng.uniform(50, 150, sources)
+    demand = rng.uniform(20, 100, sinks)
+    demand *= 0.9 * supply.sum() / demand.sum()
+    xy_s, xy_d = rng.random((sources, 2)), rng.random((sinks, 2))
+    cost = np.hypot(*(xy_s[:, None, :] - xy_d[None, :, :]).transpose(2, 0, 1)).ravel()
+    j = np.arange(sources * sinks)
+    rows = np.r_[j // sinks, sources + j % sinks]
+    a = CSCMatrix.from_triplets(rows, np.r_[j, j], np.ones(2 * len(j)), (sources + sinks, len(j)))
+    return lp.LinearProgram(cost, a, np.r_[supply, demand], '<' * sources + '>' * sinks), None
+
+
+def assignment(n, seed=0):
+    # Every worker does one job; the identity assignment is planted as the unique cheapest
+    rng = np.random.default_rng(seed)
+    cost = rng.uniform(1, 10, (n, n))
+    cost[np.arange(n), np.arange(n)] = 0.5
+    j = np.arange(n * n)
+    a = CSCMatrix.from_triplets(np.r_[j // n, n + j % n], np.r_[j, j], np.ones(2 * n * n), (2 * n, n * n))
+    return lp.LinearProgram(cost.ravel(), a, np.ones(2 * n), '=' * (2 * n)), 0.5 * n
+
+
+def resource_allocation(m, n, density, seed=0):
+    # Products (bounded output) share scarce resources: max profit, sparse nonnegative usage
+    rng = np.random.default_rng(seed)
+    nnz = int(m * n * density)
+    rows, cols = rng.integers(0, m, nnz), rng.integers(0, n, nnz)
+    a = CSCMatrix.from_triplets(np.r_[rows, rng.integers(0, m, n)], np.r_[cols, np.arange(n)],
+                                rng.uniform(0.1, 1, nnz + n), (m, n))
+    b = 0.05 * a.matvec(np.full(n, 10.0))
+    return lp.LinearProgram(rng.uniform(1, 10, n), a, b, upper=rng.uniform(5, 15, n), maximize=True), None
+
+
+def diet(nutrients, foods, seed=0):
+    # Cheapest diet meeting minimum nutrient levels (>= rows) and a calorie cap (a <= row)
+    rng = np.random.default_rng(seed)
+    a = rng.uniform(0, 1, (nutrients, foods)) * (rng.random((nutrients, foods)) < 0.3)
+    need = a.sum(axis=1) * 0.2
+    calories = rng.uniform(1, 3, foods)
+    a = np.vstack([a, calories])
+    b = np.r_[need, calories.sum() * 0.5]
+    return lp.LinearProgram(rng.uniform(1, 5, foods), a, b, '>' * nutrients + '<', upper=4.0), None
+
+
+def production_plan(periods, products, seed=0):
+    # Multi-period production with inventory balance (= rows) and capacity (<= rows): a staircase matrix
+    rng = np.random.default_rng(seed)
+    demand = rng.uniform(10, 60, (periods, products))
+    capacity = demand.sum(axis=1).mean() * 1.1
+    n = 2 * periods * products                  # produce[t, p], stock[t, p]
+    produce = lambda t, p: t * products + p
+    stock = lambda t, p: periods * products + t * products + p
+    rows, cols, vals = [], [], []
+    for t in range(periods):
+        for p in range(products):
+            r = t * products + p                # stock[t-1] + produce[t] - stock[t] = demand[t]
+            rows += [r, r]
+            cols += [produce(t, p), stock(t, p)]
+            vals += [1.0, -1.0]
+            if t:
+                rows.append(r)
+                cols.append(stock(t - 1, p))
+                vals.append(1.0)
+        for p in range(products):
+            rows.append(periods * products + t)
+            cols.append(produce(t, p))
+            vals.append(1.0)
+    m = periods * products + periods
+    a = CSCMatrix.from_triplets(rows, cols, vals, (m, n))
+    cost = np.r_[rng.uniform(5, 10, periods * products) * np.repeat(rng.uniform(0.8, 1.2, periods), products),
+                 np.full(periods * products, 0.5)]
+    b = np.r_[demand.ravel(), np.full(periods, capacity)]
+    return lp.LinearProgram(cost, a, b, '=' * (periods * products) + '<' * periods), None
+
+
+def check(problem, result):
+    """Largest violation of primal feasibility, dual feasibility and complementary slackness."""
+    x, y, d = result.x, result.duals, result.reduced_costs
+    activity = problem.A.matvec(x)
+    primal = max(np.max(problem.lower - x, initial=0), np.max(x - problem.upper, initial=0))
+    senses = np.array(list(problem.senses))
+    primal = max(primal, np.max(np.where(senses == '<', activity - problem.b, 0), initial=0),
+                 np.max(np.where(senses == '>', problem.b - activity, 0), initial=0),
+                 np.max(np.where(senses == '=', np.abs(activity - problem.b), 0), initial=0))
+    # Stated as maximization, a <= row has a dual >= 0 and a variable below its upper bound d <= 0
+    sign = 1.0 if problem.maximize else -1.0
+    dual = max(np.max(np.where(senses == '<', -sign * y, 0), initial=0),
+               np.max(np.where(senses == '>', sign * y, 0), initial=0),
+               np.max(np.where(x < problem.upper - 1e-7, sign * d, 0), initial=0),
+               np.max(np.where(x > problem.lower + 1e-7, -sign * d, 0), initial=0))
+    scale = 1 + np.abs(problem.c).max()
+    complementary = np.max(np.abs(y * (problem.b - activity)), initial=0) / scale
+    return primal, dual / scale, complementary
+
+
+def run(name, instance):
+    problem, known = instance
+    t0 = time.perf_counter()
+    result = lp.solve(problem)
+    elapsed = time.perf_counter() - t0
+    primal, dual, complementary = check(problem, result)
+    known = '' if known is None else f' (known {known:.6g}, error {abs(result.objective - known) / abs(known):.0e})'
+    m, n = problem.shape
+    print(f'  {name:26} {m:>6} x {n:<7} nnz {problem.A.nnz:>8,} | {elapsed:7.2f} s | {result.iterations:>6} it '
+          f'[{result.phase_one_iterations:>5}] | {result.status:8} z = {result.objective:<14.8g}'
+          f'| primal {primal:.0e} dual {dual:.0e} compl {complementary:.0e}{known}')
+    return result
+
+
+def refactor_every_pivot(name, instance):
+    problem = instance[0]
+    times = []
+    for interval in (lp.REFACTOR_INTERVAL, 1):
+        default, lp.REFACTOR_INTERVAL = lp.REFACTOR_INTERVAL, interval
+        try:
+            t0 = time.perf_counter()
+            result = lp.solve(problem)
+            times.append(time.perf_counter() - t0)
+        finally:
+            lp.REFACTOR_INTERVAL = default
+    print(f'  {name}: eta updates (refactor every {lp.REFACTOR_INTERVAL}) {times[0]:.2f} s, '
+          f'refactor at every pivot {times[1]:.2f} s ({result.iterations} iterations)')
+
+
+def main():
+    large = 'large' in sys.argv[1:]
+    print('LP benchmark instances')
+    instances = [
+        ('Klee-Minty n=10', klee_minty(10)),
+        ('Klee-Minty n=14', klee_minty(14)),
+        ('transportation 20x40', transportation(20, 40)),
+        ('assignment 30', assignment(30)),
+        ('diet 60x200', diet(60, 200)),
+        ('production 12x20', production_plan(12, 20)),
+        ('resource 300x600', resource_allocation(300, 600, 0.02)),
+        ('transportation 60x150', transportation(60, 150)),
+        ('resource 1000x2000', resource_allocation(1000, 2000, 0.005)),
+    ]
+    if large:
+        instances += [
+            ('production 52x60', production_plan(52, 60)),
+            ('resource 2000x5000', resource_allocation(2000, 5000, 0.002)),
+            ('transportation 100x300', transportation(100, 300)),
+        ]
+    for name, instance in instances:
+        run(name, instance)
+    print('Basis updates')
+    refactor_every_pivot('resource 300x600', resource_allocation(300, 600, 0.02))
+
+
+if __name__ == '__main__':
+    main()
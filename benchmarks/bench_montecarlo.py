@@ -0,0 +1,128 @@
+"""Accuracy, memory and multi-core scaling of the streaming Monte Carlo core.
+
+Run with ``python benchmarks/bench_montecarlo.py [max_n]`` (``max_n`` defaults
+to 10^8; pass ``1e9`` for the full run).  At small n every streamed statistic
+is checked against the exact NumPy computation on the same samples; at large
+n the peak traced memory shows that it does not grow with the sample count.
+The scaling run repeats one seed on 1, 2, 4, ... cores and checks that every
+worker count gives a bit-identical summary.  The strategy comparison repeats
+each sampling strategy over many seeds and sets the spread of the means (the
+true standard error) against the run's own estimate, and against pseudo-random
+sampling as the number of samples saved at equal error; antithetic runs of
+odd and even size must report the same error.
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from cven_app.engine import distributions, montecarlo, sampling
+
+SPECS = [('normal', 500, 50), ('uniform', 400, 600), ('triangular', 1, 2, 5), ('poisson', 10)]
+QS = [0.1, 1, 5, 25, 50, 75, 95, 99, 99.9]
+
+
+def exact_samples(spec, n, seed, chunk_size):
+    # Same generator calls as montecarlo.simulate, kept in memory
+    entropy, sizes = montecarlo.plan(n, seed, chunk_size)
+    return np.concatenate([distributions.draw(spec, montecarlo.chunk_rng(entropy, k), size) for k, size in enumerate(sizes)])
+
+
+def check_accuracy(n=200_000, chunk_size=30_000, seed=322):
+    print(f'Accuracy at n={n:,} (chunks of {chunk_size:,}) vs. exact NumPy')
+    for spec in SPECS:
+        summary = montecarlo.simulate(spec, n, seed=seed, chunk_size=chunk_size)
+        x = exact_samples(spec, n, seed, chunk_size)
+        mean_err = abs(summary.stats.mean - x.mean()) / abs(x.mean())
+        std_err = abs(summary.stats.std() - x.std()) / x.std()
+        counts = np.histogram(x, bins=summary.histogram.edges)[0]
+        hist_err = np.abs(summary.histogram.counts - counts).sum()
+        estimates = summary.percentile(QS)
+        if summary.discrete:
+            # Exact inverted-CDF quantiles
+            quantile_err = np.abs(estimates - np.percentile(x, QS, method='inverted_cdf')).max()
+            label = f'max |q - exact| {quantile_err:.3g}'
+        else:
+            # Error in probability: how far the estimate's rank is from the target
+            rank_err = np.abs(np.searchsorted(np.sort(x), estimates) / n * 100 - QS).max()
+            label = f'max rank error {rank_err:.4f} pct-pts'
+        print(f'  {spec[0]:>10}: mean rel err {mean_err:.1e} | std rel err {std_err:.1e} | '
+              f'hist count diff {hist_err} | {label}')
+
+
+def scale(max_n):
+    print('Throughput and peak traced memory')
+    n = 10**6
+    while n <= max_n:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        summary = montecarlo.simulate(('normal', 0, 1), n, seed=1)
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'  n={n:>13,d} | {elapsed:8.2f}s ({n / elapsed:12,.0f}/s) | peak {peak / 2**20:6.1f} MiB | '
+              f'mean {summary.stats.mean:+.5f} std {summary.stats.std():.5f} P99.9 {summary.percentile(99.9):.4f}')
+        n *= 10
+
+
+def fingerprint(summary):
+    return (summary.stats.n, summary.stats.mean, summary.stats.m2, summary.digest.means.tobytes(),
+            summary.digest.weights.tobytes(), summary.histogram.counts.tobytes())
+
+
+def scaling(n):
+    cores = os.cpu_count() or 1
+    print(f'Scaling at n={n:,} on {cores} cores (seed 322)')
+    counts = sorted({1, cores} | {2**k for k in range(1, cores.bit_length()) if 2**k < cores})
+    reference = serial = None
+    for workers in counts:
+        t0 = time.perf_counter()
+        summary = montecarlo.simulate(('normal', 0, 1), n, seed=322, workers=workers)
+        elapsed = time.perf_counter() - t0
+        serial = serial or elapsed
+        reference = reference or fingerprint(summary)
+        same = 'identical' if fingerprint(summary) == reference else 'DIFFERENT'
+        print(f'  {workers:>3} workers | {elapsed:8.2f}s | speed-up {serial / elapsed:5.2f}x | {same}')
+
+
+def compare_strategies(n=2**14, repeats=100):
+    print(f'Sampling strategies at n={n:,} over {repeats} seeds (true vs. reported standard error)')
+    for spec in SPECS:
+        baseline = None
+        for strategy in sampling.STRATEGIES:
+            t0 = time.perf_counter()
+            runs = [montecarlo.simulate(spec, n, seed=seed, strategy=strategy, workers=1) for seed in range(repeats)]
+            elapsed = (time.perf_counter() - t0) / repeats
+            true_se = np.std([r.stats.mean for r in runs], ddof=1)
+            reported = np.sqrt(np.mean([r.standard_error() ** 2 for r in runs]))
+            baseline = baseline or true_se
+            # Antithetic pairs are exact for inputs symmetric about their mean (up to rounding)
+            saving = f'{(baseline / true_se) ** 2:10,.1f}x' if true_se > 1e-9 * baseline else '     exact'
+            print(f'  {spec[0]:>10} {strategy:>10}: true SE {true_se:9.2e} | reported {reported:9.2e} | '
+                  f'samples saved {saving} | {elapsed * 1e3:6.1f} ms/run')
+
+
+def check_odd_antithetic(spec=('triangular', 1, 2, 5), repeats=400):
+    print(f'Antithetic standard error at odd and even n over {repeats} seeds ({spec[0]})')
+    for n in (1000, 1001):
+        runs = [montecarlo.simulate(spec, n, seed=seed, strategy='antithetic', workers=1) for seed in range(repeats)]
+        true_se = np.std([r.stats.mean for r in runs], ddof=1)
+        reported = np.sqrt(np.mean([r.standard_error() ** 2 for r in runs]))
+        print(f'  n={n:,}: true SE {true_se:9.2e} | reported {reported:9.2e} | ratio {reported / true_se:5.2f}')
+        # An odd chunk must pair u with 1 - u like an even one, or the reported error is far off
+        assert 0.8 < reported / true_se < 1.25
+
+
+def main():
+    max_n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**8
+    check_accuracy()
+    check_odd_antithetic()
+    compare_strategies()
+    scale(max_n)
+    scaling(max(min(max_n, 10**8), montecarlo.PARALLEL_THRESHOLD))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Scaling of the N-objective Pareto engine.
+
+Run with ``python benchmarks/bench_pareto.py``.  Designs are uniform random
+points, the hard case for front size.  The 2-objective front is compared
+with the original sorted-list scan of ``pareto_frontier_tool``, and the
+incremental ``ParetoArchive`` is timed against recomputing the front from
+scratch after every batch.
+"""
+import time
+
+import numpy as np
+
+from cven_app.engine import pareto
+
+
+def legacy_front(points):
+    # Verbatim logic of the original pareto_frontier_tool (min cost, max reliability)
+    sorted_points = sorted(points, key=lambda p: p[0])
+    pareto_set = []
+    max_y = -1
+    for x, y in sorted_points:
+        if y > max_y:
+            pareto_set.append([float(x), float(y)])
+            max_y = y
+    return pareto_set
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    rng = np.random.default_rng(322)
+
+    print('2 objectives (min cost, max reliability)')
+    for n in (1_000, 100_000, 1_000_000):
+        points = rng.random((n, 2))
+        mask, t_new = timed(pareto.nondominated, points, maximize=[False, True])
+        line = f'  n={n:>9,d} | front {mask.sum():>5d} | engine {t_new:7.3f}s'
+        if n <= 100_000:
+            legacy, t_old = timed(legacy_front, [tuple(p) for p in points])
+            line += f' | legacy {t_old:7.3f}s ({t_old / t_new:6.1f}x) | same front: {len(legacy) == mask.sum()}'
+        print(line)
+
+    print('k objectives (skyline)')
+    for k in (3, 4, 6):
+        for n in (10_000, 100_000, 1_000_000):
+            points = rng.random((n, k))
+            mask, elapsed = timed(pareto.nondominated, points)
+            print(f'  k={k} n={n:>9,d} | front {mask.sum():>6d} | {elapsed:7.3f}s ({n / elapsed:12,.0f}/s)')
+
+    print('NSGA-II ranks and crowding distance')
+    for k, n in ((2, 1_000_000), (3, 10_000), (6, 10_000)):
+        points = rng.random((n, k))
+        rank, t_rank = timed(pareto.nondominated_rank, points)
+        _, t_crowd = timed(pareto.crowding_distance, points, rank)
+        print(f'  k={k} n={n:>9,d} | {rank.max() + 1:>5d} fronts | rank {t_rank:7.3f}s | crowding {t_crowd:7.3f}s')
+
+    print('Streaming archive: 100 batches of 10,000 designs')
+    for k in (2, 3, 6):
+        batches = [rng.random((10_000, k)) for _ in range(100)]
+        archive = pareto.ParetoArchive(k)
+        _, t_archive = timed(lambda: [archive.insert_many(b) for b in batches])
+        seen = []
+
+        def recompute():
+            for b in batches:
+                seen.append(b)
+                everything = np.concatenate(seen)
+                everything[pareto.nondominated(everything)]
+        _, t_scratch = timed(recompute)
+        print(f'  k={k} | front {len(archive):>5d} | archive {t_archive:7.3f}s | recompute {t_scratch:7.3f}s '
+              f'({t_scratch / t_archive:5.1f}x)')
+    archive = pareto.ParetoArchive(2)
+    points = rng.random((100_000, 2))
+    _, elapsed = timed(lambda: [archive.insert(p) for p in points])
+    print(f'  single 2-D inserts: {elapsed / len(points) * 1e6:.1f} us each')
+
+
+if __name__ == '__main__':
+    main()
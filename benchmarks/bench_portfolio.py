@@ -0,0 +1,42 @@
+"""Throughput of the N-alternative PW/AW/FW evaluator.
+
+Run with ``python benchmarks/bench_portfolio.py``.  Each size is evaluated
+in-process and (above the parallel threshold) across a process pool.
+"""
+import os
+import time
+
+import numpy as np
+
+from cven_app.engine import cashflow, portfolio
+
+
+def make_portfolio(m, rng, horizon=20):
+    life = rng.integers(3, horizon + 1, m)
+    flows = cashflow.uniform_flows(rng.uniform(1e3, 1e5, m), rng.uniform(1e2, 2e4, m), life,
+                                   salvage=rng.uniform(0, 5e3, m))
+    return flows
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - t0
+
+
+def main():
+    rng = np.random.default_rng(322)
+    cores = os.cpu_count() or 1
+    print(f'{cores} cores available')
+    for m in (1_000, 100_000, 1_000_000):
+        flows = make_portfolio(m, rng)
+        serial = timed(portfolio.rank, flows, 0.08, 0.02, workers=1)
+        line = f'{m:>9,d} alternatives | serial {serial:7.3f}s ({m / serial:12,.0f}/s)'
+        if m >= portfolio.PARALLEL_THRESHOLD and cores > 1:
+            parallel = timed(portfolio.rank, flows, 0.08, 0.02, workers=cores)
+            line += f' | {cores} workers {parallel:7.3f}s ({m / parallel:12,.0f}/s)'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
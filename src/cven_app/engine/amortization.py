@@ -0,0 +1,129 @@
+"""Closed-form loan amortization for whole loan books.
+
+The balance after k payments is ``P (F/P, r, k) - A (F/A, r, k)``, so every
+column of the schedule is computed directly for all loans and all periods
+without a month-by-month loop.  Large books are streamed to CSV or Parquet in
+blocks of loans so memory stays bounded by ``chunk_rows``.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cven_app.engine import tvm
+
+COLUMNS = ['loan_id', 'period', 'payment', 'interest', 'principal', 'balance']
+
+
+def _loan_arrays(principal, annual_rate, years, periods_per_year):
+    principal, annual_rate, years = np.broadcast_arrays(
+        np.asarray(principal, dtype=float), np.asarray(annual_rate, dtype=float),
+        np.asarray(years, dtype=float))
+    rate = annual_rate.ravel() / periods_per_year
+    periods = np.rint(years.ravel() * periods_per_year).astype(int)
+    return principal.ravel(), rate, periods
+
+
+def payment(principal, annual_rate, years, periods_per_year=12):
+    """Level payment per period for each loan."""
+    principal, rate, periods = _loan_arrays(principal, annual_rate, years, periods_per_year)
+    return principal * tvm.a_p(rate, periods)
+
+
+def schedule(principal, annual_rate, years, periods_per_year=12):
+    """Full amortization schedule as (loans x periods) arrays.
+
+    Periods past a loan's term are zero.  Returns a dict with ``payment``,
+    ``interest``, ``principal`` and ``balance`` matrices plus the ``periods``
+    of each loan.
+    """
+    return _schedule(*_loan_arrays(principal, annual_rate, years, periods_per_year))
+
+
+def _schedule(principal, rate, periods):
+    pmt = principal * tvm.a_p(rate, periods)
+    k = np.arange(periods.max(initial=0) + 1)
+    r = rate[:, None]
+    # Balance after k payments, k = 0..n; exactly zero once the loan is repaid
+    balance = principal[:, None] * tvm.f_p(r, k) - pmt[:, None] * tvm.f_a(r, k)
+    balance = np.where(k >= periods[:, None], 0.0, balance)
+    active = (k[1:] <= periods[:, None])
+    interest = np.where(active, balance[:, :-1] * r, 0.0)
+    pmt_matrix = np.where(active, pmt[:, None], 0.0)
+    return {
+        'payment': pmt_matrix,
+        'interest': interest,
+        'principal': pmt_matrix - interest,
+        'balance': balance[:, 1:],
+        'periods': periods,
+    }
+
+
+def yearly_totals(sched, periods_per_year=12):
+    """Sum each schedule column over years (e.g. for a readable chart)."""
+    width = sched['payment'].shape[1]
+    years = -(-width // periods_per_year)
+    pad = years * periods_per_year - width
+    totals = {}
+    for key in ('payment', 'interest', 'principal'):
+        block = np.pad(sched[key], ((0, 0), (0, pad)))
+        totals[key] = block.reshape(block.shape[0], years, periods_per_year).sum(axis=2)
+    return totals
+
+
+def iter_schedule_frames(principal, annual_rate, years, periods_per_year=12, chunk_rows=1_000_000):
+    """Yield the schedule in long format, one DataFrame of about ``chunk_rows`` rows at a time."""
+    principal, rate, periods = _loan_arrays(principal, annual_rate, years, periods_per_year)
+    start = 0
+    while start < len(principal):
+        # Grow the block of loans until it holds roughly chunk_rows schedule rows
+        cum = np.cumsum(periods[start:])
+        stop = start + max(int(np.searchsorted(cum, chunk_rows, side='right')), 1)
+        sched = _schedule(principal[start:stop], rate[start:stop], periods[start:stop])
+        loan, col = np.nonzero(np.arange(sched['payment'].shape[1]) < sched['periods'][:, None])
+        yield pd.DataFrame({
+            'loan_id': loan + start,
+            'period': col + 1,
+            'payment': sched['payment'][loan, col],
+            'interest': sched['interest'][loan, col],
+            'principal': sched['principal'][loan, col],
+            'balance': sched['balance'][loan, col],
+        }, columns=COLUMNS)
+        start = stop
+
+
+def export_schedule(path, principal, annual_rate, years, periods_per_year=12, chunk_rows=1_000_000, fmt=None):
+    """Stream the schedule of a loan book to CSV or Parquet and return the row count.
+
+    The format is taken from ``fmt`` or the file suffix.  Parquet output
+    requires ``pyarrow``.
+    """
+    path = Path(path)
+    fmt = (fmt or path.suffix.lstrip('.')).lower()
+    frames = iter_schedule_frames(principal, annual_rate, years, periods_per_year, chunk_rows)
+    rows = 0
+    if fmt == 'csv':
+        with path.open('w', newline='') as fh:
+            for k, frame in enumerate(frames):
+                frame.to_csv(fh, header=(k == 0), index=False)
+                rows += len(frame)
+    elif fmt in ('parquet', 'pq'):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError('Parquet export requires pyarrow: pip install pyarrow') from exc
+        writer = None
+        try:
+            for frame in frames:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                rows += len(frame)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        raise ValueError(f'Unsupported export format: {fmt!r}')
+    return rows
@@ -0,0 +1,131 @@
+"""Present-worth evaluation of irregular cash-flow vectors.
+
+Cash flows are stored as a matrix with one row per project and one column per
+period (column 0 is year 0).  Projects with shorter lives are zero-padded.
+
+NPV profiles reuse cached, read-only discount-factor matrices keyed by the
+rate grid and horizon, so repeated sweeps over the same grid only pay for a
+single matrix product.  Time-varying rate and inflation term structures are
+handled by ``DiscountCurve``, whose cumulative factors are computed once and
+shared by every project in a batch.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from cven_app.engine import tvm
+
+
+def as_matrix(cashflows):
+    """Coerce a cash-flow vector, a ragged list of vectors or a matrix to a 2-D float array."""
+    if isinstance(cashflows, np.ndarray):
+        flows = cashflows.astype(float, copy=False)
+        return flows.reshape(1, -1) if flows.ndim == 1 else flows
+    rows = list(cashflows)
+    if rows and np.ndim(rows[0]) == 0:
+        return np.asarray(rows, dtype=float).reshape(1, -1)
+    width = max((len(r) for r in rows), default=0)
+    flows = np.zeros((len(rows), width))
+    for k, r in enumerate(rows):
+        flows[k, :len(r)] = r
+    return flows
+
+
+def uniform_flows(first_cost, annual_benefit, life, salvage=0.0):
+    """Build the textbook cash-flow matrix -P, A, A, ..., A + S for arrays of projects."""
+    first_cost, annual_benefit, life, salvage = np.broadcast_arrays(
+        np.asarray(first_cost, dtype=float), np.asarray(annual_benefit, dtype=float),
+        np.asarray(life, dtype=int), np.asarray(salvage, dtype=float))
+    first_cost, annual_benefit, life, salvage = (
+        a.ravel() for a in (first_cost, annual_benefit, life, salvage))
+    t = np.arange(life.max(initial=0) + 1)
+    active = (t >= 1) & (t <= life[:, None])
+    flows = np.where(active, annual_benefit[:, None], 0.0)
+    flows[:, 0] = -first_cost
+    flows[np.arange(len(life)), life] += salvage
+    return flows
+
+
+def npv(cashflows, rate):
+    """Net present value of each row of ``cashflows`` at ``rate``.
+
+    ``rate`` may be a scalar, one rate per project, or any array that
+    broadcasts against the project axis.
+    """
+    flows = as_matrix(cashflows)
+    t = np.arange(flows.shape[1])
+    rate = np.asarray(rate, dtype=float)[..., None]
+    return (flows * tvm.p_f(rate, t)).sum(axis=-1)
+
+
+@lru_cache(maxsize=32)
+def rate_grid(start, stop, num):
+    """Cached, read-only ``np.linspace(start, stop, num)`` rate grid."""
+    grid = np.linspace(start, stop, int(num))
+    grid.setflags(write=False)
+    return grid
+
+
+@lru_cache(maxsize=32)
+def _discount_matrix(rate_bytes, horizon):
+    rates = np.frombuffer(rate_bytes, dtype=float)
+    with np.errstate(over='ignore'):
+        matrix = np.exp(-np.outer(np.log1p(rates), np.arange(horizon + 1)))
+    matrix.setflags(write=False)
+    return matrix
+
+
+def discount_matrix(rates, horizon):
+    """(rates x horizon+1) matrix of (1 + r)^-t, cached per (grid, horizon)."""
+    rates = np.ascontiguousarray(rates, dtype=float).ravel()
+    return _discount_matrix(rates.tobytes(), int(horizon))
+
+
+def npv_profile(cashflows, rates):
+    """NPV of every project at every rate: a (projects x rates) matrix from one product."""
+    flows = as_matrix(cashflows)
+    return flows @ discount_matrix(rates, flows.shape[1] - 1).T
+
+
+class DiscountCurve:
+    """Year-by-year discounting from per-period rate and inflation curves.
+
+    ``rates[k]`` and ``inflation[k]`` apply to period k + 1; either may be a
+    scalar.  Each period's real rate follows the Fisher relation and the
+    cumulative factors ``D_t = prod_{k<=t} 1 / (1 + r_k)`` come from a single
+    cumulative product.  Curves shorter than a cash-flow horizon hold their
+    last value.
+    """
+
+    def __init__(self, rates, inflation=0.0):
+        rates = np.atleast_1d(np.asarray(rates, dtype=float))
+        inflation = np.atleast_1d(np.asarray(inflation, dtype=float))
+        length = max(len(rates), len(inflation))
+        self.nominal = self._extend(rates, length)
+        self.inflation = self._extend(inflation, length)
+        self.real = (1 + self.nominal) / (1 + self.inflation) - 1
+        self._factors = np.concatenate(([1.0], np.cumprod(1.0 / (1.0 + self.real))))
+
+    @staticmethod
+    def _extend(values, length):
+        return np.concatenate((values, np.full(length - len(values), values[-1])))
+
+    def factors(self, horizon):
+        """Cumulative discount factors D_0 .. D_horizon."""
+        have = len(self._factors) - 1
+        if horizon > have:
+            # Extend with the last real rate held constant
+            tail = self._factors[-1] * (1.0 + self.real[-1]) ** -np.arange(1, horizon - have + 1)
+            self._factors = np.concatenate((self._factors, tail))
+        return self._factors[:horizon + 1]
+
+    def npv(self, cashflows):
+        """Present worth of every project from one matrix-vector product."""
+        flows = as_matrix(cashflows)
+        return flows @ self.factors(flows.shape[1] - 1)
+
+    def annuity_factor(self, life):
+        """Time-varying P/A: sum of D_1 .. D_life for each life."""
+        life = np.asarray(life, dtype=int)
+        cumulative = np.cumsum(self.factors(int(life.max(initial=0))))
+        return cumulative[life] - 1.0
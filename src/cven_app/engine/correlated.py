@@ -0,0 +1,143 @@
+"""Correlated input sampling with a Gaussian copula.
+
+``CorrelatedSampler(marginals, corr)`` draws vectors whose components follow
+the given distribution specs (any family in ``distributions.REGISTRY``, e.g.
+``('lognormal', mu, sigma)``, ``('triangular', low, mode, high)`` or
+``('beta', a, b, low, high)``) and whose normal scores have the correlation
+matrix ``corr``:
+
+    z = L e,  e ~ N(0, I),  L L' = corr
+    x_j = F_j^-1(Phi(z_j))
+
+The factor ``L`` depends only on ``corr``, so it is computed once per matrix
+and cached (``cholesky``); repeated generations with the same correlation,
+from any tool, reuse it.  Samples are produced a whole (size x d) block at a
+time with one matrix product, and ``batches`` yields a long run in blocks of
+``BATCH_SIZE`` rows.
+
+Normal and lognormal marginals are taken straight from the scores.  Other
+continuous marginals are read off a cached table of the marginal quantile at
+evenly spaced scores, ``F^-1(Phi(z))``, and discrete ones go through the
+normal CDF and their inverse CDF exactly.  With an identity
+correlation and pseudo-random sampling every marginal is drawn independently
+with ``distributions.draw``, so independent inputs give exactly the samples they
+gave before.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from cven_app.engine.distributions import draw, family, ppf
+from cven_app.engine.special import ndtr, ndtri
+from cven_app.engine.sampling import uniforms
+
+BATCH_SIZE = 250_000
+# Eigenvalues down to -EIG_TOL (relative to the largest) are treated as rounding noise
+EIG_TOL = 1e-10
+# Quantile tables span scores in [-SCORE_RANGE, SCORE_RANGE] (probabilities 1e-17 to 1 - 1e-17)
+SCORE_RANGE = 8.5
+SCORE_GRID = 8192
+
+
+@lru_cache(maxsize=128)
+def _factor(d, corr_bytes):
+    corr = np.frombuffer(corr_bytes).reshape(d, d)
+    if (not np.allclose(corr, corr.T) or not np.allclose(np.diag(corr), 1)
+            or np.abs(corr).max() > 1 + 1e-12):
+        raise ValueError('Correlation matrix must be symmetric with a unit diagonal and entries in [-1, 1]')
+    try:
+        factor = np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        # Singular (e.g. perfectly correlated inputs): any L with L L' = corr will do
+        w, v = np.linalg.eigh(corr)
+        if w[0] < -EIG_TOL * max(w[-1], 1.0):
+            raise ValueError('Correlation matrix is not positive semi-definite') from None
+        factor = v * np.sqrt(np.clip(w, 0, None))
+    factor.setflags(write=False)
+    return factor
+
+
+def cholesky(corr):
+    """Cached factor ``L`` with ``L @ L.T == corr`` (read-only; lower-triangular unless ``corr`` is singular).
+
+    The matrix is validated once, when it is first factorized.
+    """
+    corr = np.ascontiguousarray(corr, dtype=float)
+    if corr.ndim != 2 or corr.shape[0] != corr.shape[1]:
+        raise ValueError(f'Correlation matrix must be square, got shape {corr.shape}')
+    return _factor(len(corr), corr.tobytes())
+
+
+@lru_cache(maxsize=256)
+def _score_table(spec):
+    # Quantiles of a continuous marginal at evenly spaced normal scores
+    z = np.linspace(-SCORE_RANGE, SCORE_RANGE, SCORE_GRID)
+    table = ppf(spec, ndtr(z))
+    table.setflags(write=False)
+    return table
+
+
+def _from_scores(spec, z, out):
+    # Marginal samples from standard normal scores, written into ``out``
+    kind, *params = spec
+    if kind == 'normal':
+        np.multiply(z, params[1], out=out)
+        out += params[0]
+    elif kind == 'lognormal':
+        np.multiply(z, params[1], out=out)
+        out += params[0]
+        np.exp(out, out=out)
+    elif family(kind).discrete:
+        out[:] = ppf(spec, ndtr(z))
+    else:
+        table = _score_table(spec)
+        position = np.clip((z + SCORE_RANGE) * ((SCORE_GRID - 1) / (2 * SCORE_RANGE)), 0, SCORE_GRID - 1)
+        i = np.minimum(position.astype(np.intp), SCORE_GRID - 2)
+        position -= i
+        np.subtract(table[i + 1], table[i], out=out)
+        out *= position
+        out += table[i]
+
+
+class CorrelatedSampler:
+    """Samples of ``marginals`` (one spec per column) joined by a Gaussian copula with ``corr``."""
+
+    def __init__(self, marginals, corr=None):
+        self.marginals = [tuple(spec) for spec in marginals]
+        d = len(self.marginals)
+        self.corr = np.eye(d) if corr is None else np.asarray(corr, dtype=float)
+        if self.corr.shape != (d, d):
+            raise ValueError(f'Correlation matrix must be {d} x {d}, got {self.corr.shape}')
+        self.factor = cholesky(self.corr)
+        self.independent = np.array_equal(self.corr, np.eye(d))
+
+    @property
+    def dimensions(self):
+        return len(self.marginals)
+
+    def sample(self, size, rng, strategy='random'):
+        """(size x d) array of correlated samples; ``strategy`` is one of ``sampling.STRATEGIES``."""
+        # Built as (d x size) so each marginal works on a contiguous row; returned transposed
+        out = np.empty((self.dimensions, size))
+        if self.independent:
+            if strategy == 'random':
+                for j, spec in enumerate(self.marginals):
+                    out[j] = draw(spec, rng, size)
+            else:
+                u = uniforms(strategy, size, self.dimensions, rng)
+                for j, spec in enumerate(self.marginals):
+                    out[j] = ppf(spec, u[:, j])
+            return out.T
+        if strategy == 'random':
+            e = rng.standard_normal((self.dimensions, size))
+        else:
+            e = ndtri(uniforms(strategy, size, self.dimensions, rng).T)
+        z = self.factor @ e
+        for j, spec in enumerate(self.marginals):
+            _from_scores(spec, z[j], out[j])
+        return out.T
+
+    def batches(self, n, rng, batch_size=BATCH_SIZE, strategy='random'):
+        """Yield ``n`` samples as consecutive blocks of at most ``batch_size`` rows."""
+        for start in range(0, n, batch_size):
+            yield self.sample(min(batch_size, n - start), rng, strategy)
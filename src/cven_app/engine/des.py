@@ -0,0 +1,391 @@
+"""Discrete-event simulation of queues and equipment cycles.
+
+The kernel is event scheduling on a binary-heap calendar: ``Simulation``
+pops the earliest ``(time, sequence, action, entity)`` entry, advances the
+clock and calls ``action(entity)``, which may schedule further events.  The
+sequence number breaks ties in scheduling order, so runs are reproducible.
+
+* ``Entity`` - a vehicle, truck or job (``__slots__``, a few floats each).
+* ``Resource`` - ``capacity`` identical servers with a FIFO queue; it keeps
+  time-weighted busy and queue-length integrals and a tally of waits.
+* ``Simulation.stream(spec)`` - random variates of a distribution spec (see
+  ``distributions.REGISTRY``), drawn from the run's generator in blocks.
+
+``queue_model`` (toll plazas, intersection approaches, work-zone lanes) and
+``haul_model`` (loader and truck earthmoving cycles) build on the kernel.
+``replicate`` runs independent replications, one seed stream each (in worker
+processes above ``PARALLEL_THRESHOLD`` replications), and ``queue_replications``
+runs many replications of a multi-server FIFO queue at once with the
+Kiefer-Wolfowitz recursion, vectorized across replications.
+"""
+import heapq
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import count, repeat
+
+import numpy as np
+
+from cven_app.engine.distributions import draw
+from cven_app.engine.montecarlo import chunk_rng
+
+# Variates drawn per block by a stream
+STREAM_BLOCK = 4096
+PARALLEL_THRESHOLD = 64
+# Two-sided 95% Student t quantiles for small replication counts (df = 1..10)
+_T95 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228)
+
+
+class Entity:
+    __slots__ = ('id', 'created', 'queued')
+
+    def __init__(self, id, created):
+        self.id = id
+        self.created = created
+        self.queued = created       # when it last joined a queue
+
+
+class Tally:
+    """Count, mean, maximum and standard deviation of observations recorded one at a time."""
+    __slots__ = ('n', 'total', 'squares', 'max')
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.max = 0.0
+
+    def record(self, x):
+        self.n += 1
+        self.total += x
+        self.squares += x * x
+        if x > self.max:
+            self.max = x
+
+    @property
+    def mean(self):
+        return self.total / self.n if self.n else np.nan
+
+    def std(self):
+        if self.n < 2:
+            return np.nan
+        return np.sqrt(max(self.squares - self.total * self.total / self.n, 0.0) / (self.n - 1))
+
+
+class _Stream:
+    # Variates of one spec, handed out one at a time from a pre-drawn block
+    __slots__ = ('spec', 'rng', '_values')
+
+    def __init__(self, spec, rng):
+        self.spec = spec
+        self.rng = rng
+        self._values = iter(())
+
+    def __call__(self):
+        for value in self._values:
+            return value
+        self._values = iter(draw(self.spec, self.rng, STREAM_BLOCK).tolist())
+        return next(self._values)
+
+
+class Simulation:
+    def __init__(self, rng=None):
+        self.now = 0.0
+        self.events = 0
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._calendar = []
+        self._sequence = count()
+        self._resources = []
+
+    def schedule(self, delay, action, entity=None):
+        """Call ``action(entity)`` after ``delay`` time units."""
+        heapq.heappush(self._calendar, (self.now + delay, next(self._sequence), action, entity))
+
+    def stream(self, spec):
+        """Callable returning successive variates of ``spec``."""
+        return _Stream(spec, self.rng)
+
+    def resource(self, capacity=1):
+        resource = Resource(self, capacity)
+        self._resources.append(resource)
+        return resource
+
+    def reset_statistics(self, _=None):
+        """Start every resource's statistics afresh (the end of a warm-up period)."""
+        for resource in self._resources:
+            resource.reset(self.now)
+
+    def run(self, until=np.inf):
+        """Process events up to time ``until`` and return the number processed."""
+        calendar, pop = self._calendar, heapq.heappop
+        events = 0
+        while calendar and calendar[0][0] <= until:
+            self.now, _, action, entity = pop(calendar)
+            action(entity)
+            events += 1
+        if until < np.inf:
+            self.now = until
+        self.events += events
+        return events
+
+
+class Resource:
+    """``capacity`` identical servers with one FIFO queue."""
+    __slots__ = ('sim', 'capacity', 'busy', 'queue', 'waits', 'busy_area', 'queue_area', 'max_queue', 'start', '_last')
+
+    def __init__(self, sim, capacity=1):
+        self.sim = sim
+        self.capacity = capacity
+        self.busy = 0
+        self.queue = deque()
+        self.reset(sim.now)
+
+    def reset(self, now):
+        self.waits = Tally()
+        self.busy_area = 0.0            # integral of busy servers over time
+        self.queue_area = 0.0           # integral of queue length over time
+        self.max_queue = len(self.queue)
+        self.start = self._last = now
+
+    def _advance(self):
+        now = self.sim.now
+        elapsed = now - self._last
+        self.busy_area += self.busy * elapsed
+        self.queue_area += len(self.queue) * elapsed
+        self._last = now
+
+    def request(self, entity, then):
+        """Seize a server for ``entity`` and call ``then(entity)`` once it has one."""
+        self._advance()
+        if self.busy < self.capacity:
+            self.busy += 1
+            self.waits.record(0.0)
+            then(entity)
+        else:
+            entity.queued = self.sim.now
+            self.queue.append((entity, then))
+            if len(self.queue) > self.max_queue:
+                self.max_queue = len(self.queue)
+
+    def release(self):
+        """Free a server; the head of the queue, if any, takes it at once."""
+        self._advance()
+        if self.queue:
+            entity, then = self.queue.popleft()
+            self.waits.record(self.sim.now - entity.queued)
+            then(entity)
+        else:
+            self.busy -= 1
+
+    def utilization(self):
+        self._advance()
+        elapsed = self._last - self.start
+        return self.busy_area / (self.capacity * elapsed) if elapsed > 0 else np.nan
+
+    def mean_queue(self):
+        self._advance()
+        elapsed = self._last - self.start
+        return self.queue_area / elapsed if elapsed > 0 else np.nan
+
+
+def queue_model(sim, arrival, service, servers=1):
+    """Customers arriving with ``arrival`` gaps, served FIFO by ``servers`` with ``service`` times.
+
+    Returns ``(resource, time_in_system)``: the servers and a ``Tally`` of
+    each departed customer's time from arrival to departure.
+    """
+    resource = sim.resource(servers)
+    gap, service_time = sim.stream(arrival), sim.stream(service)
+    in_system = Tally()
+    ids = count()
+
+    def arrive(_):
+        resource.request(Entity(next(ids), sim.now), start)
+        sim.schedule(gap(), arrive)
+
+    def start(entity):
+        sim.schedule(service_time(), depart, entity)
+
+    def depart(entity):
+        resource.release()
+        in_system.record(sim.now - entity.created)
+
+    sim.schedule(gap(), arrive)
+    return resource, in_system
+
+
+def haul_model(sim, trucks, load, haul, dump, back, loaders=1):
+    """Trucks cycling between ``loaders`` (shared, FIFO) and a dump site.
+
+    Returns ``(loader, cycles, dumps)``: the loader resource, a ``Tally`` of
+    complete truck cycle times (loader arrival to the next loader arrival) and
+    a ``Tally`` of the time each load was dumped (its count is the production).
+    """
+    loader = sim.resource(loaders)
+    load_time, haul_time, dump_time, back_time = (sim.stream(spec) for spec in (load, haul, dump, back))
+    cycles, dumps = Tally(), Tally()
+
+    def arrive_at_loader(truck):
+        if sim.now > truck.created:
+            cycles.record(sim.now - truck.created)
+        truck.created = sim.now
+        loader.request(truck, start_loading)
+
+    def start_loading(truck):
+        sim.schedule(load_time(), loaded, truck)
+
+    def loaded(truck):
+        loader.release()
+        sim.schedule(haul_time() + dump_time(), dumped, truck)
+
+    def dumped(truck):
+        dumps.record(sim.now)
+        sim.schedule(back_time(), arrive_at_loader, truck)
+
+    for i in range(trucks):
+        sim.schedule(0.0, arrive_at_loader, Entity(i, 0.0))
+    return loader, cycles, dumps
+
+
+def _restart(objects):
+    # End of the warm-up: resource statistics and the model's tallies start afresh
+    sim, *tallies = objects
+    sim.reset_statistics()
+    for tally in tallies:
+        tally.__init__()
+
+
+def run_queue(rng, arrival, service, servers=1, horizon=480.0, warmup=0.0):
+    """One replication of ``queue_model``; returns its output measures."""
+    sim = Simulation(rng)
+    resource, in_system = queue_model(sim, arrival, service, servers)
+    if warmup:
+        sim.schedule(warmup, _restart, (sim, in_system))
+    sim.run(warmup + horizon)
+    return {
+        'served': in_system.n,
+        'mean_wait': resource.waits.mean,
+        'max_wait': resource.waits.max,
+        'mean_time_in_system': in_system.mean,
+        'mean_queue': resource.mean_queue(),
+        'max_queue': resource.max_queue,
+        'utilization': resource.utilization(),
+        'events': sim.events,
+    }
+
+
+def run_haul(rng, trucks, load, haul, dump, back, loaders=1, horizon=480.0, warmup=0.0):
+    """One replication of ``haul_model``; returns its output measures (production per unit time)."""
+    sim = Simulation(rng)
+    loader, cycles, dumps = haul_model(sim, trucks, load, haul, dump, back, loaders)
+    if warmup:
+        sim.schedule(warmup, _restart, (sim, cycles, dumps))
+    sim.run(warmup + horizon)
+    return {
+        'loads': dumps.n,
+        'production_rate': dumps.n / horizon,
+        'mean_cycle': cycles.mean,
+        'mean_truck_wait': loader.waits.mean,
+        'mean_queue': loader.mean_queue(),
+        'loader_utilization': loader.utilization(),
+        'events': sim.events,
+    }
+
+
+MODELS = {'queue': run_queue, 'haul': run_haul}
+
+
+def t95(df):
+    """Two-sided 95% Student t quantile (normal-limit expansion beyond the table)."""
+    if df <= len(_T95):
+        return _T95[df - 1]
+    z = 1.959964
+    return z + (z**3 + z) / (4 * df) + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * df**2)
+
+
+@dataclass
+class Replications:
+    """Output measures of independent replications, one array entry per replication."""
+    model: str
+    entropy: int
+    values: dict = field(default_factory=dict)
+
+    @property
+    def n(self):
+        return len(next(iter(self.values.values()), ()))
+
+    @property
+    def events(self):
+        return int(np.sum(self.values.get('events', 0)))
+
+    def mean(self, name):
+        return float(np.nanmean(self.values[name]))
+
+    def half_width(self, name):
+        """Half-width of the 95% confidence interval for the mean of ``name``."""
+        x = np.asarray(self.values[name], dtype=float)
+        x = x[np.isfinite(x)]
+        return t95(len(x) - 1) * x.std(ddof=1) / np.sqrt(len(x)) if len(x) > 1 else np.nan
+
+    def extend(self, results):
+        for result in results:
+            for name, value in result.items():
+                self.values.setdefault(name, []).append(value)
+
+
+def run_replication(model, params, entropy, k):
+    """Measures of replication ``k`` (picklable, for worker processes)."""
+    return MODELS[model](chunk_rng(entropy, k), **params)
+
+
+def run_replications(model, params, entropy, start, stop):
+    """Measures of replications ``start`` to ``stop - 1`` (one task for a worker process)."""
+    return [run_replication(model, params, entropy, k) for k in range(start, stop)]
+
+
+def replicate(model, params, replications, seed=None, workers=None):
+    """Run ``replications`` independent replications of ``MODELS[model]`` with ``params``.
+
+    Replication ``k`` uses the k-th child of the run's seed, so results do
+    not depend on the number of ``workers``.
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    result = Replications(model, entropy)
+    workers = workers or os.cpu_count() or 1
+    if replications < PARALLEL_THRESHOLD or workers == 1:
+        result.extend(run_replication(model, params, entropy, k) for k in range(replications))
+        return result
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        result.extend(pool.map(run_replication, repeat(model), repeat(params), repeat(entropy), range(replications),
+                               chunksize=max(1, replications // (4 * workers))))
+    return result
+
+
+def queue_replications(arrival, service, servers, customers, replications, seed=None, warmup=0):
+    """Waiting-time measures of ``replications`` FIFO queues with ``customers`` each, computed together.
+
+    Customer n starts service at max(arrival, earliest free server) and that
+    server is then busy until start + service (Kiefer-Wolfowitz); each step
+    is one vector operation across all replications.  The first ``warmup``
+    customers are simulated but left out of the measures.
+    """
+    rng = np.random.default_rng(seed)
+    arrivals = np.cumsum(draw(arrival, rng, (customers, replications)), axis=0)
+    services = draw(service, rng, (customers, replications))
+    free = np.zeros((replications, servers))
+    rows = np.arange(replications)
+    waits = np.empty((customers, replications))
+    for n in range(customers):
+        server = free.argmin(axis=1)
+        start = np.maximum(arrivals[n], free[rows, server])
+        waits[n] = start - arrivals[n]
+        free[rows, server] = start + services[n]
+    makespan = np.maximum(free.max(axis=1), arrivals[-1])
+    waits = waits[warmup:]
+    return {
+        'mean_wait': waits.mean(axis=0),
+        'max_wait': waits.max(axis=0),
+        'p_wait': (waits > 0).mean(axis=0),
+        'utilization': services.sum(axis=0) / (servers * makespan),
+    }
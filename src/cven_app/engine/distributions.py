@@ -0,0 +1,763 @@
+"""Registry of the probability distributions used by the simulation engine.
+
+A distribution spec is a tuple such as ``('normal', 500, 50)``: a family name
+followed by its parameters.  Every family in ``REGISTRY`` provides vectorized
+
+* ``sample(rng, size, *params)`` - pseudo-random draws,
+* ``ppf(u, *params)`` - quantiles, so stratified or quasi-random uniforms
+  (see ``engine.sampling``) can be turned into samples,
+* ``cdf(x, *params)`` and ``logpdf(x, *params)`` (the log pmf for discrete
+  families),
+* ``bounds(*params)`` - a range holding all but a negligible part of the
+  mass, for histograms,
+* ``fit(sample)`` - maximum-likelihood parameters for observed data,
+
+plus ``params``, a tuple of ``Param`` describing each parameter for the user
+interface.  The module-level ``draw``, ``ppf``, ``cdf`` and ``pdf`` dispatch a
+spec to its family, and a new family only needs a ``Distribution`` subclass
+decorated with ``@register``.
+
+``fit(data)`` computes the summary statistics of the data once
+(``Observations``) and fits every family from them; the fits are ranked by
+AIC, with the Kolmogorov-Smirnov distance as a check.  Families without a
+closed-form estimator are fitted by Newton iterations over whole-array sums
+(gamma, Weibull, beta) or by evaluating the log-likelihood over a grid of
+candidate parameters in one broadcast (triangular and beta-PERT, whose end
+points are searched on a grid of widenings beyond the sample range).
+``empirical(data)`` builds the piecewise-linear empirical distribution instead.
+"""
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from math import lgamma, log, pi, sqrt
+
+import numpy as np
+
+from cven_app.engine.special import (betainc, digamma, gammainc, gammaln, ndtr, ndtri, tail_lookup,
+                                     tail_table, trigamma)
+
+# Histogram ranges extend this many standard deviations (or the equivalent tail mass) each way
+SUPPORT_SIGMAS = 6
+TAIL = 1e-9
+# Grid points of the tabulated beta CDF (clustered towards both ends)
+BETA_GRID = 4096
+# Points of the tabulated gamma CDF, and of the quantile tables built from it
+GAMMA_GRID = 8192
+GAMMA_TABLE = 16384
+# Largest number of points kept by an empirical distribution
+EMPIRICAL_POINTS = 1000
+# Candidate widenings of the sample range (per side) and modes for triangular and PERT fits
+FIT_WIDENINGS = 16
+FIT_MODES = 1024
+# Above this many points, Kolmogorov-Smirnov distances interpolate the fitted CDF between
+# this many order statistics (smooth CDFs are costly to evaluate everywhere)
+KS_POINTS = 8192
+NEWTON_ITERATIONS = 100
+NEWTON_TOL = 1e-10
+
+REGISTRY = {}
+
+
+@dataclass(frozen=True)
+class Param:
+    """One parameter of a family, with the slider range shown for it."""
+    name: str
+    label: str
+    default: float
+    min: float
+    max: float
+    step: float = 1.0
+
+
+@dataclass
+class Fit:
+    """Maximum-likelihood fit of one family to a data set."""
+    kind: str
+    params: tuple
+    loglik: float
+    aic: float
+    ks: float
+
+    @property
+    def spec(self):
+        return (self.kind, *self.params)
+
+
+class Observations:
+    """Sorted finite data with the summary statistics the fits share, each computed once."""
+
+    def __init__(self, data):
+        x = np.asarray(data, dtype=float).ravel()
+        self.x = np.sort(x[np.isfinite(x)])
+        self.n = len(self.x)
+        if self.n < 2:
+            raise ValueError('At least two observations are needed to fit a distribution')
+        self.lo, self.hi = float(self.x[0]), float(self.x[-1])
+        self.mean = float(self.x.mean())
+        self.var = float(self.x.var())
+        self.integer = bool(np.all(self.x == np.round(self.x)))
+        self.positive = self.lo > 0
+        if self.positive:
+            self.log = np.log(self.x)
+            self.mean_log = float(self.log.mean())
+            self.var_log = float(self.log.var())
+        # Empirical CDF at and just below each point (ties share a step)
+        self.ecdf = np.searchsorted(self.x, self.x, 'right') / self.n
+        self.ecdf_below = np.searchsorted(self.x, self.x, 'left') / self.n
+
+    @cached_property
+    def ends(self):
+        """Candidate end points of a bounded family and the log sums its likelihood needs.
+
+        Returns ``(lows, highs, ranks, below, above)``: the sample range widened
+        by ``FIT_WIDENINGS`` distances (from a fraction of the average spacing
+        to half the range), candidate mode ranks, and for each candidate end
+        point the sums of ``log(x - low)`` over the points below each rank and
+        of ``log(high - x)`` over the points from it on (the last column of
+        ``below`` is the total over all points).
+        """
+        x, n = self.x, self.n
+        w = (self.hi - self.lo) * np.geomspace(0.1 / n, 0.5, FIT_WIDENINGS)
+        lows, highs = self.lo - w, self.hi + w
+        ranks = np.unique(np.linspace(0, n - 1, min(n, FIT_MODES)).astype(np.intp))
+        below = np.empty((len(w), len(ranks) + 1))
+        above = np.empty((len(w), len(ranks)))
+        for j in range(len(w)):
+            logs = np.log(x - lows[j])
+            left = np.cumsum(logs)
+            below[j, :-1] = (left - logs)[ranks]
+            below[j, -1] = left[-1]
+            above[j] = np.cumsum(np.log(highs[j] - x)[::-1])[::-1][ranks]
+        return lows, highs, ranks, below, above
+
+
+class Distribution:
+    """Base class of a family; subclasses set the class attributes and override what they need."""
+    name = ''
+    label = ''
+    params = ()
+    discrete = False
+    interactive = True     # offered in the user interface with sliders
+    estimated = None       # parameters a fit estimates, for AIC (default: all it returns)
+
+    def sample(self, rng, size, *params):
+        return self.ppf(rng.random(size), *params)
+
+    def ppf(self, u, *params):
+        raise NotImplementedError
+
+    def cdf(self, x, *params):
+        raise NotImplementedError
+
+    def logpdf(self, x, *params):
+        raise NotImplementedError
+
+    def pdf(self, x, *params):
+        with np.errstate(divide='ignore'):
+            return np.exp(self.logpdf(x, *params))
+
+    def bounds(self, *params):
+        lo, hi = self.ppf(np.array([TAIL, 1 - TAIL]), *params)
+        return float(lo), float(hi)
+
+    def fit(self, sample):
+        """Maximum-likelihood parameters for an ``Observations``, or None if the family does not apply."""
+        return None
+
+    def spec(self, values):
+        """Spec from parameter values keyed by name, e.g. slider positions."""
+        return (self.name, *(values[p.name] for p in self.params))
+
+
+def register(cls):
+    """Class decorator adding a family to ``REGISTRY``."""
+    REGISTRY[cls.name] = cls()
+    return cls
+
+
+def family(kind):
+    """The registered family called ``kind``."""
+    try:
+        return REGISTRY[kind]
+    except KeyError:
+        raise ValueError(f'Unknown distribution: {kind!r}') from None
+
+
+def draw(spec, rng, size):
+    """Sample ``size`` values from a spec such as ``('triangular', low, mode, high)``."""
+    kind, *params = spec
+    return family(kind).sample(rng, size, *params)
+
+
+def ppf(spec, u):
+    """Quantiles of ``spec`` at probabilities ``u`` (the inverse-CDF transform)."""
+    kind, *params = spec
+    return family(kind).ppf(np.asarray(u, dtype=float), *params)
+
+
+def cdf(spec, x):
+    """Cumulative distribution function of ``spec`` at ``x``."""
+    kind, *params = spec
+    return family(kind).cdf(np.asarray(x, dtype=float), *params)
+
+
+def pdf(spec, x):
+    """Density (probability mass for discrete families) of ``spec`` at ``x``."""
+    kind, *params = spec
+    return family(kind).pdf(np.asarray(x, dtype=float), *params)
+
+
+def _between(x, lo, hi, inside, below=0.0, above=1.0):
+    # ``inside`` evaluated where lo < x < hi, constants elsewhere
+    out = np.where(x <= lo, below, above)
+    mask = (x > lo) & (x < hi)
+    out[mask] = inside(x[mask])
+    return out
+
+
+def ks_distance(sample, fitted):
+    """Kolmogorov-Smirnov distance between the data of an ``Observations`` and a spec."""
+    x = sample.x
+    if family(fitted[0]).discrete:
+        # The fitted CDF just below an integer x is F(x - 1)
+        f, f_below = cdf(fitted, x), cdf(fitted, x - 1)
+    elif fitted[0] == 'constant':
+        # A point mass: the CDF jumps from 0 to 1 at the value
+        f, f_below = cdf(fitted, x), (x > fitted[1]).astype(float)
+    else:
+        if sample.n > KS_POINTS:
+            knots = x[np.linspace(0, sample.n - 1, KS_POINTS).astype(np.intp)]
+            f = np.interp(x, knots, cdf(fitted, knots))
+        else:
+            f = cdf(fitted, x)
+        f_below = f
+    return float(max(np.abs(sample.ecdf - f).max(), np.abs(sample.ecdf_below - f_below).max()))
+
+
+def fit(data, kinds=None):
+    """Fits of every applicable family (or only ``kinds``) to ``data``, best AIC first.
+
+    Likelihoods of discrete families are probabilities and those of
+    continuous families densities, so their AICs are not comparable: for
+    integer data the discrete fits are ranked first, each group by AIC.
+    Data that are all equal are fitted only by the constant family.
+    """
+    sample = data if isinstance(data, Observations) else Observations(data)
+    fits = []
+    for kind, dist in REGISTRY.items():
+        if kinds is not None and kind not in kinds:
+            continue
+        if sample.lo == sample.hi and kind != 'constant':
+            continue
+        params = dist.fit(sample)
+        if params is None:
+            continue
+        params = tuple(float(p) for p in params)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            loglik = float(dist.logpdf(sample.x, *params).sum())
+        if not np.isfinite(loglik):
+            continue
+        fits.append(Fit(kind, params, loglik, 2 * (dist.estimated or len(params)) - 2 * loglik,
+                        ks_distance(sample, (kind, *params))))
+    return sorted(fits, key=lambda f: (not family(f.kind).discrete, f.aic))
+
+
+def empirical(data, points=EMPIRICAL_POINTS):
+    """Spec of the empirical distribution of ``data``, kept to at most ``points`` quantiles."""
+    x = np.sort(np.asarray(data, dtype=float).ravel())
+    x = x[np.isfinite(x)]
+    if len(x) < 2:
+        raise ValueError('At least two observations are needed for an empirical distribution')
+    if len(x) > points:
+        x = np.quantile(x, np.linspace(0, 1, points))
+    return ('empirical', *x.tolist())
+
+
+def _newton(step, x, lower=0.0):
+    # Newton iterations x -= step(x), halving towards ``lower`` instead of stepping past it
+    for _ in range(NEWTON_ITERATIONS):
+        delta = step(x)
+        new = x - delta
+        x = new if new > lower else (x + lower) / 2
+        if abs(delta) < NEWTON_TOL * abs(x):
+            break
+    return x
+
+
+@register
+class Constant(Distribution):
+    name = 'constant'
+    label = 'Constant'
+    params = (Param('value', 'Value', 500, 0, 1000),)
+    interactive = False
+
+    def sample(self, rng, size, value):
+        return np.full(size, float(value))
+
+    def ppf(self, u, value):
+        return np.full(u.shape, float(value))
+
+    def cdf(self, x, value):
+        return (x >= value).astype(float)
+
+    def logpdf(self, x, value):
+        return np.where(x == value, 0.0, -np.inf)
+
+    def bounds(self, value):
+        return value, value
+
+    def fit(self, sample):
+        return (sample.lo,) if sample.lo == sample.hi else None
+
+
+@register
+class Normal(Distribution):
+    name = 'normal'
+    label = 'Normal'
+    params = (Param('mean', 'Mean (μ)', 500, 0, 1000), Param('sd', 'Std Dev (σ)', 50, 1, 200))
+
+    def sample(self, rng, size, mean, sd):
+        return rng.normal(mean, sd, size)
+
+    def ppf(self, u, mean, sd):
+        return mean + sd * ndtri(u)
+
+    def cdf(self, x, mean, sd):
+        return ndtr((x - mean) / sd)
+
+    def logpdf(self, x, mean, sd):
+        return -0.5 * ((x - mean) / sd) ** 2 - np.log(sd * sqrt(2 * pi))
+
+    def bounds(self, mean, sd):
+        sd = sd or 1.0
+        return mean - SUPPORT_SIGMAS * sd, mean + SUPPORT_SIGMAS * sd
+
+    def fit(self, sample):
+        return sample.mean, sqrt(sample.var)
+
+
+@register
+class Uniform(Distribution):
+    name = 'uniform'
+    label = 'Uniform'
+    params = (Param('low', 'Min', 400, 0, 1000), Param('high', 'Max', 600, 0, 1000))
+
+    def sample(self, rng, size, low, high):
+        return rng.uniform(low, high, size)
+
+    def ppf(self, u, low, high):
+        return low + (high - low) * u
+
+    def cdf(self, x, low, high):
+        return _between(x, low, high, lambda x: (x - low) / (high - low))
+
+    def logpdf(self, x, low, high):
+        return np.where((x >= low) & (x <= high), -np.log(high - low), -np.inf)
+
+    def bounds(self, low, high):
+        return low, high
+
+    def fit(self, sample):
+        return sample.lo, sample.hi
+
+    def spec(self, values):
+        return (self.name, *sorted((values['low'], values['high'])))
+
+
+@register
+class Triangular(Distribution):
+    name = 'triangular'
+    label = 'Triangular'
+    params = (Param('low', 'Min', 350, 0, 1000), Param('mode', 'Most Likely', 450, 0, 1000),
+              Param('high', 'Max', 700, 0, 1000))
+
+    def sample(self, rng, size, low, mode, high):
+        if low == high:
+            return np.full(size, float(low))
+        return rng.triangular(low, mode, high, size)
+
+    def ppf(self, u, low, mode, high):
+        if low == high:
+            return np.full(u.shape, float(low))
+        split = (mode - low) / (high - low)
+        with np.errstate(invalid='ignore'):
+            left = low + np.sqrt(u * (high - low) * (mode - low))
+            right = high - np.sqrt((1 - u) * (high - low) * (high - mode))
+        return np.where(u < split, left, right)
+
+    def cdf(self, x, low, mode, high):
+        def inside(x):
+            left = (x - low) ** 2 / ((high - low) * (mode - low)) if mode > low else 0.0
+            right = 1 - (high - x) ** 2 / ((high - low) * (high - mode)) if high > mode else 1.0
+            return np.where(x < mode, left, right)
+        return _between(x, low, high, inside)
+
+    def logpdf(self, x, low, mode, high):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            side = np.where(x < mode, (x - low) / (mode - low), (high - x) / (high - mode))
+            return np.where((x >= low) & (x <= high), np.log(2 * side / (high - low)), -np.inf)
+
+    def bounds(self, low, mode, high):
+        return low, high
+
+    def fit(self, sample):
+        # Profile log-likelihood over (low, high, mode) in one broadcast, from the log sums
+        # below and above each candidate mode (an order statistic, where the maximum lies)
+        lows, highs, ranks, below, above = sample.ends
+        n, modes = sample.n, sample.x[ranks]
+        left = below[:, :-1] - ranks * np.log(modes - lows[:, None])
+        right = above - (n - ranks) * np.log(highs[:, None] - modes)
+        loglik = (left[:, None, :] + right[None, :, :]
+                  - n * np.log(highs[None, :] - lows[:, None])[:, :, None])
+        i, j, k = np.unravel_index(np.argmax(loglik), loglik.shape)
+        return lows[i], modes[k], highs[j]
+
+    def spec(self, values):
+        return (self.name, *sorted((values['low'], values['mode'], values['high'])))
+
+
+def _pert_shape(low, mode, high):
+    # Beta-PERT: a beta distribution on [low, high] with mean (low + 4 mode + high) / 6
+    if high == low:
+        return 1.0, 1.0
+    return 1 + 4 * (mode - low) / (high - low), 1 + 4 * (high - mode) / (high - low)
+
+
+@register
+class Pert(Distribution):
+    name = 'pert'
+    label = 'Beta-PERT'
+    params = Triangular.params
+
+    def sample(self, rng, size, low, mode, high):
+        a, b = _pert_shape(low, mode, high)
+        return low + (high - low) * rng.beta(a, b, size)
+
+    def ppf(self, u, low, mode, high):
+        return REGISTRY['beta'].ppf(u, *_pert_shape(low, mode, high), low, high)
+
+    def cdf(self, x, low, mode, high):
+        return REGISTRY['beta'].cdf(x, *_pert_shape(low, mode, high), low, high)
+
+    def logpdf(self, x, low, mode, high):
+        return REGISTRY['beta'].logpdf(x, *_pert_shape(low, mode, high), low, high)
+
+    def bounds(self, low, mode, high):
+        return low, high
+
+    def fit(self, sample):
+        # The shape depends only on where the mode sits in [low, high], so the log-likelihood
+        # over (low, high, relative mode) needs just the total log sums for each end point
+        lows, highs, _, below, above = sample.ends
+        n = sample.n
+        m = np.linspace(0, 1, FIT_MODES + 1)
+        a, b = 1 + 4 * m, 1 + 4 * (1 - m)
+        log_beta = gammaln(a) + gammaln(b) - gammaln(a + b)
+        sum_low, sum_high = below[:, -1], above[:, 0]
+        # a + b - 1 = 5 for every PERT shape
+        loglik = ((a - 1) * sum_low[:, None, None] + (b - 1) * sum_high[None, :, None]
+                  - 5 * n * np.log(highs[None, :] - lows[:, None])[:, :, None] - n * log_beta)
+        i, j, k = np.unravel_index(np.argmax(loglik), loglik.shape)
+        return lows[i], lows[i] + m[k] * (highs[j] - lows[i]), highs[j]
+
+    def spec(self, values):
+        return (self.name, *sorted((values['low'], values['mode'], values['high'])))
+
+
+@register
+class Exponential(Distribution):
+    name = 'exponential'
+    label = 'Exponential'
+    params = (Param('mean', 'Mean', 100, 1, 500),)
+
+    def sample(self, rng, size, mean):
+        return rng.exponential(mean, size)
+
+    def ppf(self, u, mean):
+        return -mean * np.log1p(-u)
+
+    def cdf(self, x, mean):
+        return -np.expm1(-np.maximum(x, 0) / mean)
+
+    def logpdf(self, x, mean):
+        return np.where(x >= 0, -x / mean - log(mean), -np.inf)
+
+    def bounds(self, mean):
+        # P(X > 2 * SUPPORT_SIGMAS means) = e^-12
+        return 0.0, 2 * SUPPORT_SIGMAS * mean or 1.0
+
+    def fit(self, sample):
+        if sample.lo < 0 or sample.mean <= 0:
+            return None
+        return (sample.mean,)
+
+
+@register
+class Lognormal(Distribution):
+    name = 'lognormal'
+    label = 'Lognormal'
+    params = (Param('mu', 'Log Mean (μ)', 6, 0, 8, 0.05), Param('sigma', 'Log Std Dev (σ)', 0.25, 0.05, 1.5, 0.05))
+
+    def sample(self, rng, size, mu, sigma):
+        return rng.lognormal(mu, sigma, size)
+
+    def ppf(self, u, mu, sigma):
+        return np.exp(mu + sigma * ndtri(u))
+
+    def cdf(self, x, mu, sigma):
+        with np.errstate(divide='ignore'):
+            return ndtr((np.log(np.maximum(x, 0)) - mu) / sigma)
+
+    def logpdf(self, x, mu, sigma):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_x = np.log(x)
+            return np.where(x > 0, -0.5 * ((log_x - mu) / sigma) ** 2 - log_x - log(sigma * sqrt(2 * pi)), -np.inf)
+
+    def bounds(self, mu, sigma):
+        return 0.0, float(np.exp(mu + SUPPORT_SIGMAS * sigma)) or 1.0
+
+    def fit(self, sample):
+        if not sample.positive or sample.var_log == 0:
+            return None
+        return sample.mean_log, sqrt(sample.var_log)
+
+
+@lru_cache(maxsize=64)
+def _beta_tables(a, b):
+    # log x against log CDF (lower half) and log(1 - x) against log(1 - CDF) (upper half):
+    # the CDF is a power law x^a near 0 and 1 - (1 - x)^b near 1, so both are close to linear
+    x = (1 - np.cos(np.pi * np.arange(1, BETA_GRID) / BETA_GRID)) / 2
+    p, q = betainc(a, b, x)
+    return tail_table(p, np.log(x)), tail_table(q[::-1], np.log1p(-x[::-1]))
+
+
+@register
+class Beta(Distribution):
+    name = 'beta'
+    label = 'Beta'
+    params = (Param('a', 'Shape α', 2, 0.5, 20, 0.5), Param('b', 'Shape β', 5, 0.5, 20, 0.5),
+              Param('low', 'Min', 300, 0, 1000), Param('high', 'Max', 700, 0, 1000))
+    estimated = 2
+
+    def sample(self, rng, size, a, b, low=0.0, high=1.0):
+        return low + (high - low) * rng.beta(a, b, size)
+
+    def ppf(self, u, a, b, low=0.0, high=1.0):
+        lower_table, upper_table = _beta_tables(float(a), float(b))
+        y = np.empty_like(u)
+        lower = u <= 0.5
+        with np.errstate(divide='ignore'):
+            y[lower] = np.exp(tail_lookup(np.log(u[lower]), lower_table))
+            y[~lower] = -np.expm1(tail_lookup(np.log1p(-u[~lower]), upper_table))
+        return low + (high - low) * y
+
+    def cdf(self, x, a, b, low=0.0, high=1.0):
+        return _between(x, low, high, lambda x: betainc(a, b, (x - low) / (high - low))[0])
+
+    def logpdf(self, x, a, b, low=0.0, high=1.0):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y = (x - low) / (high - low)
+            log_pdf = ((a - 1) * np.log(y) + (b - 1) * np.log1p(-y)
+                       - (lgamma(a) + lgamma(b) - lgamma(a + b)) - log(high - low))
+            return np.where((y >= 0) & (y <= 1), log_pdf, -np.inf)
+
+    def bounds(self, a, b, low=0.0, high=1.0):
+        return low, high
+
+    def fit(self, sample):
+        # Proportions only (data inside (0, 1), so the bounds are not estimated); bounded data
+        # in general is what PERT is for.  Newton's method on the score equations, from
+        # method-of-moments starting values.
+        if not sample.positive or sample.hi >= 1:
+            return None
+        s1, s2 = sample.mean_log, float(np.log1p(-sample.x).mean())
+        common = sample.mean * (1 - sample.mean) / sample.var - 1
+        a, b = max(sample.mean * common, 0.1), max((1 - sample.mean) * common, 0.1)
+        for _ in range(NEWTON_ITERATIONS):
+            ga, gb = digamma(a + b) - digamma(a) + s1, digamma(a + b) - digamma(b) + s2
+            t, ta, tb = trigamma(a + b), trigamma(a), trigamma(b)
+            det = (t - ta) * (t - tb) - t * t
+            da, db = ((t - tb) * ga - t * gb) / det, ((t - ta) * gb - t * ga) / det
+            a, b = (a - da if a - da > 0 else a / 2), (b - db if b - db > 0 else b / 2)
+            if abs(da) < NEWTON_TOL * a and abs(db) < NEWTON_TOL * b:
+                break
+        return a, b, 0.0, 1.0
+
+    def spec(self, values):
+        return (self.name, values['a'], values['b'], *sorted((values['low'], values['high'])))
+
+
+@register
+class Weibull(Distribution):
+    name = 'weibull'
+    label = 'Weibull'
+    params = (Param('shape', 'Shape (k)', 2, 0.5, 10, 0.1), Param('scale', 'Scale (λ)', 500, 1, 1000))
+
+    def sample(self, rng, size, shape, scale):
+        return scale * rng.weibull(shape, size)
+
+    def ppf(self, u, shape, scale):
+        return scale * (-np.log1p(-u)) ** (1 / shape)
+
+    def cdf(self, x, shape, scale):
+        return -np.expm1(-(np.maximum(x, 0) / scale) ** shape)
+
+    def logpdf(self, x, shape, scale):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = x / scale
+            return np.where(x > 0, log(shape / scale) + (shape - 1) * np.log(z) - z ** shape, -np.inf)
+
+    def fit(self, sample):
+        # The shape solves sum(x^k log x) / sum(x^k) - 1/k = mean(log x); x is scaled by its
+        # maximum so x^k cannot overflow.  Starts from the moment estimate of the log-spread.
+        if not sample.positive or sample.var_log == 0:
+            return None
+        log_z = sample.log - sample.log[-1]
+        mean_log_z = sample.mean_log - sample.log[-1]
+
+        def step(k):
+            w = np.exp(k * log_z)
+            s0, s1, s2 = w.sum(), (w * log_z).sum(), (w * log_z * log_z).sum()
+            return (s1 / s0 - 1 / k - mean_log_z) / (s2 / s0 - (s1 / s0) ** 2 + 1 / k ** 2)
+
+        k = _newton(step, pi / sqrt(6 * sample.var_log))
+        return k, sample.hi * np.exp(k * log_z).mean() ** (1 / k)
+
+
+@lru_cache(maxsize=64)
+def _gamma_tables(shape):
+    # Unit-scale gamma: log x against log CDF (lower half; a power law x^k near 0) and
+    # x against log(1 - CDF) (upper half; nearly linear, since 1 - CDF ~ x^(k-1) e^-x),
+    # from where the CDF is about 1e-18 to well past where 1 - CDF is
+    start = np.exp((np.log(1e-18) + lgamma(shape + 1)) / shape)
+    x = np.geomspace(max(start, 1e-300), shape + 10 * sqrt(shape) + 45, GAMMA_GRID)
+    p, q = gammainc(shape, x)
+    return tail_table(p, np.log(x), GAMMA_TABLE), tail_table(q[::-1], x[::-1], GAMMA_TABLE)
+
+
+@register
+class Gamma(Distribution):
+    name = 'gamma'
+    label = 'Gamma'
+    params = (Param('shape', 'Shape (k)', 9, 0.5, 50, 0.5), Param('scale', 'Scale (θ)', 50, 1, 200))
+
+    def sample(self, rng, size, shape, scale):
+        return rng.gamma(shape, scale, size)
+
+    def ppf(self, u, shape, scale):
+        lower_table, upper_table = _gamma_tables(float(shape))
+        out = np.empty_like(u)
+        lower = u <= 0.5
+        with np.errstate(divide='ignore'):
+            out[lower] = np.exp(tail_lookup(np.log(u[lower]), lower_table))
+            out[~lower] = tail_lookup(np.log1p(-u[~lower]), upper_table)
+        return scale * out
+
+    def cdf(self, x, shape, scale):
+        return _between(x, 0.0, np.inf, lambda x: gammainc(shape, x / scale)[0])
+
+    def logpdf(self, x, shape, scale):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(x > 0, (shape - 1) * np.log(x) - x / scale - lgamma(shape) - shape * log(scale), -np.inf)
+
+    def fit(self, sample):
+        # The shape solves log k - digamma(k) = log(mean) - mean(log x), from Minka's approximation
+        if not sample.positive or sample.var_log == 0:
+            return None
+        s = log(sample.mean) - sample.mean_log
+        k = _newton(lambda k: (log(k) - digamma(k) - s) / (1 / k - trigamma(k)),
+                    (3 - s + sqrt((s - 3) ** 2 + 24 * s)) / (12 * s))
+        return k, sample.mean / k
+
+
+@register
+class Empirical(Distribution):
+    """Piecewise-linear CDF through the sorted values, ``('empirical', x_0, ..., x_m)``."""
+    name = 'empirical'
+    label = 'Empirical'
+    interactive = False
+
+    def ppf(self, u, *values):
+        return np.interp(u * (len(values) - 1), np.arange(len(values)), values)
+
+    def cdf(self, x, *values):
+        return np.interp(x, values, np.linspace(0, 1, len(values)))
+
+    def logpdf(self, x, *values):
+        values = np.asarray(values)
+        i = np.clip(np.searchsorted(values, x, 'right') - 1, 0, len(values) - 2)
+        with np.errstate(divide='ignore'):
+            density = -np.log((len(values) - 1) * (values[i + 1] - values[i]))
+        return np.where((x >= values[0]) & (x <= values[-1]), density, -np.inf)
+
+    def bounds(self, *values):
+        return values[0], values[-1]
+
+
+@register
+class Integers(Distribution):
+    name = 'integers'
+    label = 'Discrete Uniform'
+    params = (Param('low', 'Min', 1, 0, 100), Param('high', 'Max', 6, 0, 100))
+    discrete = True
+
+    def sample(self, rng, size, low, high):
+        return rng.integers(low, high, size, endpoint=True)
+
+    def ppf(self, u, low, high):
+        return np.minimum(np.floor(low + u * (high - low + 1)), high)
+
+    def cdf(self, x, low, high):
+        return np.clip((np.floor(x) - low + 1) / (high - low + 1), 0, 1)
+
+    def logpdf(self, x, low, high):
+        return np.where((x == np.floor(x)) & (x >= low) & (x <= high), -log(high - low + 1), -np.inf)
+
+    def bounds(self, low, high):
+        return low, high
+
+    def fit(self, sample):
+        return (sample.lo, sample.hi) if sample.integer else None
+
+    def spec(self, values):
+        return (self.name, *sorted((int(values['low']), int(values['high']))))
+
+
+@lru_cache(maxsize=256)
+def _poisson_cdf(lam):
+    # Cumulative pmf up to a point past any practical draw, built in log space (read-only)
+    k = np.arange(int(np.ceil(lam + 12 * np.sqrt(lam) + 12)) + 1)
+    log_pmf = k * np.log(lam) - lam - np.concatenate(([0.0], np.cumsum(np.log(k[1:]))))
+    table = np.cumsum(np.exp(log_pmf))
+    table.setflags(write=False)
+    return table
+
+
+@register
+class Poisson(Distribution):
+    name = 'poisson'
+    label = 'Poisson'
+    params = (Param('lam', 'Lambda (λ)', 10, 1, 50, 0.5),)
+    discrete = True
+
+    def sample(self, rng, size, lam):
+        return rng.poisson(lam, size)
+
+    def ppf(self, u, lam):
+        # Smallest k with CDF(k) >= u
+        table = _poisson_cdf(float(lam))
+        return np.minimum(np.searchsorted(table, u), len(table) - 1).astype(float)
+
+    def cdf(self, x, lam):
+        table = _poisson_cdf(float(lam))
+        k = np.floor(x)
+        return np.where(k < 0, 0.0, table[np.clip(k, 0, len(table) - 1).astype(np.intp)])
+
+    def logpdf(self, x, lam):
+        log_pmf = x * log(lam) - lam - gammaln(np.maximum(x, 0) + 1)
+        return np.where((x == np.floor(x)) & (x >= 0), log_pmf, -np.inf)
+
+    def bounds(self, lam):
+        return 0, int(np.ceil(lam + SUPPORT_SIGMAS * np.sqrt(lam) + SUPPORT_SIGMAS))
+
+    def fit(self, sample):
+        return (sample.mean,) if sample.integer and sample.lo >= 0 and sample.mean > 0 else None
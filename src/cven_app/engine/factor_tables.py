@@ -0,0 +1,76 @@
+"""Precomputed compound-interest factor tables.
+
+All standard factors are evaluated once over an i-grid x n-grid and stored in
+a single (factor, rate, period) array.  A lookup is index arithmetic on the
+uniform rate grid, so on-grid (i, n) pairs cost O(1); off-grid rates are
+linearly interpolated between the two neighbouring rows, as with printed
+tables.  Pairs outside the table fall back to the closed forms in
+``engine.tvm``.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from cven_app.engine import tvm
+
+
+class InterestTable:
+    def __init__(self, i_max=0.5, i_step=0.001, n_max=120):
+        self.i_step = i_step
+        self.rates = np.arange(int(round(i_max / i_step)) + 1) * i_step
+        self.periods = np.arange(n_max + 1)
+        self.factors = list(tvm.FACTORS)
+        self._slot = {name: k for k, name in enumerate(self.factors)}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.stack([fn(self.rates[:, None], self.periods) for fn in tvm.FACTORS.values()])
+        values.setflags(write=False)
+        self.values = values
+
+    def lookup(self, factor, i, n):
+        """Factor value for broadcast arrays of rates ``i`` and periods ``n``."""
+        table = self.values[self._slot[factor]]
+        last_row, last_col = table.shape[0] - 1, table.shape[1] - 1
+        if np.ndim(i) == 0 and np.ndim(n) == 0:
+            # Scalar fast path for UI callbacks
+            pos = float(i) / self.i_step
+            row = round(pos)
+            if abs(pos - row) < 1e-9 and 0 <= row <= last_row and float(n).is_integer() and 0 <= n <= last_col:
+                return table[row, int(n)]
+        i, n = np.broadcast_arrays(np.asarray(i, dtype=float), np.asarray(n, dtype=float))
+        pos = i / self.i_step
+        row = np.rint(pos)
+        inside = (row >= 0) & (row <= last_row) & (n >= 0) & (n <= last_col) & (n == np.floor(n))
+        exact = np.abs(pos - row) < 1e-9
+        if (inside & exact).all():
+            return table.ravel()[(row * table.shape[1] + n).astype(np.intp)]
+        # Off-grid rates: interpolate linearly between neighbouring rows
+        row = np.clip(np.floor(pos + 1e-9), 0, last_row - 1).astype(int)
+        weight = pos - row
+        col = np.clip(n, 0, last_col).astype(int)
+        inside = (pos > -1e-9) & (pos < last_row + 1e-9) & (col == n)
+        lo = table[row, col]
+        hi = table[row + 1, col]
+        with np.errstate(invalid='ignore'):
+            value = np.where(weight < 1e-9, lo, np.where(weight > 1 - 1e-9, hi, lo + (hi - lo) * weight))
+        if inside.all():
+            return value
+        return np.where(inside, value, tvm.FACTORS[factor](i, n))
+
+    def table(self, i):
+        """Textbook-style table for one rate: one row per period, one column per factor."""
+        n = self.periods[1:]
+        frame = pd.DataFrame({name: self.lookup(name, i, n) for name in self.factors}, index=n)
+        frame.index.name = 'n'
+        return frame
+
+    def to_csv(self, path, rates):
+        """Export textbook tables for several rates to one CSV file."""
+        frames = [self.table(i).assign(i=i).reset_index() for i in np.atleast_1d(rates)]
+        pd.concat(frames).loc[:, ['i', 'n'] + self.factors].to_csv(path, index=False)
+
+
+@lru_cache(maxsize=1)
+def default_table():
+    """Shared table covering 0-50% in 0.1% steps and 0-120 periods."""
+    return InterestTable()
@@ -0,0 +1,85 @@
+"""Incremental IRR selection among many mutually exclusive alternatives.
+
+Alternatives are sorted by first cost and challenged in that order against
+the current defender.  Rather than solving one incremental IRR at a time, the
+next block of challengers is solved against the defender in a single batched
+``irr`` call; everything up to the first accepted challenger is recorded in
+the trail and the rest of the block is re-queued against the new defender.
+Block sizes grow while the defender holds and shrink after it changes, so the
+total work stays close to linear in the number of alternatives.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from cven_app.engine import irr as irr_engine
+from cven_app.engine.cashflow import as_matrix, npv
+
+MIN_BLOCK = 8
+MAX_BLOCK = 4096
+DO_NOTHING = 'Do nothing'
+
+
+@dataclass
+class IncrementalResult:
+    chosen: object         # name of the selected alternative
+    chosen_index: int      # its row in the input (-1 for do-nothing)
+    trail: pd.DataFrame    # one row per defender/challenger comparison
+
+
+def incremental_analysis(cashflows, marr, names=None, do_nothing=True):
+    """Select the best alternative by incremental IRR against ``marr``.
+
+    A challenger replaces the defender when its incremental IRR is at least
+    the MARR.  When the incremental cash flow has no IRR or several, the
+    decision falls back to the equivalent incremental PW at the MARR.  With
+    ``do_nothing`` the first defender is the null alternative; otherwise it is
+    the cheapest alternative.
+    """
+    flows = as_matrix(cashflows)
+    m = flows.shape[0]
+    names = list(names) if names is not None else list(range(m))
+    order = np.argsort(-flows[:, 0], kind='stable')
+    if do_nothing:
+        defender, queue = -1, order
+    else:
+        defender, queue = int(order[0]), order[1:]
+    zero = np.zeros(flows.shape[1])
+
+    records = []
+    pos, block = 0, MIN_BLOCK
+    while pos < len(queue):
+        challengers = queue[pos:pos + block]
+        delta = flows[challengers] - (zero if defender < 0 else flows[defender])
+        result = irr_engine.irr(delta)
+        delta_pw = npv(delta, marr)
+        unique = result.n_roots == 1
+        accept = np.where(unique, result.irr >= marr, delta_pw >= 0)
+        hit = np.flatnonzero(accept)
+        stop = hit[0] + 1 if hit.size else len(challengers)
+        for k in range(stop):
+            records.append({
+                'defender': DO_NOTHING if defender < 0 else names[defender],
+                'challenger': names[challengers[k]],
+                'delta_first_cost': -delta[k, 0],
+                'delta_irr': result.irr[k] if unique[k] else np.nan,
+                'roots': int(result.n_roots[k]),
+                'delta_pw_at_marr': delta_pw[k],
+                'decision': 'accept' if accept[k] else 'reject',
+            })
+        pos += stop
+        if hit.size:
+            defender = int(challengers[hit[0]])
+            block = MIN_BLOCK
+        else:
+            block = min(block * 2, MAX_BLOCK)
+
+    trail = pd.DataFrame(records, columns=['defender', 'challenger', 'delta_first_cost', 'delta_irr',
+                                           'roots', 'delta_pw_at_marr', 'decision'])
+    trail.index.name = 'step'
+    return IncrementalResult(
+        chosen=DO_NOTHING if defender < 0 else names[defender],
+        chosen_index=defender,
+        trail=trail,
+    )
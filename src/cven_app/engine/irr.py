@@ -0,0 +1,189 @@
+"""Batched internal rate of return solver for arbitrary cash-flow vectors.
+
+Roots are bracketed by scanning NPV on a fixed rate grid (one matrix product
+per block of projects) and then polished with a safeguarded Newton method that
+falls back to bisection whenever a Newton step leaves its bracket.  Every
+bracket of every project is refined at the same time, so projects with several
+sign changes report all of their roots.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from cven_app.engine import tvm
+from cven_app.engine.cashflow import as_matrix, discount_matrix
+
+# Scan grid: uniform in log(1 + r) from -95% to +1000% so that both negative
+# and very large IRRs are bracketed with the same relative resolution.
+SCAN_GRID = np.expm1(np.linspace(np.log(0.05), np.log(11.0), 401))
+BLOCK_ROWS = 4096
+
+
+@dataclass
+class IRRResult:
+    irr: np.ndarray          # primary root per project (NaN when none exists)
+    roots: np.ndarray        # all bracketed roots, NaN-padded, shape (projects, max_roots)
+    n_roots: np.ndarray      # number of roots found in the scan range
+    sign_changes: np.ndarray  # Descartes bound on the number of positive-x roots
+    converged: np.ndarray    # every root of the project met the tolerance
+
+    @property
+    def multiple(self):
+        return self.n_roots > 1
+
+    @property
+    def missing(self):
+        return self.n_roots == 0
+
+
+def sign_changes(cashflows):
+    """Number of sign changes in each cash-flow row (zeros skipped)."""
+    flows = as_matrix(cashflows)
+    signs = np.sign(flows)
+    # Carry the last non-zero sign forward so that zeros do not break a run
+    idx = np.where(signs != 0, np.arange(signs.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    carried = np.take_along_axis(signs, idx, axis=1)
+    changes = (carried[:, 1:] * carried[:, :-1]) < 0
+    return changes.sum(axis=1)
+
+
+def _scan_values(flows, grid):
+    with np.errstate(over='ignore', invalid='ignore'):
+        return flows @ discount_matrix(grid, flows.shape[1] - 1).T
+
+
+def _brackets(flows, grid):
+    """Return (row, lo, hi, f_lo, f_hi) for every sign change of NPV on the grid."""
+    rows, los, his, flos, fhis = [], [], [], [], []
+    for start in range(0, flows.shape[0], BLOCK_ROWS):
+        values = _scan_values(flows[start:start + BLOCK_ROWS], grid)
+        # Exact roots on a grid point are bracketed by themselves
+        r, g = np.nonzero(values == 0)
+        rows.append(r + start)
+        los.append(grid[g])
+        his.append(grid[g])
+        flos.append(np.zeros(len(r)))
+        fhis.append(np.zeros(len(r)))
+        negative = values < 0
+        positive = values > 0
+        cross = (negative[:, :-1] & positive[:, 1:]) | (positive[:, :-1] & negative[:, 1:])
+        r, g = np.nonzero(cross)
+        rows.append(r + start)
+        los.append(grid[g])
+        his.append(grid[g + 1])
+        flos.append(values[r, g])
+        fhis.append(values[r, g + 1])
+    return tuple(np.concatenate(a) for a in (rows, los, his, flos, fhis))
+
+
+def _polish(flows, rows, lo, hi, f_lo, f_hi, tol, max_iter):
+    t = np.arange(flows.shape[1])
+    # Regula falsi start inside each bracket
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = np.where(f_hi != f_lo, lo - f_lo * (hi - lo) / (f_hi - f_lo), lo)
+    x = np.clip(x, lo, hi)
+    lo_sign = np.sign(f_lo)
+    converged = lo == hi
+    active = np.flatnonzero(~converged)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        r = x[active]
+        c = flows[rows[active]]
+        with np.errstate(over='ignore', invalid='ignore'):
+            v = np.exp(-np.log1p(r)[:, None] * t)
+            f = (c * v).sum(axis=1)
+            df = -(c * v * t).sum(axis=1) / (1.0 + r)
+            newton = r - f / df
+        a_lo, a_hi = lo[active], hi[active]
+        same = np.sign(f) == lo_sign[active]
+        a_lo = np.where(same, r, a_lo)
+        a_hi = np.where(same, a_hi, r)
+        lo[active], hi[active] = a_lo, a_hi
+        ok = np.isfinite(newton) & (newton >= a_lo) & (newton <= a_hi)
+        new = np.where(ok, newton, 0.5 * (a_lo + a_hi))
+        new = np.where(f == 0, r, new)
+        x[active] = new
+        done = (np.abs(new - r) <= tol * (1.0 + np.abs(r))) | (f == 0) | (a_hi - a_lo <= tol)
+        converged[active[done]] = True
+        active = active[~done]
+    return x, converged
+
+
+def irr(cashflows, guess=0.1, tol=1e-12, max_iter=100, grid=SCAN_GRID):
+    """Solve IRR for every row of ``cashflows`` in one batched call.
+
+    ``cashflows`` is a vector, a (projects x periods) matrix or a ragged list
+    of vectors.  The primary ``irr`` of each project is the root closest to
+    ``guess``; ``n_roots`` flags projects with several roots (non-conventional
+    flows) or none at all inside the scan range.
+    """
+    flows = as_matrix(cashflows)
+    m = flows.shape[0]
+    grid = np.asarray(grid, dtype=float)
+    rows, lo, hi, f_lo, f_hi = _brackets(flows, grid)
+    x, conv = _polish(flows, rows, lo, hi, f_lo, f_hi, tol, max_iter)
+
+    n_roots = np.bincount(rows, minlength=m)
+    width = max(int(n_roots.max(initial=0)), 1)
+    roots = np.full((m, width), np.nan)
+    # Sort roots by project, then by rate, and scatter them into padded rows
+    order = np.lexsort((x, rows))
+    rows, x, conv = rows[order], x[order], conv[order]
+    first = np.concatenate(([0], np.cumsum(n_roots)[:-1]))
+    slot = np.arange(len(rows)) - first[rows]
+    roots[rows, slot] = x
+
+    with np.errstate(invalid='ignore'):
+        dist = np.where(np.isnan(roots), np.inf, np.abs(roots - guess))
+    pick = dist.argmin(axis=1)
+    primary = roots[np.arange(m), pick]
+    converged = np.ones(m, dtype=bool)
+    np.logical_and.at(converged, rows, conv)
+    return IRRResult(
+        irr=primary,
+        roots=roots,
+        n_roots=n_roots,
+        sign_changes=sign_changes(flows),
+        converged=converged,
+    )
+
+
+def irr_annuity(first_cost, annual_benefit, life, tol=1e-10, max_iter=60, bounds=(-0.99, 10.0)):
+    """IRR of textbook projects (-P at year 0, A per year for n years), vectorized.
+
+    With P > 0 and A > 0 the NPV is strictly decreasing in the rate, so the
+    root is unique; it is found with Newton steps on the closed-form P/A
+    factor (in log form, which is nearly linear in the rate), safeguarded by
+    bisection inside ``bounds``.  Projects whose root
+    falls outside ``bounds`` (or with P <= 0 or A <= 0) return NaN.
+    """
+    p, a, n = np.broadcast_arrays(np.asarray(first_cost, dtype=float),
+                                  np.asarray(annual_benefit, dtype=float),
+                                  np.asarray(life, dtype=float))
+    p, a, n = p.ravel(), a.ravel(), n.ravel()
+    target = np.divide(p, a, out=np.full(p.shape, np.nan), where=a > 0)
+    lo = np.full(p.shape, bounds[0])
+    hi = np.full(p.shape, bounds[1])
+    valid = (p > 0) & (a > 0) & (tvm.p_a(lo, n) >= target) & (tvm.p_a(hi, n) <= target)
+    # Start from the rate where the simple payback equals the annuity factor
+    x = np.clip(np.where(valid, 1.0 / np.where(valid, target, 1.0) - 1.0 / np.maximum(n, 1), 0.0), lo, hi)
+    active = np.flatnonzero(valid)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        r, nn = x[active], n[active]
+        pa = tvm.p_a(r, nn)
+        f = np.log(pa) - np.log(target[active])
+        df = -(tvm.p_g(r, nn) / pa + 1.0) / (1.0 + r)
+        a_lo = np.where(f > 0, r, lo[active])
+        a_hi = np.where(f > 0, hi[active], r)
+        lo[active], hi[active] = a_lo, a_hi
+        newton = r - f / df
+        ok = np.isfinite(newton) & (newton >= a_lo) & (newton <= a_hi)
+        new = np.where(ok, newton, 0.5 * (a_lo + a_hi))
+        x[active] = new
+        done = (np.abs(new - r) <= tol * (1.0 + np.abs(r))) | (f == 0)
+        active = active[~done]
+    return np.where(valid, x, np.nan)
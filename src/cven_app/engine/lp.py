@@ -0,0 +1,536 @@
+"""Linear programs solved by the bounded-variable revised simplex method.
+
+A ``LinearProgram`` minimizes or maximizes ``c x`` subject to one row
+``A x (<=, >=, =) b`` per constraint and bounds ``lower <= x <= upper``
+(either may be infinite), with ``A`` held as a sparse ``CSCMatrix``.
+
+``solve`` works on the computational form ``A x + s = b``: every row has a
+logical (slack) variable whose bounds encode the sense of the row
+(``[0, inf)`` for <=, ``(-inf, 0]`` for >=, ``[0, 0]`` for =), so the
+all-slack basis always exists.  Nonbasic variables sit at one of their
+bounds and may jump straight to the other one (a bound flip), so upper
+bounds cost no extra rows.  Rows whose slack cannot absorb the starting
+point get an artificial variable, and phase 1 minimizes their sum (with
+the objective at a small weight to break ties).  Any artificial left basic
+at zero, as on a redundant equality row, then swaps with its row's slack,
+so an optimal result always has a basis of the problem's own columns.
+
+The basis is never inverted.  ``BasisFactor`` keeps a ``SparseLU`` of its
+kernel: the rows not covered by a basic slack, against the basic
+structural columns, which is often much smaller than the basis itself
+and mostly triangular.
+Each pivot then appends one eta vector (the product form of the update);
+after ``REFACTOR_INTERVAL`` pivots the basis is factorized afresh and the
+basic values recomputed.  Entering variables are priced by Devex weights
+(an approximation of steepest edge), falling back to Bland's rule after ``DEGENERATE_LIMIT`` degenerate pivots
+in a row, and the leaving variable is chosen by Harris's two-pass ratio
+test, which prefers large pivots among near-ties.
+"""
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from cven_app.engine.sparse import CSCMatrix, SparseLU
+
+FEASIBILITY_TOL = 1e-9
+OPTIMALITY_TOL = 1e-9
+# Entries of an entering column smaller than this are not pivoted on
+PIVOT_TOL = 1e-9
+# Eta entries smaller than this are dropped
+DROP_TOL = 1e-14
+# Pivots between refactorizations of the basis
+REFACTOR_INTERVAL = 100
+# Degenerate pivots in a row before pricing switches to Bland's rule
+DEGENERATE_LIMIT = 50
+# Weight of the (scaled) objective in phase 1, as a tie-breaker
+PHASE_ONE_WEIGHT = 1e-6
+SENSES = {'<': (0.0, np.inf), '>': (-np.inf, 0.0), '=': (0.0, 0.0)}
+# Written forms of the row senses accepted by ``parse``
+SENSE_SYMBOLS = {'<=': '<', '=<': '<', '≤': '<', '<': '<', '>=': '>', '=>': '>', '≥': '>', '>': '>', '=': '='}
+# One term such as "+ 3.5 x1", "- x2" or "2*y"
+_TERM = re.compile(r'([+-]?)(\d+(?:\.\d*)?|\.\d+)?\*?([A-Za-z_]\w*)')
+_ROW = re.compile(r'(.*?)(<=|=<|>=|=>|≤|≥|<|>|=)(.*)')
+
+
+@dataclass
+class LinearProgram:
+    """Minimize (or maximize) ``c x`` subject to ``A x (senses) b`` and ``lower <= x <= upper``."""
+    c: np.ndarray
+    A: CSCMatrix
+    b: np.ndarray
+    senses: str = None      # one of '<', '>', '=' per row ('<' by default)
+    lower: np.ndarray = 0.0
+    upper: np.ndarray = np.inf
+    maximize: bool = False
+    names: tuple = None
+
+    def __post_init__(self):
+        self.c = np.asarray(self.c, dtype=float)
+        self.A = CSCMatrix.convert(self.A)
+        self.b = np.asarray(self.b, dtype=float)
+        m, n = self.A.shape
+        if len(self.c) != n or len(self.b) != m:
+            raise ValueError(f'c has {len(self.c)} entries and b {len(self.b)} for a {m} x {n} matrix')
+        self.senses = ''.join(self.senses) if self.senses is not None else '<' * m
+        if len(self.senses) != m or set(self.senses) - set(SENSES):
+            raise ValueError("senses needs one of '<', '>' or '=' per row")
+        self.lower = np.broadcast_to(np.asarray(self.lower, dtype=float), (n,)).copy()
+        self.upper = np.broadcast_to(np.asarray(self.upper, dtype=float), (n,)).copy()
+        if np.any(self.lower > self.upper):
+            raise ValueError('A lower bound is above its upper bound')
+        self.names = tuple(self.names) if self.names is not None else tuple(f'x{j + 1}' for j in range(n))
+
+    @property
+    def shape(self):
+        return self.A.shape
+
+
+@dataclass
+class LPResult:
+    """Outcome of ``solve``; duals and reduced costs are rates of change of the objective as stated."""
+    status: str                 # 'optimal', 'infeasible', 'unbounded' or 'iteration_limit'
+    x: np.ndarray
+    objective: float
+    duals: np.ndarray           # d objective / d b_i
+    reduced_costs: np.ndarray   # d objective / d x_j, for x_j moved off its bound
+    slack: np.ndarray           # b - A x
+    iterations: int
+    phase_one_iterations: int
+    basis: tuple = None         # (basic variables, nonbasic variables at their upper bound), for a warm start
+
+    @property
+    def optimal(self):
+        return self.status == 'optimal'
+
+
+class BasisFactor:
+    """B^-1 of a simplex basis: the LU of its kernel and a file of eta vectors.
+
+    Basic slacks are unit columns, so with ``rows`` the rows they do not
+    cover and K the basic structural columns, B v = a reduces to
+    ``A[rows, K] v_K = a[rows]`` and one substitution for the slacks.
+    That kernel is factorized with ``SparseLU``.
+    """
+
+    def __init__(self, simplex, head):
+        self.m = m = simplex.m
+        logical = head >= simplex.n
+        self.pos_l, self.pos_k = np.flatnonzero(logical), np.flatnonzero(~logical)
+        self.rows_l = simplex.logical_row[head[self.pos_l] - simplex.n]
+        self.sign_l = simplex.logical_sign[head[self.pos_l] - simplex.n]
+        covered = np.bincount(self.rows_l, minlength=m)
+        self.rows_r = np.flatnonzero(covered == 0)
+        if covered.max(initial=0) > 1 or len(self.rows_r) != len(self.pos_k):
+            raise np.linalg.LinAlgError('Singular basis')
+        self.k_rows, self.k_vals, self.k_pos = simplex.A.entries(head[self.pos_k])
+        row_map = np.full(m, -1)
+        row_map[self.rows_r] = np.arange(len(self.rows_r))
+        inside = row_map[self.k_rows] >= 0
+        self.lu = SparseLU(len(self.rows_r), row_map[self.k_rows[inside]], self.k_pos[inside],
+                           self.k_vals[inside]) if len(self.rows_r) else None
+        self.etas = []      # (position, indices, values of the eta column minus the unit vector)
+
+    def ftran(self, a):
+        """v with B v = a, indexed by basis position."""
+        v = np.zeros(self.m)
+        residual = a
+        if self.lu is not None:
+            v_k = self.lu.solve(a[self.rows_r])
+            v[self.pos_k] = v_k
+            residual = a - np.bincount(self.k_rows, weights=self.k_vals * v_k[self.k_pos], minlength=self.m)
+        v[self.pos_l] = self.sign_l * residual[self.rows_l]
+        for p, index, values in self.etas:
+            if v[p]:
+                v[index] += v[p] * values
+        return v
+
+    def btran(self, c):
+        """y with B^T y = c, for c indexed by basis position."""
+        w = np.array(c, dtype=float)
+        for p, index, values in reversed(self.etas):
+            w[p] += w[index] @ values
+        y = np.zeros(self.m)
+        y[self.rows_l] = self.sign_l * w[self.pos_l]
+        if self.lu is not None:
+            rhs = w[self.pos_k] - np.bincount(self.k_pos, weights=self.k_vals * y[self.k_rows], minlength=len(self.pos_k))
+            y[self.rows_r] = self.lu.solve_transpose(rhs)
+        return y
+
+    def update(self, p, alpha):
+        """Replace the column at position ``p`` by the one with ``ftran`` result ``alpha``."""
+        eta = -alpha / alpha[p]
+        eta[p] = 1 / alpha[p] - 1
+        index = np.flatnonzero(np.abs(eta) > DROP_TOL)
+        self.etas.append((p, index, eta[index]))
+
+
+class RevisedSimplex:
+    """The computational form of a ``LinearProgram`` and the state of the simplex method on it.
+
+    Columns are the n structural variables, then one slack per row, then any
+    artificials; ``head[p]`` is the variable basic at position p and ``x``
+    holds the value of every variable.
+    """
+
+    def __init__(self, problem, basis=None):
+        self.problem = problem
+        m, n = self.m, self.n = problem.shape
+        self.A = problem.A
+        self.b = problem.b
+        self.logical_row = np.arange(m)
+        self.logical_sign = np.ones(m)
+        sense = np.array([SENSES[s] for s in problem.senses]).reshape(m, 2)
+        self.lower = np.r_[problem.lower, sense[:, 0]]
+        self.upper = np.r_[problem.upper, sense[:, 1]]
+        self.cost = np.r_[-problem.c if problem.maximize else problem.c, np.zeros(m)]
+        self.iterations = self.phase_one_iterations = 0
+        self.artificials = 0
+        self.bland = False
+        if basis is None or not self._warm_start(*basis):
+            self._cold_start()
+
+    @property
+    def size(self):
+        return len(self.lower)
+
+    def _nonbasic_start(self, at_upper=None):
+        # Nonbasic variables at a finite bound (the upper one if asked), free ones at zero
+        lo, hi = self.lower, self.upper
+        x = np.where(np.isfinite(lo), lo, np.where(np.isfinite(hi), hi, 0.0))
+        if at_upper is not None:
+            x[at_upper] = hi[at_upper]
+        return x
+
+    def _warm_start(self, head, at_upper):
+        head = np.asarray(head)
+        if len(head) != self.m or head.max(initial=0) >= self.size:
+            return False
+        self.x = self._nonbasic_start(np.asarray(at_upper, dtype=np.intp))
+        self.head = head.copy()
+        try:
+            self.refactor()
+        except np.linalg.LinAlgError:
+            return False
+        return self.infeasibility() <= FEASIBILITY_TOL
+
+    def _cold_start(self):
+        m, n = self.m, self.n
+        self.x = self._nonbasic_start()
+        self.x[n:] = 0.0
+        self.head = np.arange(n, n + m)
+        # Value each slack would need, and the nearest value its bounds allow
+        need = self.b - self.A.matvec(self.x[:n])
+        allowed = np.clip(need, self.lower[n:], self.upper[n:])
+        rows = np.flatnonzero(np.abs(need - allowed) > FEASIBILITY_TOL)
+        self.x[n:] = allowed
+        if len(rows):
+            # An artificial covers the rest of each such row (a column of +-1) and starts basic
+            self.artificials = len(rows)
+            self.logical_row = np.r_[self.logical_row, rows]
+            self.logical_sign = np.r_[self.logical_sign, np.sign(need[rows] - allowed[rows])]
+            self.lower = np.r_[self.lower, np.zeros(len(rows))]
+            self.upper = np.r_[self.upper, np.full(len(rows), np.inf)]
+            self.cost = np.r_[self.cost, np.zeros(len(rows))]
+            self.x = np.r_[self.x, np.abs(need[rows] - allowed[rows])]
+            self.head[rows] = n + m + np.arange(len(rows))
+        self.refactor()
+
+    def column(self, j):
+        """Column ``j`` of the computational form, dense."""
+        if j < self.n:
+            return self.A.dense_column(j)
+        a = np.zeros(self.m)
+        a[self.logical_row[j - self.n]] = self.logical_sign[j - self.n]
+        return a
+
+    def rmatvec(self, y):
+        """[A I artificials]^T y."""
+        return np.r_[self.A.rmatvec(y), self.logical_sign * y[self.logical_row]]
+
+    def refactor(self):
+        """Factorize the basis afresh and recompute the basic values from the nonbasic ones."""
+        self.factor = BasisFactor(self, self.head)
+        self.basic = np.zeros(self.size, dtype=bool)
+        self.basic[self.head] = True
+        x = np.where(self.basic, 0.0, self.x)
+        residual = self.b - self.A.matvec(x[:self.n])
+        np.subtract.at(residual, self.logical_row, self.logical_sign * x[self.n:])
+        self.x = x
+        self.x[self.head] = self.factor.ftran(residual)
+
+    def infeasibility(self):
+        """Total bound violation of the basic variables."""
+        xb = self.x[self.head]
+        return float(np.sum(np.maximum(self.lower[self.head] - xb, 0) + np.maximum(xb - self.upper[self.head], 0)))
+
+    def duals(self, cost=None):
+        return self.factor.btran((self.cost if cost is None else cost)[self.head])
+
+    def reduced_costs(self, cost=None):
+        cost = self.cost if cost is None else cost
+        return cost - self.rmatvec(self.duals(cost))
+
+    def entering(self, d, weights=None):
+        """Entering variable and its direction (+1 up, -1 down) for reduced costs ``d``, or (None, 0).
+
+        The largest ``d_j^2 / weights_j`` enters (Dantzig's rule without
+        ``weights``), or the first candidate while ``bland`` is set.
+        """
+        up = ~self.basic & (d < -OPTIMALITY_TOL) & (self.x < self.upper)
+        down = ~self.basic & (d > OPTIMALITY_TOL) & (self.x > self.lower)
+        score = np.where(up | down, d * d if weights is None else d * d / weights, 0.0)
+        if not score.any():
+            return None, 0
+        q = int(np.argmax(score > 0)) if self.bland else int(np.argmax(score))
+        return q, 1 if up[q] else -1
+
+    def ratio_test(self, q, direction, alpha):
+        """Step length and leaving position (None for a bound flip) when ``q`` moves in ``direction``.
+
+        Harris's two passes: the largest step allowed with the bounds relaxed
+        by the feasibility tolerance, then the largest pivot among the rows
+        that block within it.  The step is infinite if nothing blocks.
+        """
+        rate = -direction * alpha           # change of each basic variable per unit step
+        head = self.head
+        xb, lo, hi = self.x[head], self.lower[head], self.upper[head]
+        falling, rising = rate < -PIVOT_TOL, rate > PIVOT_TOL
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relaxed = np.where(falling, (xb - lo + FEASIBILITY_TOL) / -rate,
+                               np.where(rising, (hi - xb + FEASIBILITY_TOL) / rate, np.inf))
+            exact = np.where(falling, (xb - lo) / -rate, np.where(rising, (hi - xb) / rate, np.inf))
+        limit = relaxed.min(initial=np.inf)
+        flip = self.upper[q] - self.lower[q]
+        if flip <= limit:
+            return flip, None
+        if not np.isfinite(limit):
+            return np.inf, None
+        p = int(np.argmax(np.where(exact <= limit, np.abs(rate), -1.0)))
+        return max(exact[p], 0.0), p
+
+    def dual_ratio_test(self, p, to_lower):
+        """Entering variable when basic position ``p`` leaves at its lower (or upper) bound, or None.
+
+        The dual simplex ratio test: among nonbasic variables whose move
+        pushes the leaving one towards that bound, the one whose reduced cost
+        reaches zero first, so the new basis stays dual feasible (largest
+        pivot among near-ties).
+        """
+        unit = np.zeros(self.m)
+        unit[p] = 1.0
+        row = self.rmatvec(self.factor.btran(unit))
+        d = self.reduced_costs()
+        movable = ~self.basic & (self.lower < self.upper)
+        at_lower = movable & (self.x <= self.lower)
+        at_upper = movable & (self.x >= self.upper)
+        free = movable & ~at_lower & ~at_upper
+        # x_p = ... - row_j x_j: to raise x_p a variable at its lower bound needs row_j < 0
+        sign = -1.0 if to_lower else 1.0
+        eligible = ((at_lower & (sign * row > PIVOT_TOL)) | (at_upper & (sign * row < -PIVOT_TOL))
+                    | (free & (np.abs(row) > PIVOT_TOL)))
+        if not eligible.any():
+            return None
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(eligible, np.abs(d) / np.abs(row), np.inf)
+        near = ratio <= ratio.min() + OPTIMALITY_TOL
+        return int(np.argmax(np.where(near, np.abs(row), -1.0)))
+
+    def pivot(self, q, direction, step, p, alpha):
+        """Move ``q`` by ``step`` and, unless it is a bound flip, swap it into position ``p``."""
+        rate = -direction * alpha
+        self.x[q] += direction * step
+        self.x[self.head] += rate * step
+        self.iterations += 1
+        if p is None:
+            return
+        leaving = self.head[p]
+        # The leaving variable ends exactly on the bound it reached
+        self.x[leaving] = self.lower[leaving] if rate[p] < 0 else self.upper[leaving]
+        self.head[p] = q
+        self.basic[leaving], self.basic[q] = False, True
+        self.factor.update(p, alpha)
+        if len(self.factor.etas) >= REFACTOR_INTERVAL:
+            self.refactor()
+
+    def run(self, cost, max_iterations):
+        """Primal simplex iterations on ``cost`` until optimal, unbounded or out of iterations.
+
+        Pricing uses Devex reference weights.  The pivot row ``e_p B^-1 A``
+        that updates them also updates the reduced costs, which are
+        recomputed from the duals only after a refactorization; a bound flip
+        changes neither.
+        """
+        degenerate = 0
+        self.bland = False
+        d = self.reduced_costs(cost)
+        weights = np.ones(self.size)
+        while self.iterations < max_iterations:
+            q, direction = self.entering(d, weights)
+            if q is None:
+                return 'optimal'
+            alpha = self.factor.ftran(self.column(q))
+            step, p = self.ratio_test(q, direction, alpha)
+            if not np.isfinite(step):
+                return 'unbounded'
+            if p is not None:
+                unit = np.zeros(self.m)
+                unit[p] = 1.0
+                row = self.rmatvec(self.factor.btran(unit)) / alpha[p]
+                leaving, d_q, w_q = self.head[p], d[q], weights[q]
+            self.pivot(q, direction, step, p, alpha)
+            if p is not None:
+                if self.factor.etas:
+                    d -= d_q * row
+                    d[q] = 0.0
+                else:
+                    d = self.reduced_costs(cost)
+                weights = np.maximum(weights, row * row * w_q)
+                weights[leaving] = max(w_q / alpha[p] ** 2, 1.0)
+                if weights.max() > 1e8:
+                    weights[:] = 1.0
+            degenerate = degenerate + 1 if step <= FEASIBILITY_TOL else 0
+            self.bland = degenerate > DEGENERATE_LIMIT
+        return 'iteration_limit'
+
+    def phase_one(self, max_iterations):
+        """Minimize the sum of the artificials; False if the problem is infeasible.
+
+        The objective is added at weight ``PHASE_ONE_WEIGHT`` to break the
+        many ties of a pure phase 1 towards a good starting basis; if that
+        leaves any artificial positive, the pure sum is minimized from there
+        to decide feasibility.
+        """
+        if not self.artificials:
+            return True
+        infeasibility = np.zeros(self.size)
+        infeasibility[self.n + self.m:] = 1.0
+        scale = 1.0 + np.abs(self.b).max(initial=0.0)
+        tol = FEASIBILITY_TOL * scale * self.artificials ** 0.5
+        status = self.run(infeasibility + PHASE_ONE_WEIGHT * self.cost / max(np.abs(self.cost).max(), 1.0),
+                          max_iterations)
+        if status == 'unbounded' or (status == 'optimal' and self.x[self.n + self.m:].sum() > tol):
+            status = self.run(infeasibility, max_iterations)
+        self.phase_one_iterations = self.iterations
+        if status != 'optimal':
+            return status
+        self.refactor()
+        if self.x[self.n + self.m:].sum() > tol:
+            return False
+        # Artificials are held at zero from now on.  One still basic (its row is redundant, or
+        # phase 1 ended degenerate) is swapped in a zero step for its row's logical variable,
+        # whose column is parallel to it, so the basis consists of the problem's own columns
+        self.upper[self.n + self.m:] = 0.0
+        self.x[self.n + self.m:] = 0.0
+        for p in np.flatnonzero(self.head >= self.n + self.m):
+            q = self.n + self.logical_row[self.head[p] - self.n]
+            self.pivot(q, 1, 0.0, p, self.factor.ftran(self.column(q)))
+        return True
+
+    def result(self, status):
+        problem, n = self.problem, self.n
+        x = self.x[:n].copy()
+        sign = -1.0 if problem.maximize else 1.0
+        y = self.duals()
+        d = self.cost - self.rmatvec(y)
+        at_upper = np.flatnonzero(~self.basic[:n + self.m] & (self.x[:n + self.m] == self.upper[:n + self.m])
+                                  & np.isfinite(self.upper[:n + self.m]))
+        basis = (self.head.copy(), at_upper) if self.head.max() < n + self.m else None
+        return LPResult(status, x, float(problem.c @ x), sign * y, sign * d[:n], problem.b - problem.A.matvec(x),
+                        self.iterations, self.phase_one_iterations, basis)
+
+
+def solve(problem, max_iterations=None, basis=None):
+    """Solve ``problem`` (a ``LinearProgram``) and return an ``LPResult``.
+
+    ``basis`` may be the ``basis`` of an earlier result for a problem of the
+    same shape; it is used if it is still primal feasible.
+    """
+    m, n = problem.shape
+    max_iterations = max_iterations or 100 * (m + n) + 20_000
+    simplex = RevisedSimplex(problem, basis)
+    feasible = simplex.phase_one(max_iterations)
+    if feasible is not True:
+        return simplex.result('infeasible' if feasible is False else feasible)
+    status = simplex.run(simplex.cost, max_iterations)
+    if status == 'optimal':
+        simplex.refactor()
+    return simplex.result(status)
+
+
+def _linear(text):
+    # {variable: coefficient} of an expression such as "3x1 + 5x2"
+    text = re.sub(r'\s+', '', text)
+    if not text or not re.fullmatch(f'(?:{_TERM.pattern})+', text):
+        raise ValueError(f'Cannot read "{text}" as terms like 3x1 + 5x2')
+    terms = {}
+    for sign, number, name in _TERM.findall(text):
+        value = float(number) if number else 1.0
+        terms[name] = terms.get(name, 0.0) + (-value if sign == '-' else value)
+    return terms
+
+
+def parse(objective, constraints, maximize=True):
+    """A ``LinearProgram`` from text: ``objective`` such as "3x1 + 5x2" and one constraint per line.
+
+    Constraints read like "x1 + x2 <= 50" (or ``>=``, ``=``, ``≤``, ``≥``)
+    with a number on the right; variables are nonnegative and numbered in
+    order of first appearance.
+    """
+    costs = _linear(objective)
+    rows = []
+    for line in constraints.splitlines():
+        if not line.strip():
+            continue
+        match = _ROW.fullmatch(line.strip())
+        if match is None:
+            raise ValueError(f'"{line.strip()}" has no <=, >= or =')
+        lhs, sense, rhs = match.groups()
+        try:
+            rhs = float(rhs)
+        except ValueError:
+            raise ValueError(f'The right side of "{line.strip()}" is not a number') from None
+        rows.append((_linear(lhs), SENSE_SYMBOLS[sense], rhs))
+    if not rows:
+        raise ValueError('Enter at least one constraint')
+    names = list(costs)
+    for terms, _, _ in rows:
+        names += [name for name in terms if name not in names]
+    a = [[terms.get(name, 0.0) for name in names] for terms, _, _ in rows]
+    return LinearProgram([costs.get(name, 0.0) for name in names], a, [rhs for _, _, rhs in rows],
+                         ''.join(sense for _, sense, _ in rows), maximize=maximize, names=names)
+
+
+def feasible_polygon(problem, box):
+    """Corners of the feasible region of a two-variable ``problem``, clipped to ``box`` = (x_max, y_max).
+
+    Each row and bound is a half-plane cut from the box (Sutherland-Hodgman
+    clipping); the corners come back in order around the region.
+    """
+    a = problem.A.toarray()
+    planes = []
+    for row, rhs, sense in zip(a, problem.b, problem.senses):
+        if sense in '<=':
+            planes.append((row, rhs))
+        if sense in '>=':
+            planes.append((-row, -rhs))
+    for j, (lo, hi) in enumerate(zip(problem.lower, problem.upper)):
+        unit = np.eye(2)[j]
+        if np.isfinite(lo):
+            planes.append((-unit, -lo))
+        if np.isfinite(hi):
+            planes.append((unit, hi))
+    corners = [np.array(p, dtype=float) for p in ((0, 0), (box[0], 0), (box[0], box[1]), (0, box[1]))]
+    for normal, rhs in planes:
+        kept = []
+        for i, p in enumerate(corners):
+            q = corners[(i + 1) % len(corners)]
+            fp, fq = normal @ p - rhs, normal @ q - rhs
+            if fp <= 1e-12:
+                kept.append(p)
+            if (fp < -1e-12 and fq > 1e-12) or (fq < -1e-12 and fp > 1e-12):
+                kept.append(p + fp / (fp - fq) * (q - p))
+        corners = kept
+        if not corners:
+            break
+    return [p.tolist() for p in corners]
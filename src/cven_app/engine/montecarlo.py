@@ -0,0 +1,166 @@
+"""Chunked Monte Carlo sampling with streaming summaries.
+
+Samples are drawn ``chunk_size`` at a time and folded into a ``StreamSummary``
+(running moments, a t-digest and a fixed histogram); no chunk is kept after
+it has been summarized, so a run of 10^9 samples needs the same memory as a
+run of 10^6.
+
+Chunk ``k`` always draws from its own ``Generator`` seeded with the k-th
+child of the run's ``SeedSequence``, and chunk summaries are merged in chunk
+order.  Chunks can therefore be summarized by any number of worker processes
+and the result is bit-identical to a serial run with the same seed.
+
+Besides plain pseudo-random draws, a run can use one of the variance-reduced
+``sampling.STRATEGIES``, turned into samples by inverse-CDF transforms.  The
+standard error of the mean is estimated from independent units: samples for
+``random``, antithetic pairs for ``antithetic``, and whole chunks (each an
+independently randomized Latin hypercube or Sobol' set, at least
+``MIN_REPLICATES`` of them) for ``lhs`` and ``sobol``.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from cven_app.engine.distributions import draw, family, ppf
+from cven_app.engine.sampling import STRATEGIES, uniforms
+from cven_app.engine.streaming import DIGEST_COMPRESSION, FixedHistogram, RunningStats, TDigest
+
+CHUNK_SIZE = 1_000_000
+PARALLEL_THRESHOLD = 20_000_000
+# Continuous inputs are binned finely and regrouped for display
+FINE_BINS = 1200
+# Independent randomized point sets per run, for the LHS and Sobol' error estimate
+MIN_REPLICATES = 16
+
+
+def support(spec):
+    """Histogram range and bin count for a spec; discrete distributions get unit bins."""
+    kind, *params = spec
+    dist = family(kind)
+    lo, hi = dist.bounds(*params)
+    if dist.discrete:
+        lo, hi = int(lo), int(hi)
+        return lo - 0.5, hi + 0.5, hi - lo + 1
+    if hi > lo:
+        return lo, hi, FINE_BINS
+    return lo - 0.5, lo + 0.5, 1
+
+
+class StreamSummary:
+    """Moments, quantile sketch and histogram of one stream, updated per chunk.
+
+    For ``discrete`` streams the histogram has one bin per integer, so
+    percentiles are read exactly from its CDF instead of the t-digest.
+    """
+
+    def __init__(self, lo, hi, bins, discrete=False, strategy='random', compression=DIGEST_COMPRESSION):
+        self.discrete = discrete
+        self.strategy = strategy
+        self.stats = RunningStats()
+        self.units = RunningStats()    # independent estimates of the mean (unused for 'random')
+        self.digest = TDigest(compression)
+        self.histogram = FixedHistogram(lo, hi, bins)
+
+    @property
+    def n(self):
+        return self.stats.n
+
+    def update(self, values):
+        self.stats.update(values)
+        self.digest.update(values)
+        self.histogram.update(values)
+
+    def merge(self, other):
+        self.stats.merge(other.stats)
+        self.units.merge(other.units)
+        self.digest.merge(other.digest)
+        self.histogram.merge(other.histogram)
+
+    def standard_error(self):
+        """Estimated standard error of the sample mean."""
+        units = self.stats if self.strategy == 'random' else self.units
+        return units.std(ddof=1) / np.sqrt(units.n) if units.n > 1 else np.nan
+
+    def percentile(self, q):
+        q = np.asarray(q, dtype=float) / 100
+        if not self.discrete:
+            return self.digest.quantile(q)
+        # Inverted CDF: the first value whose cumulative count reaches q * n
+        hist = self.histogram
+        cum = hist.under + np.cumsum(hist.counts)
+        index = np.minimum(np.searchsorted(cum, q * self.n), cum.size - 1)
+        return np.clip((hist.edges[index] + hist.edges[index + 1]) / 2, self.stats.min, self.stats.max)
+
+
+def chunk_rng(entropy, k):
+    """Generator for chunk ``k``; the same stream as ``SeedSequence(entropy).spawn(k + 1)[k]``."""
+    return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(k,)))
+
+
+def empty_summary(spec, strategy='random'):
+    """``StreamSummary`` with the histogram support of ``spec`` and no samples."""
+    return StreamSummary(*support(spec), discrete=family(spec[0]).discrete, strategy=strategy)
+
+
+def plan(n, seed=None, chunk_size=CHUNK_SIZE, strategy='random'):
+    """Seed entropy and chunk sizes of a run; together they fix every sample."""
+    entropy = np.random.SeedSequence(seed).entropy
+    if strategy in ('lhs', 'sobol'):
+        # Near-equal replicates, so their means are equally weighted estimates
+        replicates = min(max(MIN_REPLICATES, -(-n // chunk_size)), n)
+        return entropy, [n // replicates + (k < n % replicates) for k in range(replicates)]
+    return entropy, [min(chunk_size, n - start) for start in range(0, n, chunk_size)]
+
+
+def summarize_chunk(spec, entropy, k, size, strategy='random'):
+    """``StreamSummary`` of chunk ``k`` alone (picklable, for worker processes)."""
+    summary = empty_summary(spec, strategy)
+    rng = chunk_rng(entropy, k)
+    if strategy == 'random':
+        values = draw(spec, rng, size)
+    else:
+        values = ppf(spec, uniforms(strategy, size, 1, rng)[:, 0])
+    summary.update(values)
+    if strategy == 'antithetic':
+        # ``uniforms`` gives u, then 1 - u without its last value when size is odd, so
+        # value i pairs with value i + (size + 1) // 2 and an odd middle value is its own unit
+        half, paired = size // 2, (size + 1) // 2
+        summary.units.update(np.append((values[:half] + values[paired:]) / 2, values[half:paired]))
+    elif strategy != 'random':
+        summary.units.update([values.mean()])
+    return summary
+
+
+def simulate(spec, n, seed=None, chunk_size=CHUNK_SIZE, workers=None, strategy='random'):
+    """Draw ``n`` samples from ``spec`` in chunks and return their ``StreamSummary``.
+
+    The seed actually used is stored as ``summary.entropy``, so a run with
+    ``seed=None`` can be repeated.  Above ``PARALLEL_THRESHOLD`` samples the
+    chunks are spread over ``workers`` processes (all cores by default;
+    ``workers=1`` keeps it in-process); the result does not depend on the
+    number of workers.
+    """
+    entropy, sizes = plan(n, seed, chunk_size, strategy)
+    summary = empty_summary(spec, strategy)
+    summary.entropy = entropy
+    workers = workers or os.cpu_count() or 1
+    if n < PARALLEL_THRESHOLD or workers == 1:
+        for k, size in enumerate(sizes):
+            summary.merge(summarize_chunk(spec, entropy, k, size, strategy))
+        return summary
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(summarize_chunk, repeat(spec), repeat(entropy), range(len(sizes)), sizes, repeat(strategy),
+                         chunksize=max(1, len(sizes) // (4 * workers)))
+        # Results arrive in chunk order, which fixes the merge order
+        for part in parts:
+            summary.merge(part)
+    return summary
+
+
+def convergence(spec, sizes=tuple(2**k for k in range(7, 17)), strategies=None, seed=None):
+    """Standard error of the mean at each sample size, for each strategy."""
+    strategies = strategies or STRATEGIES
+    return {strategy: [simulate(spec, n, seed, strategy=strategy, workers=1).standard_error() for n in sizes]
+            for strategy in strategies}
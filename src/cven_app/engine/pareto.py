@@ -0,0 +1,246 @@
+"""Pareto fronts for N-objective design studies.
+
+Designs are rows of an (n x k) objective matrix.  Every objective is
+minimized; pass ``maximize`` (one flag per objective) for those that should
+be maximized, e.g. reliability.
+
+* ``nondominated`` - the Pareto front.  Two objectives use an O(n log n) sort
+  and running-minimum scan; more objectives use sort-filter-skyline, which
+  compares blocks of candidates, in order of increasing objective sum,
+  against the front found so far.
+* ``nondominated_rank`` - NSGA-II front layering (rank 0 is the Pareto front).
+* ``crowding_distance`` - NSGA-II crowding distance within each front.
+"""
+from bisect import bisect_right
+
+import numpy as np
+
+SKYLINE_BLOCK = 1024
+# Front rows compared against a candidate block at once (bounds the boolean work arrays)
+FRONT_BLOCK = 4096
+# Front rows tried first against each block; they dominate most candidates
+SENTINELS = 64
+
+
+def _minimize(points, maximize=None):
+    points = np.array(points, dtype=float, ndmin=2)
+    if maximize is not None:
+        flip = np.broadcast_to(np.asarray(maximize, dtype=bool), (points.shape[1],))
+        points[:, flip] *= -1
+    return points
+
+
+def _unique_sorted(points):
+    # Lexicographic order and the group of identical rows each sorted row belongs to
+    order = np.lexsort(points.T[::-1])
+    ordered = points[order]
+    new = np.ones(len(ordered), dtype=bool)
+    new[1:] = (ordered[1:] != ordered[:-1]).any(axis=1)
+    return order, ordered[new], np.cumsum(new) - 1
+
+
+def _nondominated_2d(points):
+    order, unique, group = _unique_sorted(points)
+    # Sorted by f1 then f2, a unique point is dominated iff an earlier one has f2 <= its f2
+    previous = np.concatenate(([np.inf], np.minimum.accumulate(unique[:, 1])[:-1]))
+    keep = np.empty(len(points), dtype=bool)
+    keep[order] = (unique[:, 1] < previous)[group]
+    return keep
+
+
+def _dominated_by(front, block, itself=False):
+    # True for each row of ``block`` that some row of ``front`` dominates.  Rows are
+    # unique, so "no worse in every objective" already means "dominates" (except a row
+    # compared with itself, masked out when ``itself``).
+    hit = np.zeros(len(block), dtype=bool)
+    for start in range(0, len(front), FRONT_BLOCK):
+        f = front[start:start + FRONT_BLOCK]
+        no_worse = f[:, 0, None] <= block[None, :, 0]
+        for d in range(1, block.shape[1]):
+            no_worse &= f[:, d, None] <= block[None, :, d]
+        if itself:
+            np.fill_diagonal(no_worse[:, start:], False)
+        hit |= no_worse.any(axis=0)
+    return hit
+
+
+def _nondominated_skyline(points):
+    order, unique, group = _unique_sorted(points)
+    # A point can only be dominated by one with a strictly smaller objective sum
+    by_sum = np.argsort(unique.sum(axis=1), kind='stable')
+    keep_unique = np.zeros(len(unique), dtype=bool)
+    front = np.empty((0, points.shape[1]))
+    for start in range(0, len(by_sum), SKYLINE_BLOCK):
+        idx = by_sum[start:start + SKYLINE_BLOCK]
+        block = unique[idx]
+        alive = ~_dominated_by(front[:SENTINELS], block)
+        idx, block = idx[alive], block[alive]
+        alive = ~_dominated_by(front[SENTINELS:], block)
+        idx, block = idx[alive], block[alive]
+        alive = ~_dominated_by(block, block, itself=True)
+        keep_unique[idx[alive]] = True
+        front = np.concatenate((front, block[alive]))
+    keep = np.empty(len(points), dtype=bool)
+    keep[order] = keep_unique[group]
+    return keep
+
+
+def nondominated(points, maximize=None):
+    """Boolean mask of the Pareto-optimal rows (identical rows are kept together)."""
+    points = _minimize(points, maximize)
+    if points.shape[0] == 0:
+        return np.zeros(0, dtype=bool)
+    if points.shape[1] == 1:
+        return points[:, 0] == points[:, 0].min()
+    # The point with the smallest objective sum is Pareto-optimal; one O(n) pass drops
+    # everything it dominates before the sort
+    best = points[np.argmin(points.sum(axis=1))]
+    candidates = np.flatnonzero(~((best <= points).all(axis=1) & (best < points).any(axis=1)))
+    keep = np.zeros(len(points), dtype=bool)
+    solve = _nondominated_2d if points.shape[1] == 2 else _nondominated_skyline
+    keep[candidates] = solve(points[candidates])
+    return keep
+
+
+def _rank_2d(points):
+    order, unique, group = _unique_sorted(points)
+    # Patience sorting: each front's smallest f2 so far is non-decreasing across fronts
+    tails = []
+    ranks = np.empty(len(unique), dtype=np.int64)
+    for i, f2 in enumerate(unique[:, 1].tolist()):
+        k = bisect_right(tails, f2)
+        if k == len(tails):
+            tails.append(f2)
+        else:
+            tails[k] = f2
+        ranks[i] = k
+    rank = np.empty(len(points), dtype=np.int64)
+    rank[order] = ranks[group]
+    return rank
+
+
+def nondominated_rank(points, maximize=None):
+    """NSGA-II front index of every row: 0 for the Pareto front, 1 for the next layer, ..."""
+    points = _minimize(points, maximize)
+    if points.shape[1] == 2:
+        return _rank_2d(points)
+    rank = np.full(len(points), -1, dtype=np.int64)
+    remaining = np.arange(len(points))
+    layer = 0
+    while remaining.size:
+        front = nondominated(points[remaining])
+        rank[remaining[front]] = layer
+        remaining = remaining[~front]
+        layer += 1
+    return rank
+
+
+def crowding_distance(points, rank=None, maximize=None):
+    """NSGA-II crowding distance of every row within its front (``inf`` at each front's extremes)."""
+    points = _minimize(points, maximize)
+    if rank is None:
+        rank = nondominated_rank(points)
+    n = len(points)
+    distance = np.zeros(n)
+    for d in range(points.shape[1]):
+        order = np.lexsort((points[:, d], rank))
+        values, fronts = points[order, d], rank[order]
+        first = np.ones(n, dtype=bool)
+        first[1:] = fronts[1:] != fronts[:-1]
+        last = np.roll(first, -1)
+        # Objective range of each front, broadcast back to its members
+        starts = np.flatnonzero(first)
+        span = np.repeat(values[np.roll(starts - 1, -1)] - values[starts], np.diff(np.append(starts, n)))
+        gap = np.zeros(n)
+        gap[1:-1] = values[2:] - values[:-2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            contribution = np.where(span > 0, gap / span, 0.0)
+        contribution[first | last] = np.inf
+        distance[order] += contribution
+    return distance
+
+
+def nsga2_order(points, maximize=None):
+    """Row order used by NSGA-II selection: by front, then by decreasing crowding distance."""
+    points = _minimize(points, maximize)
+    rank = nondominated_rank(points)
+    return np.lexsort((-crowding_distance(points, rank), rank))
+
+
+class ParetoArchive:
+    """Pareto front that is kept up to date as designs arrive.
+
+    With two objectives the front is held sorted by the first objective (the
+    second is then strictly decreasing), so an insert needs one binary search
+    to test dominance and evicts the dominated run that follows it.  With more
+    objectives each batch is screened against the archive with vectorized
+    dominance tests.  Duplicates of archived designs are rejected.
+    """
+
+    def __init__(self, objectives=2, maximize=None):
+        self.objectives = objectives
+        self._sign = np.where(np.broadcast_to(np.asarray(maximize if maximize is not None else False, dtype=bool),
+                                              (objectives,)), -1.0, 1.0)
+        self._f1 = []          # 2-D front, ascending first objective
+        self._f2 = []
+        self._front = np.empty((0, objectives))
+
+    def __len__(self):
+        return len(self._f1) if self.objectives == 2 else len(self._front)
+
+    @property
+    def points(self):
+        """Current front in the caller's orientation (sorted by the first objective in 2-D)."""
+        front = np.column_stack((self._f1, self._f2)) if self.objectives == 2 else self._front
+        return front.reshape(-1, self.objectives) * self._sign
+
+    def _insert_2d(self, x, y):
+        # Returns the evicted (x, y) pairs, or None if (x, y) is dominated or a duplicate
+        f1, f2 = self._f1, self._f2
+        pred = bisect_right(f1, x) - 1
+        if pred >= 0 and f2[pred] <= y:
+            return None
+        # Archived points with f1 >= x and f2 >= y form one contiguous run
+        start = bisect_right(f1, x) if pred >= 0 and f1[pred] < x else max(pred, 0)
+        stop = start
+        while stop < len(f1) and f2[stop] >= y:
+            stop += 1
+        evicted = list(zip(f1[start:stop], f2[start:stop]))
+        f1[start:stop] = [x]
+        f2[start:stop] = [y]
+        return evicted
+
+    def insert(self, point):
+        """Add one design; returns True if it joined the front."""
+        if self.objectives == 2:
+            x, y = (np.asarray(point, dtype=float) * self._sign).tolist()
+            return self._insert_2d(x, y) is not None
+        added, _ = self.insert_many(np.asarray(point, dtype=float).reshape(1, -1))
+        return len(added) > 0
+
+    def insert_many(self, points):
+        """Add a batch of designs and return ``(added, removed)`` front points.
+
+        Only the batch's own front is offered to the archive, so each call
+        costs one ``nondominated`` pass plus work proportional to the changes.
+        """
+        points = np.array(points, dtype=float, ndmin=2).reshape(-1, self.objectives) * self._sign
+        candidates = np.unique(points[nondominated(points)], axis=0) if len(points) else points
+        if self.objectives == 2:
+            added, removed = [], []
+            for x, y in candidates.tolist():
+                evicted = self._insert_2d(x, y)
+                if evicted is not None:
+                    added.append((x, y))
+                    removed.extend(evicted)
+            # A point added and later evicted in the same batch is no change at all
+            transient = set(added) & set(removed)
+            added = [p for p in added if p not in transient]
+            removed = [p for p in removed if p not in transient]
+            added, removed = np.array(added).reshape(-1, 2), np.array(removed).reshape(-1, 2)
+        else:
+            new = candidates[~_dominated_by(self._front, candidates)]
+            stale = _dominated_by(new, self._front)
+            added, removed = new, self._front[stale]
+            self._front = np.concatenate((self._front[~stale], new))
+        return added * self._sign, removed * self._sign
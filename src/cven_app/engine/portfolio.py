@@ -0,0 +1,93 @@
+"""Present, annual and future worth ranking of N mutually exclusive alternatives.
+
+Each alternative is a row of a cash-flow matrix (see ``engine.cashflow``).
+Worths are evaluated at the Fisher real rate, or along a ``DiscountCurve`` of
+year-by-year rates and inflation, and large portfolios are split into row
+blocks that are evaluated in a process pool.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cven_app.engine import tvm
+from cven_app.engine.cashflow import DiscountCurve, as_matrix
+
+PARALLEL_THRESHOLD = 200_000
+BLOCK_ROWS = 50_000
+
+
+def real_rate(nominal, inflation=0.0):
+    """Fisher relation: (1 + i_nom) = (1 + i_real)(1 + f)."""
+    return (1 + np.asarray(nominal, dtype=float)) / (1 + np.asarray(inflation, dtype=float)) - 1
+
+
+def lives(cashflows):
+    """Life of each alternative: the index of its last non-zero cash flow (at least 1)."""
+    flows = as_matrix(cashflows)
+    nonzero = flows != 0
+    last = flows.shape[1] - 1 - np.argmax(nonzero[:, ::-1], axis=1)
+    return np.maximum(np.where(nonzero.any(axis=1), last, 0), 1)
+
+
+def _evaluate_block(flows, rate, life):
+    t = np.arange(flows.shape[1])
+    pw = (flows * tvm.p_f(rate[:, None], t)).sum(axis=1)
+    return np.column_stack((pw, pw * tvm.a_p(rate, life), pw * tvm.f_p(rate, life)))
+
+
+def _evaluate_curve(flows, curve, life):
+    pw = curve.npv(flows)
+    return np.column_stack((pw, pw / curve.annuity_factor(life), pw / curve.factors(flows.shape[1] - 1)[life]))
+
+
+def evaluate(cashflows, rate, inflation=0.0, life=None, workers=None):
+    """PW, AW and FW of every alternative as a (alternatives x 3) array.
+
+    ``rate`` and ``inflation`` are nominal and may be scalars or one value per
+    alternative, or ``rate`` may be a ``DiscountCurve`` shared by the whole
+    batch (``inflation`` is then part of the curve).  ``life`` defaults to
+    each row's last non-zero period.  Above ``PARALLEL_THRESHOLD`` rows the
+    work is spread over ``workers`` processes (all cores by default;
+    ``workers=1`` keeps it in-process).
+    """
+    flows = as_matrix(cashflows)
+    m = flows.shape[0]
+    life = lives(flows) if life is None else np.broadcast_to(np.asarray(life, dtype=int), (m,))
+    if isinstance(rate, DiscountCurve):
+        # One matrix-vector product against the shared cumulative factors
+        return _evaluate_curve(flows, rate, life)
+    rate = np.broadcast_to(real_rate(rate, inflation), (m,))
+    workers = workers or os.cpu_count() or 1
+    if m < PARALLEL_THRESHOLD or workers == 1:
+        return _evaluate_block(flows, rate, life)
+    starts = range(0, m, BLOCK_ROWS)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        blocks = pool.map(_evaluate_block,
+                          (flows[s:s + BLOCK_ROWS] for s in starts),
+                          (rate[s:s + BLOCK_ROWS] for s in starts),
+                          (life[s:s + BLOCK_ROWS] for s in starts))
+        return np.concatenate(list(blocks))
+
+
+def rank(cashflows, rate, inflation=0.0, names=None, life=None, by=None, workers=None):
+    """Results table of PW, AW and FW ranked best-first.
+
+    ``by`` picks the ranking measure; by default alternatives with equal
+    lives are ranked on PW and unequal lives on AW (repeatability assumption).
+    """
+    flows = as_matrix(cashflows)
+    life = lives(flows) if life is None else np.broadcast_to(np.asarray(life, dtype=int), (flows.shape[0],))
+    worths = evaluate(flows, rate, inflation, life, workers)
+    if by is None:
+        by = 'PW' if np.all(life == life[0]) else 'AW'
+    table = pd.DataFrame({
+        'alternative': names if names is not None else np.arange(flows.shape[0]),
+        'life': life,
+        'PW': worths[:, 0],
+        'AW': worths[:, 1],
+        'FW': worths[:, 2],
+    })
+    table['rank'] = table[by].rank(ascending=False, method='min').astype(int)
+    return table.sort_values('rank', kind='stable').reset_index(drop=True)
@@ -0,0 +1,403 @@
+"""Monte Carlo reliability of series / parallel / k-out-of-n systems with bit-packed states.
+
+A system is a nested tuple: a component name (a string) is a leaf, and
+``('series', *parts)``, ``('parallel', *parts)`` and ``('k_of_n', k, *parts)``
+combine parts.  A component may appear in several places (the bridge
+network), and components fail independently with given probabilities.
+
+The state of a component across many realizations is a bitset: bit ``i`` of
+a run of uint64 words is 1 if the component works in realization ``i``.
+Failure bits with probability p are built from the binary digits of p, one
+random word per digit (``bernoulli_words``), so a realization costs well
+under one random number per component.  A series system is then the AND of
+its parts, a parallel system the OR and a k-out-of-n system a short
+recurrence of ANDs and ORs, each evaluating 64 realizations per word
+operation.  Realizations in which the system works are counted with a
+bitwise popcount.
+
+``simulate`` runs realizations in chunks seeded as in ``montecarlo``, so
+the result does not depend on the number of worker processes, and returns
+the failure probability with a Wilson confidence interval and the Birnbaum
+importance of every component; ``exact`` computes the failure probability
+by pivotal decomposition for comparison.
+
+``Stage`` / ``evaluate_designs`` price and simulate staged designs (so many
+units of one tier per stage, ``required`` of them needed) with common random
+numbers, for the cost-vs-reliability Pareto front.
+"""
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import repeat
+from math import expm1, log1p, log2, sqrt
+
+import numpy as np
+
+from cven_app.engine.montecarlo import chunk_rng
+from cven_app.engine.special import ndtri
+
+WORD = 64
+# A multiple of WORD, so only the last chunk of a run has unused bits
+CHUNK_SIZE = 1 << 20
+PARALLEL_THRESHOLD = 50_000_000
+# Significant binary digits of a failure probability used for sampling (relative error < 6e-8)
+PRECISION = 24
+# Realizations per design in the Pareto evaluation, and designs evaluated per block
+DESIGN_REALIZATIONS = 1 << 16
+DESIGN_BLOCK = 256
+_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+_S1, _S2, _S4, _S56 = (np.uint64(s) for s in (1, 2, 4, 56))
+
+# name: (label, structure, default component failure probabilities)
+SYSTEMS = {
+    'pump_station': (
+        'Pump station',
+        ('series', 'Intake', ('k_of_n', 2, 'Pump 1', 'Pump 2', 'Pump 3'), ('parallel', 'Grid feed', 'Generator'),
+         'Controls'),
+        {'Intake': 0.002, 'Pump 1': 0.05, 'Pump 2': 0.05, 'Pump 3': 0.05, 'Grid feed': 0.03, 'Generator': 0.08,
+         'Controls': 0.001}),
+    'bridge': (
+        'Bridge network',
+        ('parallel', ('series', 'A', 'D'), ('series', 'B', 'E'), ('series', 'A', 'C', 'E'), ('series', 'B', 'C', 'D')),
+        {'A': 0.05, 'B': 0.05, 'C': 0.1, 'D': 0.05, 'E': 0.05}),
+    'lifeline': (
+        'Water lifeline',
+        ('series', 'Reservoir', 'Treatment plant', ('k_of_n', 2, 'Trunk main 1', 'Trunk main 2', 'Trunk main 3'),
+         ('parallel', ('series', 'East booster', 'East tank'), ('series', 'West booster', 'West tank'))),
+        {'Reservoir': 0.001, 'Treatment plant': 0.01, 'Trunk main 1': 0.04, 'Trunk main 2': 0.04,
+         'Trunk main 3': 0.04, 'East booster': 0.06, 'East tank': 0.02, 'West booster': 0.06, 'West tank': 0.02}),
+}
+
+
+def _parts(structure):
+    kind, *parts = structure
+    if kind == 'k_of_n':
+        k, *parts = parts
+        if not 1 <= k <= len(parts):
+            raise ValueError(f'k_of_n needs 1 <= k <= {len(parts)} parts, got k={k}')
+        return kind, k, parts
+    if kind not in ('series', 'parallel') or not parts:
+        raise ValueError(f'Unknown or empty system node: {structure!r}')
+    return kind, None, parts
+
+
+def _leaves(structure):
+    if isinstance(structure, bool):
+        return []
+    if isinstance(structure, str):
+        return [structure]
+    return [leaf for part in _parts(structure)[2] for leaf in _leaves(part)]
+
+
+def components(structure):
+    """Distinct component names of ``structure``, in order of first appearance."""
+    return tuple(dict.fromkeys(_leaves(structure)))
+
+
+def words(n):
+    """uint64 words needed for ``n`` realizations."""
+    return -(-n // WORD)
+
+
+def _valid(n):
+    # All ones, except the unused high bits of the last word
+    mask = np.full(words(n), _ONES)
+    if n % WORD:
+        mask[-1] = np.uint64((1 << (n % WORD)) - 1)
+    return mask
+
+
+def bernoulli_words(p, n, rng):
+    """``n`` bits packed into uint64 words, each 1 independently with probability ``p``.
+
+    With p rounded to ``q / 2^d`` (``PRECISION`` significant binary digits),
+    the result starts empty and each digit from the lowest set one upwards
+    takes a fresh random word r: ``x |= r`` for a 1, ``x &= r`` for a 0,
+    which maps P(bit) to (1 + P) / 2 or P / 2.  Unused bits of the last word
+    may be set.
+    """
+    x = np.zeros(words(n), dtype=np.uint64)
+    if p <= 0:
+        return x
+    if p >= 1:
+        return ~x
+    depth = min(WORD, PRECISION + int(-log2(p)))
+    q = round(p * 2.0**depth)
+    if q >= 1 << depth:
+        return ~x
+    raw = rng.bit_generator.random_raw
+    for j in range((q & -q).bit_length() - 1 if q else depth, depth):
+        if (q >> j) & 1:
+            np.bitwise_or(x, raw(len(x)), out=x)
+        else:
+            np.bitwise_and(x, raw(len(x)), out=x)
+    return x
+
+
+def popcount(x, axis=None):
+    """Set bits of uint64 words (SWAR), in total or along ``axis``."""
+    x = x - ((x >> _S1) & _M1)
+    x = (x & _M2) + ((x >> _S2) & _M2)
+    x = (x + (x >> _S4)) & _M4
+    return ((x * _H01) >> _S56).sum(axis=axis, dtype=np.int64)
+
+
+def _at_least(k, states):
+    # at_least[j]: at least j of the states seen so far are set
+    at_least = [None] * (k + 1)
+    for x in states:
+        for j in range(k, 1, -1):
+            if at_least[j - 1] is not None:
+                at_least[j] = at_least[j - 1] & x if at_least[j] is None else at_least[j] | (at_least[j - 1] & x)
+        at_least[1] = x.copy() if at_least[1] is None else at_least[1] | x
+        yield at_least[k]
+
+
+def evaluate(structure, states):
+    """Bits of the realizations in which ``structure`` works, from component ``states`` (name -> bits)."""
+    if isinstance(structure, str):
+        return states[structure]
+    kind, k, parts = _parts(structure)
+    parts = (evaluate(part, states) for part in parts)
+    if kind == 'k_of_n':
+        *_, result = _at_least(k, parts)
+        return result
+    result = next(parts).copy()
+    combine = np.bitwise_and if kind == 'series' else np.bitwise_or
+    for x in parts:
+        combine(result, x, out=result)
+    return result
+
+
+def _condition(structure, name, works):
+    if isinstance(structure, (str, bool)):
+        return works if structure == name else structure
+    kind, k, parts = _parts(structure)
+    head = (kind, k) if k is not None else (kind,)
+    return (*head, *(_condition(part, name, works) for part in parts))
+
+
+def _failure(structure, p):
+    # Failure probability of a structure in which every component appears once
+    if isinstance(structure, bool):
+        return 0.0 if structure else 1.0
+    if isinstance(structure, str):
+        return p[structure]
+    kind, k, parts = _parts(structure)
+    failures = [_failure(part, p) for part in parts]
+    if kind == 'series':
+        return -expm1(sum(log1p(-f) if f < 1 else -np.inf for f in failures))
+    if kind == 'parallel':
+        return float(np.prod(failures))
+    # Distribution of the number of working parts, one part at a time
+    working = np.zeros(len(failures) + 1)
+    working[0] = 1.0
+    for f in failures:
+        working[1:] = working[1:] * f + working[:-1] * (1 - f)
+        working[0] *= f
+    return float(working[:k].sum())
+
+
+def exact(structure, p):
+    """Exact failure probability of ``structure`` with independent component failure probabilities ``p``.
+
+    Components that appear more than once are conditioned on (pivotal
+    decomposition), which doubles the work per repeated component.
+    """
+    repeated = [name for name, count in Counter(_leaves(structure)).items() if count > 1]
+    if not repeated:
+        return _failure(structure, p)
+    name = repeated[0]
+    return ((1 - p[name]) * exact(_condition(structure, name, True), p)
+            + p[name] * exact(_condition(structure, name, False), p))
+
+
+@dataclass
+class Reliability:
+    """Counts over simulated realizations: how often the system and each component worked."""
+    components: tuple
+    n: int = 0
+    working: int = 0
+    component_working: np.ndarray = None
+    joint_working: np.ndarray = None      # the component and the system both worked
+
+    def __post_init__(self):
+        size = len(self.components)
+        if self.component_working is None:
+            self.component_working = np.zeros(size, dtype=np.int64)
+        if self.joint_working is None:
+            self.joint_working = np.zeros(size, dtype=np.int64)
+
+    @property
+    def failures(self):
+        return self.n - self.working
+
+    @property
+    def failure_probability(self):
+        return self.failures / self.n if self.n else np.nan
+
+    def interval(self, confidence=0.95):
+        """Wilson score interval for the failure probability."""
+        if not self.n:
+            return np.nan, np.nan
+        z = float(ndtri(np.array([0.5 + confidence / 2]))[0])
+        n, f = self.n, self.failures
+        center = (f + z * z / 2) / (n + z * z)
+        half = z / (n + z * z) * sqrt(f * (n - f) / n + z * z / 4)
+        return max(0.0, center - half), min(1.0, center + half)
+
+    def importance(self):
+        """Birnbaum importance per component: P(system works | it works) - P(system works | it fails)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            given_works = self.joint_working / self.component_working
+            given_fails = (self.working - self.joint_working) / (self.n - self.component_working)
+        return given_works - given_fails
+
+    def merge(self, other):
+        self.n += other.n
+        self.working += other.working
+        self.component_working += other.component_working
+        self.joint_working += other.joint_working
+
+
+def simulate_chunk(structure, p, entropy, k, size):
+    """``Reliability`` counts of chunk ``k`` alone (picklable, for worker processes)."""
+    rng = chunk_rng(entropy, k)
+    names = components(structure)
+    valid = _valid(size)
+    states = {name: ~bernoulli_words(p[name], size, rng) & valid for name in names}
+    system = evaluate(structure, states)
+    result = Reliability(names, size, int(popcount(system)))
+    for i, name in enumerate(names):
+        result.component_working[i] = popcount(states[name])
+        result.joint_working[i] = popcount(states[name] & system)
+    return result
+
+
+def plan(n, seed=None, chunk_size=CHUNK_SIZE):
+    """Seed entropy and chunk sizes of a run; together they fix every realization."""
+    entropy = np.random.SeedSequence(seed).entropy
+    return entropy, [min(chunk_size, n - start) for start in range(0, n, chunk_size)]
+
+
+def simulate(structure, p, n, seed=None, chunk_size=CHUNK_SIZE, workers=None):
+    """Simulate ``n`` realizations of ``structure`` with component failure probabilities ``p``.
+
+    Chunks are spread over ``workers`` processes above
+    ``PARALLEL_THRESHOLD`` realizations, as in ``montecarlo.simulate``; the
+    seed used is stored as ``result.entropy``.
+    """
+    entropy, sizes = plan(n, seed, chunk_size)
+    result = Reliability(components(structure))
+    result.entropy = entropy
+    workers = workers or os.cpu_count() or 1
+    if n < PARALLEL_THRESHOLD or workers == 1:
+        for k, size in enumerate(sizes):
+            result.merge(simulate_chunk(structure, p, entropy, k, size))
+        return result
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(simulate_chunk, repeat(structure), repeat(p), repeat(entropy), range(len(sizes)), sizes,
+                             chunksize=max(1, len(sizes) // (4 * workers))):
+            result.merge(part)
+    return result
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One stage of a staged design: ``units`` identical units of one tier, ``required`` of which must work."""
+    name: str
+    required: int
+    max_units: int
+    tiers: tuple        # (label, unit cost, unit failure probability)
+
+
+# Pump station options; unit costs in $k
+PUMP_STATION = (
+    Stage('Intake', 1, 3, (('Bar screen', 40, 0.02), ('Self-cleaning screen', 75, 0.005))),
+    Stage('Pumps', 2, 5, (('Standard pump', 60, 0.06), ('Heavy-duty pump', 95, 0.025), ('Premium pump', 140, 0.008))),
+    Stage('Power', 1, 3, (('Utility feed', 30, 0.04), ('Diesel generator', 55, 0.07), ('Dual utility feed', 90, 0.012))),
+    Stage('Controls', 1, 2, (('PLC', 25, 0.01), ('Hardened PLC', 45, 0.003))),
+)
+
+
+def random_designs(stages, count, rng):
+    """``count`` random designs as an int array of (tier, units) per stage."""
+    designs = np.empty((count, len(stages), 2), dtype=np.intp)
+    for s, stage in enumerate(stages):
+        designs[:, s, 0] = rng.integers(len(stage.tiers), size=count)
+        designs[:, s, 1] = rng.integers(stage.required, stage.max_units + 1, size=count)
+    return designs
+
+
+def design_cost(stages, designs):
+    """Total cost of each design."""
+    cost = np.zeros(len(designs))
+    for s, stage in enumerate(stages):
+        unit_cost = np.array([tier[1] for tier in stage.tiers], dtype=float)
+        cost += unit_cost[designs[:, s, 0]] * designs[:, s, 1]
+    return cost
+
+
+def describe_design(stages, design):
+    """One-line description of a design, e.g. ``'Pumps: 3 x Heavy-duty pump (2 needed)'``."""
+    return '; '.join(f'{stage.name}: {units} x {stage.tiers[tier][0]} ({stage.required} needed)'
+                     for stage, (tier, units) in zip(stages, design))
+
+
+def design_structure(stages, design):
+    """System structure and component failure probabilities of one design, for ``simulate`` and ``exact``."""
+    parts, p = [], {}
+    for stage, (tier, units) in zip(stages, design):
+        label, _, failure = stage.tiers[tier]
+        names = [f'{stage.name} {label} {u + 1}' for u in range(units)]
+        p.update(dict.fromkeys(names, failure))
+        parts.append(('k_of_n', stage.required, *names))
+    return ('series', *parts), p
+
+
+@lru_cache(maxsize=4)
+def stage_states(stages, n=DESIGN_REALIZATIONS, seed=0):
+    """Per stage, the bits of the realizations in which m units of each tier meet the requirement.
+
+    Entry ``[tier, m]`` uses units 1..m of one fixed sample per tier, so
+    every design is evaluated on the same realizations (common random
+    numbers) and designs differing in one stage differ only there.
+    """
+    rng = np.random.default_rng(seed)
+    valid = _valid(n)
+    tables = []
+    for stage in stages:
+        table = np.zeros((len(stage.tiers), stage.max_units + 1, words(n)), dtype=np.uint64)
+        for t, (_, _, failure) in enumerate(stage.tiers):
+            units = (~bernoulli_words(failure, n, rng) & valid for _ in range(stage.max_units))
+            for m, state in enumerate(_at_least(stage.required, units), start=1):
+                if state is not None:
+                    table[t, m] = state
+        table.setflags(write=False)
+        tables.append(table)
+    return tuple(tables)
+
+
+def evaluate_designs(stages, designs, n=DESIGN_REALIZATIONS, seed=0):
+    """Simulated reliability (fraction of ``n`` realizations that work) of each design."""
+    tables = stage_states(stages, n, seed)
+    reliability = np.empty(len(designs))
+    for start in range(0, len(designs), DESIGN_BLOCK):
+        block = designs[start:start + DESIGN_BLOCK]
+        system = tables[0][block[:, 0, 0], block[:, 0, 1]]
+        for s in range(1, len(stages)):
+            system &= tables[s][block[:, s, 0], block[:, s, 1]]
+        reliability[start:start + len(block)] = popcount(system, axis=1) / n
+    return reliability
+
+
+def design_batch(stages, count, seed, n=DESIGN_REALIZATIONS, states_seed=0):
+    """``count`` random designs with their cost and simulated reliability (picklable, for worker processes)."""
+    designs = random_designs(stages, count, np.random.default_rng(seed))
+    return designs, design_cost(stages, designs), evaluate_designs(stages, designs, n, states_seed)
@@ -0,0 +1,120 @@
+"""Uniform point sets for variance-reduced Monte Carlo.
+
+Each strategy returns an (m x d) array of uniforms in (0, 1), which
+``distributions.ppf`` turns into samples of any spec:
+
+* ``random`` - independent uniforms.
+* ``antithetic`` - the first half u, the second half 1 - u.
+* ``lhs`` - Latin hypercube: each dimension has exactly one point in each of
+  m equal strata, randomly paired across dimensions.
+* ``sobol`` - Sobol' low-discrepancy points with Owen's nested uniform
+  scrambling (hash-based), so the estimate is unbiased and independent point
+  sets give a well-behaved error estimate.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+STRATEGIES = ('random', 'antithetic', 'lhs', 'sobol')
+SOBOL_BITS = 32
+
+# Joe & Kuo (new-joe-kuo-6.21201): degree s, polynomial coefficients a and initial
+# direction numbers m for dimensions 2-16 (dimension 1 is the van der Corput sequence)
+_JOE_KUO = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+)
+SOBOL_MAX_DIM = len(_JOE_KUO) + 1
+
+
+@lru_cache(maxsize=None)
+def _directions(d):
+    # (d x SOBOL_BITS) direction integers v[j, b], most significant bit first
+    v = np.zeros((d, SOBOL_BITS), dtype=np.uint64)
+    v[0] = 1 << np.arange(SOBOL_BITS - 1, -1, -1, dtype=np.uint64)
+    for j in range(1, d):
+        s, a, m = _JOE_KUO[j - 1]
+        dirs = [mk << (SOBOL_BITS - 1 - k) for k, mk in enumerate(m)]
+        for k in range(s, SOBOL_BITS):
+            value = dirs[k - s] ^ (dirs[k - s] >> s)
+            for t in range(1, s):
+                if (a >> (s - 1 - t)) & 1:
+                    value ^= dirs[k - t]
+            dirs.append(value)
+        v[j] = dirs
+    v.setflags(write=False)
+    return v
+
+
+def _hash(z):
+    # SplitMix64 finalizer; uint64 arithmetic wraps
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _owen_scramble(x, rng):
+    # Nested uniform scramble: bit r is flipped by a random bit that depends on the
+    # r leading bits (the point's node in the binary tree) and a per-level seed
+    m, d = x.shape
+    # Below the first ``levels`` bits every point is alone in its node (each coordinate
+    # of the first 2^levels Sobol' points is a (0, levels, 1)-net), so the remaining
+    # bits of a scrambled point are independent fair coin flips
+    levels = min(max(int(m - 1).bit_length(), 1), SOBOL_BITS)
+    seeds = rng.integers(0, 2**63, (levels, d), dtype=np.uint64)
+    tail = np.uint64(SOBOL_BITS - levels)
+    out = (x >> tail) << tail
+    for r in range(levels):
+        prefix = x >> np.uint64(SOBOL_BITS - r) if r else np.zeros_like(x)
+        flip = _hash(prefix ^ seeds[r]) >> np.uint64(63)
+        out ^= flip << np.uint64(SOBOL_BITS - 1 - r)
+    if tail:
+        out |= rng.integers(0, 1 << int(tail), (m, d), dtype=np.uint64)
+    return out
+
+
+def sobol(m, d, rng=None, scramble=True):
+    """First ``m`` points of the ``d``-dimensional Sobol' sequence, optionally Owen-scrambled."""
+    if d > SOBOL_MAX_DIM:
+        raise ValueError(f'Sobol sampling supports up to {SOBOL_MAX_DIM} dimensions')
+    v = _directions(d)
+    # Gray-code order: point i is point i - 1 XOR the direction of the lowest set bit of i
+    i = np.arange(1, m, dtype=np.int64)
+    low_bit = np.log2((i & -i).astype(float)).astype(np.intp)
+    x = np.bitwise_xor.accumulate(np.concatenate((np.zeros((min(m, 1), d), dtype=np.uint64), v[:, low_bit].T)))
+    if scramble:
+        x = _owen_scramble(x, rng if rng is not None else np.random.default_rng())
+    return (x.astype(float) + 0.5) / 2.0**SOBOL_BITS
+
+
+def latin_hypercube(m, d, rng):
+    """Latin hypercube sample of ``m`` points in ``d`` dimensions."""
+    strata = rng.permuted(np.tile(np.arange(m), (d, 1)), axis=1).T
+    return (strata + rng.random((m, d))) / m
+
+
+def uniforms(strategy, m, d, rng):
+    """(m x d) uniforms in (0, 1) for one of ``STRATEGIES``."""
+    if strategy == 'random':
+        return rng.random((m, d))
+    if strategy == 'antithetic':
+        half = rng.random(((m + 1) // 2, d))
+        return np.concatenate((half, 1 - half))[:m]
+    if strategy == 'lhs':
+        return latin_hypercube(m, d, rng)
+    if strategy == 'sobol':
+        return sobol(m, d, rng)
+    raise ValueError(f'Unknown sampling strategy: {strategy!r}')
@@ -0,0 +1,288 @@
+"""Critical path method (CPM) for activity networks of any size.
+
+A ``Network`` is activity-on-node: activity j has a duration and may start
+once all its predecessors have finished (finish-to-start precedence).
+Arrow diagrams, where activities are the arrows between events, become
+one with ``Network.from_arrows``: each arrow precedes every arrow leaving
+the event it ends at.
+
+The precedence edges are indexed once.  Kahn's algorithm sorts the
+activities into topological levels (level 0 has no predecessors, level k
+only predecessors in earlier levels), peeling one level per step with
+array operations; activities that never reach indegree 0 lie on or behind
+a cycle, which is reported.  Activities are then renumbered in level order
+and the edges stored grouped by successor (``in_ptr``/``in_src``) and by
+predecessor (``out_ptr``/``out_dst``), like a CSR matrix.
+
+``cpm`` makes the forward pass (ES, EF) and backward pass (LS, LF) one
+level at a time: a level's early starts are a ``maximum.reduceat`` of its
+predecessors' early finishes, and its late finishes a ``minimum.reduceat``
+of its successors' late starts.  Each edge is read once per pass, so a
+pass is O(V + E) with a few NumPy calls per level; levels narrower than
+``NARROW`` (long serial chains) go one activity at a time instead.  ``forward`` and
+``backward`` also take a matrix of durations, one column per scenario,
+which is how ``engine.schedule_risk`` runs thousands of samples at once.
+``reduceat`` along the rows of a matrix is slow, so there a level is
+combined in slots instead: slot j takes the j-th predecessor (successor)
+of every activity that has one, as one gather of whole rows and one
+``maximum`` (``minimum``).  The slots are built on first use.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+# Float below this (relative to the project duration) counts as zero
+FLOAT_TOL = 1e-9
+# Activities shown when a cycle is reported
+CYCLE_NAMES = 12
+# Levels narrower than this are processed one activity at a time, which is cheaper than array calls
+NARROW = 16
+# Matrix passes combine a level's edges slot by slot up to this degree, and by reduceat above it
+MAX_SLOTS = 32
+
+
+def _ranges(ptr, rows):
+    # Positions of every entry of the CSR rows ``rows``, row after row
+    starts, counts = ptr[rows], ptr[rows + 1] - ptr[rows]
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+
+def _grouped(keys, values, n):
+    # ``values`` sorted by ``keys`` (0..n-1), with the start of each key's run
+    order = np.argsort(keys, kind='stable')
+    return np.searchsorted(keys[order], np.arange(n + 1)), values[order]
+
+
+def _cycle(n, pred, succ, left, names):
+    # Text of one cycle among the activities ``left`` unsorted, found by walking back through them
+    inside = left[pred] & left[succ]
+    back = np.full(n, -1)
+    back[succ[inside]] = pred[inside]
+    seen, node = {}, int(np.flatnonzero(left)[0])
+    path = []
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = int(back[node])
+    cycle = path[seen[node]:][::-1]
+    cycle.append(cycle[0])
+    text = [names[j] for j in cycle]
+    if len(text) > CYCLE_NAMES:
+        text = text[:CYCLE_NAMES // 2] + ['...'] + text[-CYCLE_NAMES // 2:]
+    return ', '.join(text)
+
+
+def _slots(ptr, adj, bounds):
+    # Per wide level: (rows, neighbours) for slot j = 0, 1, ..., the rows with more than j neighbours
+    # and their j-th neighbour; None where a level's degree exceeds MAX_SLOTS
+    plan = []
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        degree = ptr[a + 1:b + 1] - ptr[a:b]
+        top = degree.max(initial=0)
+        if b - a < NARROW or top > MAX_SLOTS:
+            plan.append(None)
+            continue
+        steps = []
+        for j in range(top):
+            rows = a + np.flatnonzero(degree > j)
+            steps.append((rows, adj[ptr[rows] + j]))
+        plan.append(steps)
+    return plan
+
+
+def topological_levels(n, pred, succ, names=None):
+    """Activities in topological order and the start of each level in it.
+
+    Raises ``ValueError`` naming a cycle if the precedence edges
+    ``pred[k] -> succ[k]`` have one.
+    """
+    pred, succ = np.asarray(pred, dtype=np.intp), np.asarray(succ, dtype=np.intp)
+    ptr, out = _grouped(pred, succ, n)
+    indegree = np.bincount(succ, minlength=n)
+    frontier = np.flatnonzero(indegree == 0)
+    levels = []
+    while len(frontier):
+        levels.append(frontier)
+        if len(frontier) < NARROW:
+            ready = []
+            for i in frontier:
+                for t in out[ptr[i]:ptr[i + 1]]:
+                    indegree[t] -= 1
+                    if not indegree[t]:
+                        ready.append(t)
+            frontier = np.array(ready, dtype=np.intp)
+            continue
+        targets = out[_ranges(ptr, frontier)]
+        if not len(targets):
+            break
+        targets, counts = np.unique(targets, return_counts=True)
+        indegree[targets] -= counts
+        frontier = targets[indegree[targets] == 0]
+    order = np.concatenate(levels) if levels else np.zeros(0, dtype=np.intp)
+    if len(order) < n:
+        left = np.ones(n, dtype=bool)
+        left[order] = False
+        names = names if names is not None else [str(j + 1) for j in range(n)]
+        raise ValueError(f'The network has a cycle: {_cycle(n, pred, succ, left, names)}')
+    return order, np.cumsum([0] + [len(level) for level in levels])
+
+
+@dataclass
+class Schedule:
+    """CPM times of every activity, in the network's activity order."""
+    names: tuple
+    duration: float             # project duration
+    es: np.ndarray              # early start
+    ef: np.ndarray              # early finish
+    ls: np.ndarray              # late start
+    lf: np.ndarray              # late finish
+    total_float: np.ndarray     # LS - ES: delay that does not delay the project
+    free_float: np.ndarray      # delay that does not delay any successor's early start
+
+    @property
+    def critical(self):
+        return self.total_float <= FLOAT_TOL * max(self.duration, 1.0)
+
+
+class Network:
+    """An activity-on-node network with its precedence edges indexed by topological level."""
+
+    def __init__(self, durations, edges, names=None):
+        self.durations = np.asarray(durations, dtype=float)
+        n = self.n = len(self.durations)
+        if not n:
+            raise ValueError('A network needs at least one activity')
+        if np.any(~np.isfinite(self.durations)) or np.any(self.durations < 0):
+            raise ValueError('Durations must be finite and nonnegative')
+        edges = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+        if len(edges) and (edges.min() < 0 or edges.max() >= n):
+            raise ValueError(f'Precedence edges must join activities 0..{n - 1}')
+        self.names = tuple(names) if names is not None else tuple(str(j + 1) for j in range(n))
+        self.pred, self.succ = edges[:, 0].copy(), edges[:, 1].copy()
+        self.order, self.level_ptr = topological_levels(n, self.pred, self.succ, self.names)
+        # Everything below is in topological position: activity order[k] sits at position k
+        self.position = np.empty(n, dtype=np.intp)
+        self.position[self.order] = np.arange(n)
+        p, s = self.position[self.pred], self.position[self.succ]
+        self.in_ptr, self.in_src = _grouped(s, p, n)
+        self.out_ptr, self.out_dst = _grouped(p, s, n)
+        self._slots = {}
+
+    def _slot_plan(self, direction):
+        if direction not in self._slots:
+            ptr, adj = (self.in_ptr, self.in_src) if direction == 'in' else (self.out_ptr, self.out_dst)
+            self._slots[direction] = _slots(ptr, adj, self.level_ptr)
+        return self._slots[direction]
+
+    @classmethod
+    def from_predecessors(cls, activities):
+        """Network of ``{name: (duration, [predecessor names])}``."""
+        names = list(activities)
+        index = {name: j for j, name in enumerate(names)}
+        edges = []
+        for j, (_, predecessors) in enumerate(activities.values()):
+            for name in predecessors:
+                if name not in index:
+                    raise ValueError(f'Unknown predecessor {name!r} of {names[j]!r}')
+                edges.append((index[name], j))
+        return cls([duration for duration, _ in activities.values()], edges, names)
+
+    @classmethod
+    def from_arrows(cls, arrows, names=None):
+        """Network of an arrow diagram: ``arrows`` are (tail event, head event, duration).
+
+        Activities are named "tail→head" unless ``names`` are given.
+        """
+        tails = [str(tail) for tail, _, _ in arrows]
+        heads = [str(head) for _, head, _ in arrows]
+        events = {event: k for k, event in enumerate(dict.fromkeys(tails + heads))}
+        tail = np.array([events[t] for t in tails], dtype=np.intp)
+        head = np.array([events[h] for h in heads], dtype=np.intp)
+        # Arrow a precedes every arrow leaving the event a ends at
+        out_ptr, out_arrows = _grouped(tail, np.arange(len(arrows)), len(events))
+        counts = out_ptr[head + 1] - out_ptr[head]
+        pred = np.repeat(np.arange(len(arrows)), counts)
+        succ = out_arrows[_ranges(out_ptr, head)]
+        names = names if names is not None else [f'{t}→{h}' for t, h in zip(tails, heads)]
+        return cls([duration for _, _, duration in arrows], np.c_[pred, succ], names)
+
+    @property
+    def levels(self):
+        """Topological level of every activity."""
+        level = np.empty(self.n, dtype=np.intp)
+        level[self.order] = np.repeat(np.arange(len(self.level_ptr) - 1), np.diff(self.level_ptr))
+        return level
+
+    def forward(self, durations):
+        """Early starts and finishes for ``durations`` in topological position (a vector, or one column per scenario)."""
+        es = np.zeros_like(durations)
+        ef = np.empty_like(durations)
+        ptr, src = self.in_ptr, self.in_src
+        bounds = self.level_ptr
+        plan = self._slot_plan('in') if durations.ndim > 1 else None
+        ef[bounds[0]:bounds[1]] = durations[bounds[0]:bounds[1]]
+        for level, (a, b) in enumerate(zip(bounds[1:-1], bounds[2:]), 1):
+            if plan is not None and plan[level] is not None:
+                # Early starts begin at zero and every early finish is nonnegative
+                for rows, src_j in plan[level]:
+                    es[rows] = np.maximum(es[rows], ef[src_j])
+                ef[a:b] = es[a:b] + durations[a:b]
+                continue
+            if b - a < NARROW:
+                for k in range(a, b):
+                    s, e = ptr[k], ptr[k + 1]
+                    es[k] = ef[src[s]] if e - s == 1 else ef[src[s:e]].max(axis=0)
+                    ef[k] = es[k] + durations[k]
+                continue
+            # Every activity past level 0 has a predecessor, so no segment is empty
+            es[a:b] = np.maximum.reduceat(ef[src[ptr[a]:ptr[b]]], ptr[a:b] - ptr[a], axis=0)
+            ef[a:b] = es[a:b] + durations[a:b]
+        return es, ef
+
+    def backward(self, durations, finish):
+        """Late starts and finishes for ``durations`` in topological position, ending by ``finish``."""
+        lf = np.empty_like(durations)
+        ls = np.empty_like(durations)
+        lf[:] = finish
+        ptr, dst = self.out_ptr, self.out_dst
+        bounds = self.level_ptr
+        plan = self._slot_plan('out') if durations.ndim > 1 else None
+        for level in range(len(bounds) - 2, -1, -1):
+            a, b = bounds[level], bounds[level + 1]
+            if plan is not None and plan[level] is not None:
+                # Late finishes begin at ``finish``, which no successor's late start exceeds
+                for rows, dst_j in plan[level]:
+                    lf[rows] = np.minimum(lf[rows], ls[dst_j])
+                ls[a:b] = lf[a:b] - durations[a:b]
+                continue
+            if b - a < NARROW:
+                for k in range(a, b):
+                    s, e = ptr[k], ptr[k + 1]
+                    if e - s == 1:
+                        lf[k] = ls[dst[s]]
+                    elif e > s:
+                        lf[k] = ls[dst[s:e]].min(axis=0)
+                    ls[k] = lf[k] - durations[k]
+                continue
+            if ptr[b] > ptr[a]:
+                # ``finish`` is appended so that trailing activities without successors have a segment
+                values = np.concatenate([ls[dst[ptr[a]:ptr[b]]], np.broadcast_to(finish, (1,) + ls.shape[1:])])
+                latest = np.minimum.reduceat(values, ptr[a:b] - ptr[a], axis=0)
+                has = (ptr[a + 1:b + 1] > ptr[a:b]).reshape((-1,) + (1,) * (ls.ndim - 1))
+                lf[a:b] = np.where(has, latest, finish)
+            ls[a:b] = lf[a:b] - durations[a:b]
+        return ls, lf
+
+    def cpm(self, durations=None):
+        """``Schedule`` of the network, with its own durations or ``durations`` in activity order."""
+        d = (self.durations if durations is None else np.asarray(durations, dtype=float))[self.order]
+        es, ef = self.forward(d)
+        finish = float(ef.max(initial=0.0))
+        ls, lf = self.backward(d, finish)
+        # Free float: the earliest start among an activity's successors (or the finish) minus its early finish
+        has = self.out_ptr[1:] > self.out_ptr[:-1]
+        values = np.r_[es[self.out_dst], finish]
+        first = np.minimum.reduceat(values, self.out_ptr[:-1]) if self.n else values[:0]
+        free = np.where(has, first, finish) - ef
+        at = self.position
+        return Schedule(self.names, finish, es[at], ef[at], ls[at], lf[at], (ls - es)[at], free[at])
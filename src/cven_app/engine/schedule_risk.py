@@ -0,0 +1,238 @@
+"""Schedule risk: Monte Carlo CPM with uncertain activity durations.
+
+Every activity has a three-point estimate (low, most likely, high) and a
+triangular or beta-PERT duration, the same families as
+``distributions.Triangular`` and ``distributions.Pert``.  A chunk of samples
+is one matrix of durations with a row per activity, in the network's
+topological order, and a column per sample; it is drawn in one call per
+family (broadcasting each row's parameters) and pushed through
+``Network.forward`` and ``Network.backward`` at once, so every level of the
+network costs a few NumPy calls for all the samples together.
+
+Each sample gives a project duration (the largest early finish) and the
+activities with zero total float.  The project durations are kept, and also
+binned on a fixed histogram between the shortest and longest possible
+durations, so a run in progress can be summarized without touching every
+sample; the critical activities are counted: an activity's criticality
+index is the share of samples in which it was critical.  The passes hold about ``MATRICES``
+matrices of the chunk's size, so the chunk is sized to fit ``CHUNK_BYTES``;
+peak memory then does not grow with the number of samples.  Chunks are
+seeded as in ``montecarlo``, so a run is repeatable from its entropy and
+does not depend on the number of worker processes.
+
+``pert_estimate`` is the classical PERT answer for comparison: the mean and
+standard deviation of the critical path of the mean durations, which
+ignores near-critical paths and so underestimates the mean (merge bias).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+
+import numpy as np
+
+from cven_app.engine.montecarlo import FINE_BINS, chunk_rng
+from cven_app.engine.schedule import FLOAT_TOL
+from cven_app.engine.streaming import FixedHistogram
+
+KINDS = ('triangular', 'pert')
+# Memory budget of one chunk, and the duration-sized matrices the passes hold at once
+CHUNK_BYTES = 256 * 2**20
+MATRICES = 6
+MAX_CHUNK = 16_384
+# Activity-samples above which chunks go to worker processes
+PARALLEL_THRESHOLD = 500_000_000
+
+
+@dataclass
+class ScheduleRisk:
+    """Project durations of all samples and how often each activity was critical.
+
+    ``low`` and ``high`` are the shortest and longest possible project
+    durations, the range of ``histogram``.  Merged chunks keep their arrays of
+    durations in a list, joined once when ``durations`` is read.
+    """
+    names: tuple
+    low: float = 0.0
+    high: float = 1.0
+
+    def __post_init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.critical_counts = np.zeros(len(self.names), dtype=np.int64)
+        self.histogram = FixedHistogram(self.low, max(self.high, self.low + 1.0), FINE_BINS)
+        self._parts = []
+
+    @property
+    def durations(self):
+        """Project duration of every sample, in sample order."""
+        if len(self._parts) != 1:
+            self._parts = [np.concatenate(self._parts) if self._parts else np.zeros(0)]
+        return self._parts[0]
+
+    @property
+    def mean(self):
+        return self.total / self.n if self.n else np.nan
+
+    @property
+    def criticality(self):
+        """Share of samples in which each activity had zero total float."""
+        return self.critical_counts / self.n if self.n else np.full(len(self.names), np.nan)
+
+    def percentile(self, q, exact=True):
+        """Percentiles of the project duration; ``exact=False`` reads them off ``histogram`` instead."""
+        if not exact:
+            return np.clip(self.histogram.quantile(np.asarray(q, dtype=float) / 100), self.low, self.high)
+        return np.percentile(self.durations, q)
+
+    def probability(self, deadline, exact=True):
+        """Probability of finishing by ``deadline``; ``exact=False`` reads it off ``histogram`` instead."""
+        if not self.n:
+            return np.nan
+        if not exact and self.high <= self.low:
+            return float(deadline >= self.low)
+        if not exact:
+            h = self.histogram
+            cdf = np.concatenate(([h.under], h.under + np.cumsum(h.counts))) / h.n
+            return float(np.interp(deadline, h.edges, cdf, left=0.0, right=1.0))
+        return float(np.mean(self.durations <= deadline))
+
+    def update(self, durations, critical_counts):
+        self._parts.append(durations)
+        self.n += len(durations)
+        self.total += float(durations.sum())
+        self.critical_counts += critical_counts
+        self.histogram.update(durations)
+
+    def merge(self, other):
+        self._parts.extend(other._parts)
+        self.n += other.n
+        self.total += other.total
+        self.critical_counts += other.critical_counts
+        self.histogram.merge(other.histogram)
+
+
+def estimates(low, mode, high):
+    """Three-point estimates as float arrays, checked to be ordered and nonnegative."""
+    low, mode, high = (np.asarray(v, dtype=float) for v in (low, mode, high))
+    if not (low.shape == mode.shape == high.shape):
+        raise ValueError('Low, most likely and high durations must have one value per activity')
+    if np.any(~np.isfinite(low)) or np.any(~np.isfinite(high)) or np.any(low < 0):
+        raise ValueError('Durations must be finite and nonnegative')
+    if np.any(mode < low) or np.any(high < mode):
+        raise ValueError('Each activity needs low <= most likely <= high')
+    return low, mode, high
+
+
+def mean_durations(low, mode, high, kind='pert'):
+    """Mean duration of each activity: (low + 4 mode + high) / 6 for PERT, (low + mode + high) / 3 for triangular."""
+    if kind == 'pert':
+        return (low + 4 * mode + high) / 6
+    return (low + mode + high) / 3
+
+
+def pert_estimate(network, low, mode, high):
+    """Classical PERT: mean and standard deviation of the critical path of the PERT mean durations."""
+    low, mode, high = estimates(low, mode, high)
+    result = network.cpm(mean_durations(low, mode, high))
+    variance = ((high - low) / 6) ** 2
+    return result.duration, float(np.sqrt(variance[result.critical].sum()))
+
+
+def duration_range(network, low, high):
+    """Shortest and longest project durations: the critical paths with every activity at ``low`` and at ``high``.
+
+    ``low`` and ``high`` are in the network's topological order.
+    """
+    _, ef = network.forward(np.column_stack([low, high]))
+    shortest, longest = ef.max(axis=0, initial=0.0)
+    return float(shortest), float(longest)
+
+
+def chunk_size(n):
+    """Samples per chunk for a network of ``n`` activities, within ``CHUNK_BYTES``."""
+    return int(np.clip(CHUNK_BYTES // (8 * MATRICES * n), 1, MAX_CHUNK))
+
+
+def _triangular(u, low, mode, high):
+    # Inverse CDF with one (low, mode, high) per row; rows with low == high are constant
+    width = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        split = np.where(width > 0, (mode - low) / width, 0.0)
+        left = low + np.sqrt(u * width * (mode - low))
+        right = high - np.sqrt((1 - u) * width * (high - mode))
+    return np.where(u < split, left, right)
+
+
+def _pert_shapes(low, mode, high):
+    # Beta shapes of each row, as in ``distributions.Pert`` (uniform where low == high, which has zero width anyway)
+    width = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = np.where(width > 0, 1 + 4 * (mode - low) / width, 1.0)
+        b = np.where(width > 0, 1 + 4 * (high - mode) / width, 1.0)
+    return a, b
+
+
+def sample_durations(low, mode, high, kind, size, rng):
+    """Matrix of durations, one row per activity and one column per sample."""
+    if kind not in KINDS:
+        raise ValueError(f'kind must be one of {KINDS}')
+    low, mode, high = low[:, None], mode[:, None], high[:, None]
+    if kind == 'triangular':
+        return _triangular(rng.random((len(low), size)), low, mode, high)
+    a, b = _pert_shapes(low, mode, high)
+    return low + (high - low) * rng.beta(a, b, (len(low), size))
+
+
+def simulate_chunk(network, low, mode, high, kind, entropy, k, size):
+    """``ScheduleRisk`` of chunk ``k`` alone (picklable, for worker processes).
+
+    ``low``, ``mode`` and ``high`` are in the network's topological order.
+    """
+    d = sample_durations(low, mode, high, kind, size, chunk_rng(entropy, k))
+    es, ef = network.forward(d)
+    finish = ef.max(axis=0)
+    del ef
+    ls, _ = network.backward(d, finish)
+    del d
+    critical = ls - es <= FLOAT_TOL * np.maximum(finish, 1.0)
+    counts = np.empty(network.n, dtype=np.int64)
+    counts[network.order] = critical.sum(axis=1)
+    result = ScheduleRisk(network.names, *duration_range(network, low, high))
+    result.update(finish, counts)
+    return result
+
+
+def plan(n, seed=None, chunk=None, activities=1):
+    """Seed entropy and chunk sizes of a run; together they fix every sample."""
+    chunk = chunk or chunk_size(activities)
+    entropy = np.random.SeedSequence(seed).entropy
+    return entropy, [min(chunk, n - start) for start in range(0, n, chunk)]
+
+
+def simulate(network, low, mode, high, n, kind='pert', seed=None, chunk=None, workers=None):
+    """Sample ``n`` schedules of ``network`` with durations from three-point estimates in activity order.
+
+    ``chunk`` samples are simulated at a time (by default as many as fit
+    ``CHUNK_BYTES``).  Above ``PARALLEL_THRESHOLD`` activity-samples the
+    chunks are spread over ``workers`` processes, as in
+    ``montecarlo.simulate``; the seed used is stored as ``result.entropy``.
+    """
+    low, mode, high = estimates(low, mode, high)
+    if low.shape != (network.n,):
+        raise ValueError(f'Expected {network.n} three-point estimates, one per activity')
+    entropy, sizes = plan(n, seed, chunk, network.n)
+    at = network.order
+    args = (network, low[at], mode[at], high[at], kind, entropy)
+    result = ScheduleRisk(network.names, *duration_range(network, low[at], high[at]))
+    result.entropy = entropy
+    workers = workers or os.cpu_count() or 1
+    if n * network.n < PARALLEL_THRESHOLD or workers == 1:
+        for k, size in enumerate(sizes):
+            result.merge(simulate_chunk(*args, k, size))
+        return result
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(simulate_chunk, *(repeat(a) for a in args), range(len(sizes)), sizes,
+                             chunksize=max(1, len(sizes) // (4 * workers))):
+            result.merge(part)
+    return result
@@ -0,0 +1,162 @@
+"""Sensitivity of a linear program's optimum, read off its optimal basis.
+
+With B the optimal basis, the basic values are x_B = B^-1 (b - N x_N) and
+the reduced costs d = c - A^T y with y = B^-T c_B.  Both are linear in the
+data, so one solve gives:
+
+- shadow prices y (the rate of change of the optimum with each b_i) and
+  reduced costs d;
+- the range of each b_i over which B stays optimal: x_B moves along
+  B^-1 e_i and the range ends where a basic variable reaches a bound;
+- the range of each c_j: a nonbasic c_j moves only d_j, a basic one moves
+  every d_k by its entry in row p of B^-1 A, and the range ends where a
+  reduced cost changes sign.
+
+``parametric_rhs`` follows the optimum as b_i sweeps an interval.  Between
+breakpoints the objective is linear with slope y_i; at a breakpoint the
+basic variable that reaches its bound leaves in one dual simplex pivot,
+which keeps the basis optimal for the next piece.  The whole curve costs
+one solve plus one pivot per breakpoint, and the breakpoints are exact.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from cven_app.engine import lp
+
+# Pivots allowed in one sweep of ``parametric_rhs`` (degenerate breakpoints can repeat)
+MAX_PIVOTS = 1000
+
+
+@dataclass
+class Sensitivity:
+    """Shadow prices, reduced costs and the ranges over which the optimal basis stays optimal."""
+    duals: np.ndarray           # d objective / d b_i
+    reduced_costs: np.ndarray   # d objective / d x_j
+    rhs_low: np.ndarray         # b_i may move to [rhs_low, rhs_high]...
+    rhs_high: np.ndarray
+    cost_low: np.ndarray        # ...or c_j to [cost_low, cost_high], one at a time
+    cost_high: np.ndarray
+
+
+@dataclass
+class ParametricCurve:
+    """The optimum as one right-hand side varies: exact at every breakpoint, linear between."""
+    b: np.ndarray               # right-hand side at the ends and breakpoints, ascending
+    objective: np.ndarray
+    duals: np.ndarray           # shadow price of the row on each piece (one fewer than points)
+    pivots: int
+    infeasible_below: float = None  # the problem has no solution below this value (if within the sweep)
+    infeasible_above: float = None
+
+
+def _optimal_simplex(problem, result):
+    # The simplex state at the optimal basis of ``result``, refactorized from scratch
+    if result is None:
+        result = lp.solve(problem)
+    if not result.optimal or result.basis is None:
+        raise ValueError(f'Sensitivity needs an optimal basis (the problem is {result.status})')
+    simplex = lp.RevisedSimplex(problem, result.basis)
+    simplex.b = simplex.b.copy()
+    return simplex, result
+
+
+def _rhs_steps(simplex, row, sign):
+    # Change of the basic values per unit move of b[row] (in direction sign), and how far each may go
+    unit = np.zeros(simplex.m)
+    unit[row] = sign
+    rate = simplex.factor.ftran(unit)
+    head = simplex.head
+    xb, lo, hi = simplex.x[head], simplex.lower[head], simplex.upper[head]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        steps = np.where(rate < -lp.PIVOT_TOL, (lo - xb) / rate,
+                         np.where(rate > lp.PIVOT_TOL, (hi - xb) / rate, np.inf))
+    return rate, np.maximum(steps, 0.0)
+
+
+def ranging(problem, result=None):
+    """``Sensitivity`` of ``problem`` at the optimal basis of ``result`` (solved here if not given)."""
+    simplex, result = _optimal_simplex(problem, result)
+    m, n = problem.shape
+    rhs_low, rhs_high = np.empty(m), np.empty(m)
+    for i in range(m):
+        rhs_high[i] = problem.b[i] + _rhs_steps(simplex, i, 1.0)[1].min(initial=np.inf)
+        rhs_low[i] = problem.b[i] - _rhs_steps(simplex, i, -1.0)[1].min(initial=np.inf)
+    # Cost ranges in the solver's minimization form, then turned back to the problem's sense
+    d = simplex.reduced_costs()
+    movable = ~simplex.basic & (simplex.lower < simplex.upper)
+    at_lower = movable & (simplex.x <= simplex.lower)
+    at_upper = movable & (simplex.x >= simplex.upper)
+    free = movable & ~at_lower & ~at_upper
+    up, down = np.full(n, np.inf), np.full(n, -np.inf)
+    nonbasic = ~simplex.basic[:n]
+    up[nonbasic & at_upper[:n]] = -d[:n][nonbasic & at_upper[:n]]
+    down[nonbasic & at_lower[:n]] = -d[:n][nonbasic & at_lower[:n]]
+    up[free[:n]] = down[free[:n]] = -d[:n][free[:n]]
+    for p in np.flatnonzero(simplex.head < n):
+        unit = np.zeros(simplex.m)
+        unit[p] = 1.0
+        row = simplex.rmatvec(simplex.factor.btran(unit))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = d / row
+        caps = (at_lower & (row > lp.PIVOT_TOL)) | (at_upper & (row < -lp.PIVOT_TOL))
+        floors = (at_lower & (row < -lp.PIVOT_TOL)) | (at_upper & (row > lp.PIVOT_TOL))
+        pinned = (free & (np.abs(row) > lp.PIVOT_TOL)).any()
+        j = simplex.head[p]
+        up[j] = 0.0 if pinned else max(np.min(ratio[caps], initial=np.inf), 0.0)
+        down[j] = 0.0 if pinned else min(np.max(ratio[floors], initial=-np.inf), 0.0)
+    if problem.maximize:
+        up, down = -down, -up
+    return Sensitivity(result.duals, result.reduced_costs, rhs_low, rhs_high, problem.c + down, problem.c + up)
+
+
+def _sweep(problem, result, row, sign, distance):
+    # Points (distance moved, objective) from b[row] towards sign * distance, pivots, and whether it ran infeasible
+    simplex, _ = _optimal_simplex(problem, result)
+    n = simplex.n
+    points, slopes = [(0.0, float(problem.c @ simplex.x[:n]))], []
+    moved, pivots = 0.0, 0
+    while moved < distance and pivots < MAX_PIVOTS:
+        rate, steps = _rhs_steps(simplex, row, sign)
+        p = int(np.argmin(steps)) if len(steps) else 0
+        step = min(steps[p] if len(steps) else np.inf, distance - moved)
+        slopes.append(float(simplex.duals()[row]) * (-1.0 if problem.maximize else 1.0))
+        simplex.x[simplex.head] += step * rate
+        simplex.b[row] += sign * step
+        moved += step
+        points.append((moved, float(problem.c @ simplex.x[:n])))
+        if moved >= distance:
+            break
+        # Basic position p reaches a bound: it leaves there in a dual simplex pivot
+        to_lower = rate[p] < 0
+        q = simplex.dual_ratio_test(p, to_lower)
+        if q is None:
+            return points, slopes, pivots, True
+        alpha = simplex.factor.ftran(simplex.column(q))
+        leaving = simplex.head[p]
+        direction = np.sign(alpha[p]) if to_lower else -np.sign(alpha[p])
+        simplex.pivot(q, direction, 0.0, p, alpha)
+        simplex.x[leaving] = simplex.lower[leaving] if to_lower else simplex.upper[leaving]
+        pivots += 1
+    return points, slopes, pivots, False
+
+
+def parametric_rhs(problem, row, low, high, result=None):
+    """``ParametricCurve`` of the optimum as ``b[row]`` sweeps [``low``, ``high``].
+
+    ``result`` is the optimal solution at the current ``b`` (solved here if
+    not given); the sweep warm-starts from its basis in both directions.
+    """
+    if result is None:
+        result = lp.solve(problem)
+    base = problem.b[row]
+    above, slopes_above, pivots_above, stop_above = _sweep(problem, result, row, 1.0, max(high - base, 0.0))
+    below, slopes_below, pivots_below, stop_below = _sweep(problem, result, row, -1.0, max(base - low, 0.0))
+    b = np.r_[[base - t for t, _ in below[:0:-1]], [base + t for t, _ in above]]
+    objective = np.r_[[z for _, z in below[:0:-1]], [z for _, z in above]]
+    # Zero-length pieces (degenerate breakpoints) add no information
+    keep = np.r_[True, np.diff(b) > 1e-12]
+    duals = np.r_[slopes_below[::-1], slopes_above]
+    return ParametricCurve(b[keep], objective[keep], duals[keep[1:]],
+                           pivots_above + pivots_below,
+                           float(b[0]) if stop_below else None, float(b[-1]) if stop_above else None)
@@ -0,0 +1,255 @@
+"""Compressed sparse column matrices and LU factorizations, in plain NumPy.
+
+``CSCMatrix`` stores the nonzeros of column j in ``data[indptr[j]:indptr[j + 1]]``
+(rows in ``indices``), which is how the simplex method reads a constraint
+matrix: one column at a time, and A^T y for all columns at once.
+
+``LU`` factorizes a dense square matrix with partial pivoting (P A = L U)
+in blocks of ``BLOCK`` columns: the columns of a panel are eliminated one
+at a time and the rest of the matrix is updated with one matrix product per
+panel.  Triangular solves run block by block with the inverted diagonal
+blocks, so a solve is about n / ``BLOCK`` matrix-vector products.
+
+``SparseLU`` factorizes a sparse square matrix given by its nonzeros.  Rows
+with a single nonzero (and, after them, columns with a single nonzero) are
+peeled off in rounds; each round is a level of a triangular factor solved
+with one vectorized step, and only the "bump" left over is factored
+densely with ``LU``.  Simplex bases of network, staircase and
+slack-heavy problems are mostly triangular, so the bump is small.
+"""
+import numpy as np
+
+BLOCK = 64
+# Pivots below this (relative to the largest entry) make a matrix singular
+SINGULAR_TOL = 1e-11
+# Rounds of singleton peeling before the rest is left to the dense bump
+MAX_LEVELS = 256
+
+
+class CSCMatrix:
+    """An m x n sparse matrix in compressed sparse column form."""
+
+    def __init__(self, shape, indptr, indices, data):
+        self.shape = tuple(int(s) for s in shape)
+        self.indptr = np.asarray(indptr, dtype=np.intp)
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.data = np.asarray(data, dtype=float)
+        # Column of each stored entry, for A^T y by bincount
+        self.cols = np.repeat(np.arange(self.shape[1]), np.diff(self.indptr))
+
+    @classmethod
+    def from_triplets(cls, rows, cols, values, shape):
+        """Matrix with ``values`` at (``rows``, ``cols``); duplicates are summed and zeros dropped."""
+        rows, cols = np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)
+        values = np.asarray(values, dtype=float)
+        order = np.lexsort((rows, cols))
+        rows, cols, values = rows[order], cols[order], values[order]
+        if len(rows):
+            start = np.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])]
+            values = np.add.reduceat(values, np.flatnonzero(start))
+            rows, cols = rows[start], cols[start]
+        keep = values != 0
+        rows, cols, values = rows[keep], cols[keep], values[keep]
+        indptr = np.searchsorted(cols, np.arange(shape[1] + 1))
+        return cls(shape, indptr, rows, values)
+
+    @classmethod
+    def from_dense(cls, a):
+        a = np.atleast_2d(np.asarray(a, dtype=float))
+        cols, rows = np.nonzero(a.T)
+        return cls(a.shape, np.searchsorted(cols, np.arange(a.shape[1] + 1)), rows, a[rows, cols])
+
+    @classmethod
+    def convert(cls, a):
+        """``a`` as a ``CSCMatrix`` (a dense array, a nested list or a ``CSCMatrix``)."""
+        return a if isinstance(a, cls) else cls.from_dense(a)
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    def column(self, j):
+        """Rows and values of the nonzeros of column ``j``."""
+        s, e = self.indptr[j], self.indptr[j + 1]
+        return self.indices[s:e], self.data[s:e]
+
+    def dense_column(self, j):
+        out = np.zeros(self.shape[0])
+        rows, values = self.column(j)
+        out[rows] = values
+        return out
+
+    def entries(self, cols):
+        """Rows, values and position in ``cols`` of every nonzero of the columns ``cols``."""
+        cols = np.asarray(cols, dtype=np.intp)
+        starts, counts = self.indptr[cols], self.indptr[cols + 1] - self.indptr[cols]
+        position = np.repeat(np.arange(len(cols)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        index = starts[position] + offsets
+        return self.indices[index], self.data[index], position
+
+    def matvec(self, x):
+        """A x."""
+        return np.bincount(self.indices, weights=self.data * x[self.cols], minlength=self.shape[0])
+
+    def rmatvec(self, y):
+        """A^T y."""
+        return np.bincount(self.cols, weights=self.data * y[self.indices], minlength=self.shape[1])
+
+    def toarray(self):
+        out = np.zeros(self.shape)
+        out[self.indices, self.cols] = self.data
+        return out
+
+
+class LU:
+    """P A = L U of a dense square matrix, with solves for A x = b and A^T x = b."""
+
+    def __init__(self, a):
+        lu = np.array(a, dtype=float)
+        n = len(lu)
+        perm = np.arange(n)
+        tol = SINGULAR_TOL * max(np.abs(lu).max(initial=0.0), 1.0)
+        for j0 in range(0, n, BLOCK):
+            j1 = min(j0 + BLOCK, n)
+            # Eliminate the panel's columns one at a time...
+            for j in range(j0, j1):
+                p = j + int(np.abs(lu[j:, j]).argmax())
+                if abs(lu[p, j]) <= tol:
+                    raise np.linalg.LinAlgError('Singular matrix')
+                if p != j:
+                    lu[[j, p]] = lu[[p, j]]
+                    perm[[j, p]] = perm[[p, j]]
+                lu[j + 1:, j] /= lu[j, j]
+                lu[j + 1:, j + 1:j1] -= np.outer(lu[j + 1:, j], lu[j, j + 1:j1])
+            # ...then update the rest of the matrix with one product
+            if j1 < n:
+                lower = np.tril(lu[j0:j1, j0:j1], -1) + np.eye(j1 - j0)
+                lu[j0:j1, j1:] = np.linalg.solve(lower, lu[j0:j1, j1:])
+                lu[j1:, j1:] -= lu[j1:, j0:j1] @ lu[j0:j1, j1:]
+        self.lu, self.perm = lu, perm
+        self.blocks = [(s, min(s + BLOCK, n)) for s in range(0, n, BLOCK)]
+        self.lower_inv = [np.linalg.inv(np.tril(lu[s:e, s:e], -1) + np.eye(e - s)) for s, e in self.blocks]
+        self.upper_inv = [np.linalg.inv(np.triu(lu[s:e, s:e])) for s, e in self.blocks]
+
+    def solve(self, b):
+        """x with A x = b."""
+        lu = self.lu
+        x = np.array(b, dtype=float)[self.perm]
+        for (s, e), inv in zip(self.blocks, self.lower_inv):
+            x[s:e] = inv @ (x[s:e] - lu[s:e, :s] @ x[:s])
+        for (s, e), inv in zip(reversed(self.blocks), reversed(self.upper_inv)):
+            x[s:e] = inv @ (x[s:e] - lu[s:e, e:] @ x[e:])
+        return x
+
+    def solve_transpose(self, b):
+        """x with A^T x = b."""
+        lu = self.lu
+        x = np.array(b, dtype=float)
+        for (s, e), inv in zip(self.blocks, self.upper_inv):
+            x[s:e] = inv.T @ (x[s:e] - lu[:s, s:e].T @ x[:s])
+        for (s, e), inv in zip(reversed(self.blocks), reversed(self.lower_inv)):
+            x[s:e] = inv.T @ (x[s:e] - lu[e:, s:e].T @ x[e:])
+        out = np.empty_like(x)
+        out[self.perm] = x
+        return out
+
+
+def _peel(rows, cols, counts, active_own, active_other, own, other):
+    # One round of singletons: active ``own`` lines (rows or columns) with one active nonzero,
+    # paired with the ``other`` line of that nonzero, at most one ``own`` line per ``other`` line
+    singles = active_own & (counts == 1)
+    if not singles.any():
+        return None
+    hit = singles[own] & active_other[other]
+    other_lines, first = np.unique(other[hit], return_index=True)
+    return own[hit][first], other_lines
+
+
+class SparseLU:
+    """Solves with a sparse n x n matrix: triangular levels of singletons around a dense bump."""
+
+    def __init__(self, n, rows, cols, values):
+        rows, cols = np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)
+        values = np.asarray(values, dtype=float)
+        self.n = n
+        tol = SINGULAR_TOL * max(np.abs(values).max(initial=0.0), 1.0)
+        active_r, active_c = np.ones(n, dtype=bool), np.ones(n, dtype=bool)
+        row_count, col_count = np.bincount(rows, minlength=n), np.bincount(cols, minlength=n)
+        # Row singletons come first in a solve, column singletons last
+        peeled = {'lower': [], 'upper': []}
+        for side in ('lower', 'upper'):
+            while len(peeled['lower']) + len(peeled['upper']) < MAX_LEVELS:
+                if side == 'lower':
+                    found = _peel(rows, cols, row_count, active_r, active_c, rows, cols)
+                    r, c = found if found else (None, None)
+                else:
+                    found = _peel(rows, cols, col_count, active_c, active_r, cols, rows)
+                    c, r = found if found else (None, None)
+                if found is None:
+                    break
+                active_r[r], active_c[c] = False, False
+                gone_r, gone_c = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+                gone_r[r], gone_c[c] = True, True
+                row_count -= np.bincount(rows[gone_c[cols] & active_r[rows]], minlength=n)
+                col_count -= np.bincount(cols[gone_r[rows] & active_c[cols]], minlength=n)
+                peeled[side].append((r, c))
+        self.lower = [self._level(r, c, rows, cols, values, tol) for r, c in peeled['lower']]
+        self.upper = [self._level(r, c, rows, cols, values, tol) for r, c in peeled['upper']]
+        # The bump, with its couplings to the peeled rows and columns
+        self.bump_rows, self.bump_cols = np.flatnonzero(active_r), np.flatnonzero(active_c)
+        if len(self.bump_rows) != len(self.bump_cols):
+            raise np.linalg.LinAlgError('Singular matrix')
+        row_pos, col_pos = np.full(n, -1), np.full(n, -1)
+        row_pos[self.bump_rows] = np.arange(len(self.bump_rows))
+        col_pos[self.bump_cols] = np.arange(len(self.bump_cols))
+        inside = active_r[rows] & active_c[cols]
+        bump = np.zeros((len(self.bump_rows), len(self.bump_cols)))
+        bump[row_pos[rows[inside]], col_pos[cols[inside]]] = values[inside]
+        self.lu = LU(bump) if len(bump) else None
+        into_rows = active_r[rows] & ~active_c[cols]
+        self.bump_in = (row_pos[rows[into_rows]], cols[into_rows], values[into_rows])
+        into_cols = active_c[cols] & ~active_r[rows]
+        self.bump_in_t = (col_pos[cols[into_cols]], rows[into_cols], values[into_cols])
+
+    def _level(self, r, c, rows, cols, values, tol):
+        # Pivots (r[i], c[i]) and the other nonzeros of those rows (for solve) and columns (for solve_transpose)
+        pos_r, pos_c = np.full(self.n, -1), np.full(self.n, -1)
+        pos_r[r], pos_c[c] = np.arange(len(r)), np.arange(len(c))
+        in_rows, in_cols = pos_r[rows] >= 0, pos_c[cols] >= 0
+        diagonal = in_rows & (pos_r[rows] == pos_c[cols])
+        diag = np.zeros(len(r))
+        diag[pos_r[rows[diagonal]]] = values[diagonal]
+        if np.any(np.abs(diag) <= tol):
+            raise np.linalg.LinAlgError('Singular matrix')
+        off_r, off_c = in_rows & ~diagonal, in_cols & ~diagonal
+        return (r, c, diag, (pos_r[rows[off_r]], cols[off_r], values[off_r]),
+                (pos_c[cols[off_c]], rows[off_c], values[off_c]))
+
+    def solve(self, b):
+        """x with A x = b."""
+        b = np.asarray(b, dtype=float)
+        x = np.zeros(self.n)
+        for r, c, diag, (pos, other, values), _ in self.lower:
+            x[c] = (b[r] - np.bincount(pos, values * x[other], minlength=len(r))) / diag
+        if self.lu is not None:
+            pos, other, values = self.bump_in
+            x[self.bump_cols] = self.lu.solve(b[self.bump_rows] - np.bincount(pos, values * x[other],
+                                                                             minlength=len(self.bump_rows)))
+        for r, c, diag, (pos, other, values), _ in reversed(self.upper):
+            x[c] = (b[r] - np.bincount(pos, values * x[other], minlength=len(r))) / diag
+        return x
+
+    def solve_transpose(self, b):
+        """x with A^T x = b."""
+        b = np.asarray(b, dtype=float)
+        x = np.zeros(self.n)
+        for r, c, diag, _, (pos, other, values) in self.upper:
+            x[r] = (b[c] - np.bincount(pos, values * x[other], minlength=len(c))) / diag
+        if self.lu is not None:
+            pos, other, values = self.bump_in_t
+            x[self.bump_rows] = self.lu.solve_transpose(b[self.bump_cols] - np.bincount(pos, values * x[other],
+                                                                                       minlength=len(self.bump_cols)))
+        for r, c, diag, _, (pos, other, values) in reversed(self.lower):
+            x[r] = (b[c] - np.bincount(pos, values * x[other], minlength=len(c))) / diag
+        return x
@@ -0,0 +1,158 @@
+"""Single-pass statistics for sample streams that do not fit in memory.
+
+Each accumulator consumes values one chunk at a time and keeps a fixed-size
+state, so memory does not grow with the number of samples:
+
+* ``RunningStats`` - count, mean, variance, min and max (Welford's update,
+  applied per chunk with Chan's pairwise combination).
+* ``TDigest`` - a merging t-digest for quantiles, accurate in the tails.
+* ``FixedHistogram`` - counts on bins fixed up front, with under/overflow.
+
+Every accumulator also has ``merge(other)``, so partial results for separate
+chunks can be combined in any grouping.
+"""
+import numpy as np
+
+DIGEST_COMPRESSION = 1000
+
+
+class RunningStats:
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0          # sum of squared deviations from the mean
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        mean = values.mean()
+        self._combine(values.size, mean, np.square(values - mean).sum(), values.min(), values.max())
+
+    def merge(self, other):
+        if other.n:
+            self._combine(other.n, other.mean, other.m2, other.min, other.max)
+
+    def _combine(self, n, mean, m2, lo, hi):
+        # Chan et al.: exact pooled mean and M2 of two disjoint samples
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        self.min = min(self.min, float(lo))
+        self.max = max(self.max, float(hi))
+
+    def variance(self, ddof=0):
+        return self.m2 / (self.n - ddof) if self.n > ddof else np.nan
+
+    def std(self, ddof=0):
+        return np.sqrt(self.variance(ddof))
+
+
+class TDigest:
+    """Merging t-digest (Dunning) with the arcsine scale function.
+
+    Centroids near the median absorb many samples while those near either
+    tail stay small, so extreme quantiles keep their accuracy.  About
+    ``compression / 2`` centroids are kept.
+    """
+
+    def __init__(self, compression=DIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def n(self):
+        return self.weights.sum()
+
+    def update(self, values):
+        values = np.sort(np.asarray(values, dtype=float).ravel())
+        if not values.size:
+            return
+        # Unit weights: the k-scale boundaries map straight to sorted positions
+        n = values.size
+        j = np.arange(np.ceil(-self.compression / 4), np.floor(self.compression / 4) + 1)
+        bounds = np.ceil((1 + np.sin(2 * np.pi * j / self.compression)) / 2 * n - 0.5)
+        starts = np.unique(np.clip(bounds, 0, n - 1).astype(np.intp))
+        starts[0] = 0
+        weights = np.diff(np.append(starts, n)).astype(float)
+        self._absorb(np.add.reduceat(values, starts) / weights, weights, values[0], values[-1])
+
+    def merge(self, other):
+        if other.weights.size:
+            self._absorb(other.means, other.weights, other.min, other.max)
+
+    def _absorb(self, means, weights, lo, hi):
+        means = np.concatenate((self.means, means))
+        weights = np.concatenate((self.weights, weights))
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        # Group consecutive centroids into unit steps of k(q) = d/(2 pi) asin(2q - 1)
+        cum = np.cumsum(weights)
+        q = (cum - weights / 2) / cum[-1]
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(k)) + 1))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+        self.min = min(self.min, float(lo))
+        self.max = max(self.max, float(hi))
+
+    def quantile(self, q):
+        """Quantiles for ``q`` in [0, 1], interpolated between centroid centres."""
+        if not self.weights.size:
+            return np.full(np.shape(q), np.nan)
+        cum = np.cumsum(self.weights)
+        centres = cum - self.weights / 2
+        ranks = np.concatenate(([0.0], centres, [cum[-1]]))
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        return np.interp(np.asarray(q, dtype=float) * cum[-1], ranks, values)
+
+
+class FixedHistogram:
+    def __init__(self, lo, hi, bins):
+        self.edges = np.linspace(lo, hi, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.under = 0
+        self.over = 0
+
+    @property
+    def n(self):
+        return int(self.counts.sum()) + self.under + self.over
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        lo, hi = self.edges[0], self.edges[-1]
+        bins = self.counts.size
+        inside = (values >= lo) & (values <= hi)
+        self.under += int((values < lo).sum())
+        self.over += int((values > hi).sum())
+        # The right edge belongs to the last bin, as in np.histogram
+        index = np.minimum(((values[inside] - lo) * (bins / (hi - lo))).astype(np.intp), bins - 1)
+        self.counts += np.bincount(index, minlength=bins)
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.under += other.under
+        self.over += other.over
+
+    def quantile(self, q):
+        """Quantiles read off the binned CDF (linear within each bin)."""
+        cdf = np.concatenate(([self.under], self.under + np.cumsum(self.counts))) / self.n
+        return np.interp(np.asarray(q, dtype=float), cdf, self.edges)
+
+    def regroup(self, bins):
+        """(counts, edges) for display: empty outer bins dropped, at most ``bins`` groups."""
+        filled = np.flatnonzero(self.counts)
+        if not filled.size:
+            return np.zeros(0, dtype=np.int64), self.edges[:1]
+        first, last = filled[0], filled[-1] + 1
+        step = -(-(last - first) // bins)
+        last = min(first + step * -(-(last - first) // step), self.counts.size)
+        starts = np.arange(first, last, step)
+        return np.add.reduceat(self.counts[first:last], starts - first), self.edges[np.append(starts, last)]
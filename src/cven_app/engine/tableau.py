@@ -0,0 +1,265 @@
+"""Textbook simplex tableaux for any linear program, kept as a pivot history.
+
+``TableauSimplex`` brings a ``LinearProgram`` (nonnegative variables) to
+standard form: each row is scaled to a nonnegative right-hand side, a <=
+row gets a slack, a >= row a surplus and an artificial, and an = row an
+artificial, so the slacks and artificials form the starting identity
+basis.  The artificials are removed either in two phases (phase 1
+minimizes their sum W, phase 2 starts from its optimal tableau without
+them) or by the Big-M method, where they cost M in the objective.  M is
+kept symbolic: every objective-row entry is a pair (constant, multiple of
+M), compared multiple-of-M first, so no large number spoils the
+arithmetic.
+
+The solve does not store tableaux.  Pivot k multiplies the constraint rows
+by an eta matrix E_k, equal to the identity except for the pivot column,
+so it is recorded as a ``Pivot``: the entering and leaving variables, the
+row, and the nonzeros of that column.  Tableau k is E_k ... E_1 T_0, and
+its objective row follows from the basis.  ``tableau(k)`` moves one
+working tableau there from where it last was, applying E_j to step
+forward or its inverse (also an eta matrix) to step back, or starts again
+from T_0 when that is closer.  Memory is the starting tableau, the working
+tableau and O(m) per pivot.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from cven_app.engine.lp import DEGENERATE_LIMIT
+
+TOL = 1e-9
+# Pivots before the solve stops with 'iteration_limit'
+MAX_PIVOTS = 10_000
+METHODS = ('two-phase', 'big-m')
+
+
+def _fresh(name, taken):
+    # ``name``, primed until it differs from the problem's variables and earlier generated names
+    while name in taken:
+        name += "'"
+    taken.add(name)
+    return name
+
+
+@dataclass(frozen=True)
+class Pivot:
+    """One step of the history: ``entering`` replaces ``leaving`` as the basic variable of ``row``.
+
+    ``index`` and ``values`` are the nonzeros of the eta column minus the
+    unit vector.  A step with ``entering`` None only starts phase 2.
+    """
+    phase: int                  # phase of the tableau this step leads to
+    entering: int = None
+    leaving: int = None
+    row: int = None
+    index: np.ndarray = None
+    values: np.ndarray = None
+
+
+@dataclass
+class Tableau:
+    """The tableau after ``step`` pivots: constraint rows (last column RHS) and objective row."""
+    step: int
+    phase: int
+    columns: list               # variable names shown, then 'RHS'
+    basis: list                 # name of the basic variable of each row
+    rows: np.ndarray            # m x (len(columns)), restricted to the shown columns
+    objective_label: str
+    objective: np.ndarray       # z_j - c_j and the objective value, constant part
+    objective_m: np.ndarray     # multiples of M (zero unless Big-M)
+    pivot: tuple = None         # (row, column position) of the next pivot, if there is one
+
+
+class TableauSimplex:
+    """Solves ``problem`` by the tableau method and replays any of its tableaux on demand."""
+
+    def __init__(self, problem, method='two-phase', max_pivots=MAX_PIVOTS):
+        if method not in METHODS:
+            raise ValueError(f'method must be one of {METHODS}')
+        if np.any(problem.lower != 0) or np.any(np.isfinite(problem.upper)):
+            raise ValueError('The tableau method needs variables bounded only by x >= 0')
+        self.problem, self.method = problem, method
+        a, b = problem.A.toarray(), problem.b.copy()
+        senses = np.array(list(problem.senses))
+        m, n = a.shape
+        # Rows with a negative right-hand side are multiplied by -1, which flips their sense
+        flip = b < 0
+        a[flip], b[flip] = -a[flip], -b[flip]
+        senses[flip] = np.where(senses[flip] == '<', '>', np.where(senses[flip] == '>', '<', '='))
+        slack_rows = np.flatnonzero(senses != '=')
+        art_rows = np.flatnonzero(senses != '<')
+        self.names = list(problem.names)
+        taken = set(self.names) | {'RHS'}
+        self.names += [_fresh(('s' if senses[i] == '<' else 'e') + str(i + 1), taken) for i in slack_rows]
+        self.names += [_fresh(f'a{i + 1}', taken) for i in art_rows]
+        self.n = n
+        self.size = n + len(slack_rows) + len(art_rows)
+        t = np.zeros((m, self.size + 1))
+        t[:, :n] = a
+        t[slack_rows, n + np.arange(len(slack_rows))] = np.where(senses[slack_rows] == '<', 1.0, -1.0)
+        t[art_rows, n + len(slack_rows) + np.arange(len(art_rows))] = 1.0
+        t[:, -1] = b
+        self.initial = t
+        self.initial.setflags(write=False)
+        basis = np.empty(m, dtype=np.intp)
+        le = slack_rows[senses[slack_rows] == '<']
+        basis[le] = n + np.flatnonzero(senses[slack_rows] == '<')
+        basis[art_rows] = n + len(slack_rows) + np.arange(len(art_rows))
+        self.initial_basis = basis
+        self.artificial = np.arange(self.size) >= n + len(slack_rows)
+        # Objectives in maximization form, as (constant, multiple of M) per column
+        c = -problem.c if not problem.maximize else problem.c.copy()
+        self.costs = {2: (np.r_[c, np.zeros(self.size - n)], np.zeros(self.size))}
+        if len(art_rows) and method == 'two-phase':
+            self.costs[1] = (-self.artificial.astype(float), np.zeros(self.size))
+        elif len(art_rows):
+            self.costs[2] = (self.costs[2][0], -self.artificial.astype(float))
+        self.steps = []
+        self.status = None
+        self._solve(max_pivots)
+        self._at = (0, self.initial.copy(), basis.copy())
+
+    def phase(self, k):
+        """Phase of tableau ``k`` (1 for phase 1, 2 for phase 2 or the only phase)."""
+        return self.steps[k - 1].phase if k else min(self.costs)
+
+    def objective_row(self, t, basis, phase):
+        """z_j - c_j for every column and the objective value, as constant and M parts."""
+        parts = []
+        for cost in self.costs[phase]:
+            parts.append(cost[basis] @ t - np.r_[cost, 0.0])
+        return parts
+
+    def _entering(self, t, basis, phase, bland):
+        z, z_m = self.objective_row(t, basis, phase)
+        z, z_m = z[:-1], z_m[:-1]
+        allowed = ~self.artificial if phase == 2 and 1 in self.costs else np.ones(self.size, dtype=bool)
+        allowed &= ~np.isin(np.arange(self.size), basis)
+        by_m = allowed & (z_m < -TOL)
+        if by_m.any():
+            candidates, score = by_m, z_m
+        else:
+            candidates, score = allowed & (np.abs(z_m) <= TOL) & (z < -TOL), z
+        if not candidates.any():
+            return None
+        if bland:
+            return int(np.argmax(candidates))
+        return int(np.argmin(np.where(candidates, score, np.inf)))
+
+    @staticmethod
+    def _leaving(t, basis, q, bland):
+        column = t[:, q]
+        rows = np.flatnonzero(column > TOL)
+        if not len(rows):
+            return None
+        ratios = t[rows, -1] / column[rows]
+        tied = rows[ratios <= ratios.min() + TOL]
+        # Ties go to the first row, or under Bland's rule to the lowest-numbered variable
+        return int(tied[np.argmin(basis[tied])]) if bland else int(tied[0])
+
+    @staticmethod
+    def _apply(t, step):
+        # E t = t + (eta - e_r) t[r]
+        t[step.index] += np.outer(step.values, t[step.row])
+
+    @staticmethod
+    def _undo(t, step):
+        # E^-1 = I + (alpha - e_r) e_r^T, with the pivot column alpha read back from eta
+        at = int(np.flatnonzero(step.index == step.row)[0])
+        alpha_r = 1 / (step.values[at] + 1)
+        alpha = -step.values * alpha_r
+        alpha[at] = alpha_r - 1
+        t[step.index] += np.outer(alpha, t[step.row])
+
+    def _pivot(self, t, basis, phase, q, r):
+        eta = -t[:, q] / t[r, q]
+        eta[r] = 1 / t[r, q] - 1
+        # The pivot row is always kept, so the pivot can be read back from the eta column
+        index = np.flatnonzero((eta != 0) | (np.arange(len(eta)) == r))
+        step = Pivot(phase, q, int(basis[r]), r, index, eta[index])
+        self._apply(t, step)
+        basis[r] = q
+        self.steps.append(step)
+
+    def _run(self, t, basis, phase, max_pivots):
+        degenerate = 0
+        while True:
+            if len(self.steps) >= max_pivots:
+                return 'iteration_limit'
+            q = self._entering(t, basis, phase, degenerate >= DEGENERATE_LIMIT)
+            if q is None:
+                return 'optimal'
+            r = self._leaving(t, basis, q, degenerate >= DEGENERATE_LIMIT)
+            if r is None:
+                return 'unbounded'
+            degenerate = degenerate + 1 if t[r, -1] <= TOL else 0
+            self._pivot(t, basis, phase, q, r)
+
+    def _solve(self, max_pivots):
+        t, basis = self.initial.copy(), self.initial_basis.copy()
+        self.final = (t, basis)
+        scale = 1.0 + np.abs(t[:, -1]).max(initial=0.0)
+        if 1 in self.costs:
+            status = self._run(t, basis, 1, max_pivots)
+            if status != 'optimal':
+                self.status = status
+                return
+            if t[self.artificial[basis], -1].sum() > TOL * scale:
+                self.status = 'infeasible'
+                return
+            # Artificials left in the basis at zero leave on any nonzero entry of their row
+            for r in np.flatnonzero(self.artificial[basis]):
+                entries = np.flatnonzero((np.abs(t[r, :-1]) > TOL) & ~self.artificial)
+                if len(entries):
+                    self._pivot(t, basis, 1, int(entries[0]), r)
+            self.steps.append(Pivot(2))
+        status = self._run(t, basis, 2, max_pivots)
+        # With Big-M, pricing reaches the constant part only once the artificial sum is least,
+        # so an artificial still positive at the end (optimal or unbounded) means no solution
+        if status != 'iteration_limit' and t[self.artificial[basis], -1].sum() > TOL * scale:
+            status = 'infeasible'
+        self.status = status
+
+    def solution(self):
+        """Values of the problem's variables and the objective at the last tableau."""
+        t, basis = self.final
+        x = np.zeros(self.size)
+        x[basis] = t[:, -1]
+        return x[:self.n], float(self.problem.c @ x[:self.n])
+
+    def _seek(self, k):
+        # Move the working tableau to step k, from where it is or from the start
+        at, t, basis = self._at
+        if k < abs(k - at):
+            at, t, basis = 0, self.initial.copy(), self.initial_basis.copy()
+        while at < k:
+            step = self.steps[at]
+            if step.entering is not None:
+                self._apply(t, step)
+                basis[step.row] = step.entering
+            at += 1
+        while at > k:
+            at -= 1
+            step = self.steps[at]
+            if step.entering is not None:
+                self._undo(t, step)
+                basis[step.row] = step.leaving
+        self._at = (at, t, basis)
+        return t, basis
+
+    def tableau(self, k):
+        """The ``Tableau`` after ``k`` steps (0 is the starting tableau)."""
+        k = int(np.clip(k, 0, len(self.steps)))
+        t, basis = self._seek(k)
+        phase = self.phase(k)
+        # Phase 2 of the two-phase method drops the artificial columns
+        shown = np.flatnonzero(~self.artificial) if phase == 2 and 1 in self.costs else np.arange(self.size)
+        z, z_m = self.objective_row(t, basis, phase)
+        label = '-W' if phase == 1 else ('Z' if self.problem.maximize else '-Z')
+        nxt = self.steps[k] if k < len(self.steps) else None
+        pivot = None
+        if nxt is not None and nxt.entering is not None:
+            pivot = (nxt.row, int(np.searchsorted(shown, nxt.entering)))
+        cols = np.r_[shown, self.size]
+        return Tableau(k, phase, [self.names[j] for j in shown] + ['RHS'], [self.names[j] for j in basis],
+                       t[:, cols].copy(), label, z[cols], z_m[cols], pivot)
@@ -0,0 +1,139 @@
+"""Vectorized time-value-of-money factors.
+
+Every function broadcasts its arguments with NumPy, so the same call works for a
+single slider value or for arrays of hundreds of thousands of cash flows.
+The i == 0 limit of each factor is selected with ``np.where`` rather than a
+Python branch.
+"""
+import numpy as np
+
+
+def _prepare(i, n):
+    i = np.asarray(i, dtype=float)
+    n = np.asarray(n, dtype=float)
+    zero = i == 0
+    # Replace i = 0 with a dummy rate so the closed forms never divide by zero;
+    # the exact limit is substituted afterwards with np.where.
+    safe_i = np.where(zero, 1.0, i)
+    return i, n, zero, safe_i
+
+
+def _growth(i, n):
+    # (1 + i)^n, computed through log1p for accuracy at small rates
+    return np.exp(n * np.log1p(i))
+
+
+def _growth_minus_one(i, n):
+    # (1 + i)^n - 1 without cancellation at small rates
+    return np.expm1(n * np.log1p(i))
+
+
+def f_p(i, n):
+    """F/P: future worth of a single present amount."""
+    i, n, _, _ = _prepare(i, n)
+    return _growth(i, n)
+
+
+def p_f(i, n):
+    """P/F: present worth of a single future amount."""
+    i, n, _, _ = _prepare(i, n)
+    return np.exp(-n * np.log1p(i))
+
+
+def f_a(i, n):
+    """F/A: future worth of a uniform end-of-period series."""
+    i, n, zero, safe_i = _prepare(i, n)
+    return np.where(zero, n, _growth_minus_one(i, n) / safe_i)
+
+
+def a_f(i, n):
+    """A/F: sinking fund factor."""
+    return 1.0 / f_a(i, n)
+
+
+def p_a(i, n):
+    """P/A: present worth of a uniform end-of-period series."""
+    i, n, zero, safe_i = _prepare(i, n)
+    return np.where(zero, n, -np.expm1(-n * np.log1p(i)) / safe_i)
+
+
+def a_p(i, n):
+    """A/P: capital recovery factor."""
+    return 1.0 / p_a(i, n)
+
+
+def p_g(i, n):
+    """P/G: present worth of an arithmetic gradient series (0, G, 2G, ...)."""
+    i, n, zero, safe_i = _prepare(i, n)
+    pg = (p_a(safe_i, n) - n * p_f(safe_i, n)) / safe_i
+    return np.where(zero, n * (n - 1) / 2, pg)
+
+
+def a_g(i, n):
+    """A/G: uniform series equivalent of an arithmetic gradient."""
+    i, n, zero, safe_i = _prepare(i, n)
+    ag = 1.0 / safe_i - n / np.where(zero, 1.0, _growth_minus_one(safe_i, n))
+    return np.where(zero, (n - 1) / 2, ag)
+
+
+FACTORS = {
+    'F/P': f_p,
+    'P/F': p_f,
+    'F/A': f_a,
+    'A/F': a_f,
+    'P/A': p_a,
+    'A/P': a_p,
+    'P/G': p_g,
+    'A/G': a_g,
+}
+
+
+def factors(i, n):
+    """Return every standard factor for the broadcast (i, n) grid as a dict of arrays."""
+    return {name: fn(i, n) for name, fn in FACTORS.items()}
+
+
+def future_worth(p, i, n):
+    """F = P(F/P, i, n)."""
+    return np.asarray(p, dtype=float) * f_p(i, n)
+
+
+def present_worth(f, i, n):
+    """P = F(P/F, i, n)."""
+    return np.asarray(f, dtype=float) * p_f(i, n)
+
+
+def annuity_present_worth(a, i, n):
+    """P = A(P/A, i, n)."""
+    return np.asarray(a, dtype=float) * p_a(i, n)
+
+
+def annuity_future_worth(a, i, n):
+    """F = A(F/A, i, n)."""
+    return np.asarray(a, dtype=float) * f_a(i, n)
+
+
+def capital_recovery(p, i, n):
+    """A = P(A/P, i, n)."""
+    return np.asarray(p, dtype=float) * a_p(i, n)
+
+
+def evaluate(p=0.0, a=0.0, f=0.0, g=0.0, i=0.0, n=1):
+    """Batch TVM evaluation in one broadcast call.
+
+    ``p`` (present amount), ``a`` (uniform series), ``f`` (future amount) and
+    ``g`` (arithmetic gradient) are combined into their equivalent present
+    worth, future worth and annual worth.  All inputs broadcast together.
+    """
+    fac = factors(i, n)
+    p = np.asarray(p, dtype=float)
+    a = np.asarray(a, dtype=float)
+    f = np.asarray(f, dtype=float)
+    g = np.asarray(g, dtype=float)
+    pw = p + a * fac['P/A'] + f * fac['P/F'] + g * fac['P/G']
+    return {
+        'PW': pw,
+        'FW': pw * fac['F/P'],
+        'AW': pw * fac['A/P'],
+        'factors': fac,
+    }
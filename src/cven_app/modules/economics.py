@@ -1,5 +1,10 @@
 from nicegui import ui
 import numpy as np
+from cven_app.engine import amortization, cashflow, depreciation, factor_tables, incremental, irr, portfolio, risk
+from cven_app.modules.runner import run_chunks
+
+# Compound-interest factors of the single-payment, uniform-series and factor-table tabs, built once at startup
+FACTORS = factor_tables.default_table()
 
 def content():
     ui.label('Engineering Economics').classes('text-h3 q-my-md')
@@ -18,6 +23,8 @@ def content():
         t5 = ui.tab('Depreciation')
         t6 = ui.tab('Loan Amortization')
         t7 = ui.tab('Incremental IRR')
+        t8 = ui.tab('Factor Tables')
+        t9 = ui.tab('Risk Analysis')
 
     with ui.tab_panels(tabs, value=t1).classes('w-full bg-transparent'):
         with ui.tab_panel(t1):
@@ -34,6 +41,10 @@ def content():
             loan_amortization_tool()
         with ui.tab_panel(t7):
             incremental_irr_tool()
+        with ui.tab_panel(t8):
+            factor_table_tool()
+        with ui.tab_panel(t9):
+            risk_analysis_tool()
 
 def single_payment_calculator():
     with ui.card().classes('w-full p-6 shadow-lg'):
@@ -58,10 +69,10 @@ def single_payment_calculator():
                     p = p_slider.value
                     i = rate_slider.value / 100
                     n = years_slider.value
-                    f = p * ((1 + i) ** n)
+                    f = p * FACTORS.lookup('F/P', i, n)
                     result_label.text = f'${f:,.2f}'
                     
-                    current_data = [p * ((1 + i)**year) for year in range(int(n) + 1)]
+                    current_data = (p * FACTORS.lookup('F/P', i, np.arange(int(n) + 1))).tolist()
                     chart.options['series'][0]['data'] = current_data
                     chart.update()
 
@@ -69,7 +80,7 @@ def single_payment_calculator():
                     p = p_slider.value
                     i = rate_slider.value / 100
                     n = years_slider.value
-                    saved_data = [p * ((1 + i)**year) for year in range(int(n) + 1)]
+                    saved_data = (p * FACTORS.lookup('F/P', i, np.arange(int(n) + 1))).tolist()
                     chart.options['series'][1]['data'] = saved_data
                     chart.options['series'][1]['name'] = f'Saved (i={rate_slider.value}%)'
                     chart.update()
@@ -129,14 +140,11 @@ def uniform_series_calculator():
                     a = a_slider.value
                     i = rate_slider.value / 100
                     n = years_slider.value
-                    if i == 0:
-                        p = a * n
-                    else:
-                        p = a * (((1 + i)**n - 1) / (i * (1 + i)**n))
+                    p = a * FACTORS.lookup('P/A', i, n)
                     result_label.text = f'${p:,.2f}'
                     
                     # Cumulative value visualization
-                    chart.options['series'][0]['data'] = [a * (((1 + i)**y - 1) / (i * (1 + i)**y)) if i > 0 else a * y for y in range(int(n) + 1)]
+                    chart.options['series'][0]['data'] = (a * FACTORS.lookup('P/A', i, np.arange(int(n) + 1))).tolist()
                     chart.update()
 
                 a_slider.on('update:model-value', update)
@@ -154,55 +162,135 @@ def uniform_series_calculator():
         }).classes('w-full h-64 q-mt-md')
         update()
 
+def factor_table_tool():
+    with ui.card().classes('w-full p-6 shadow-lg'):
+        ui.label('Compound Interest Factor Tables').classes('text-h5 q-mb-md')
+        ui.markdown('''
+        Textbook-style tables of the discrete compounding factors for a chosen interest rate.
+        Values come from a table precomputed for 0-50% in 0.1% steps; off-grid rates are interpolated linearly, just like a printed table.
+        ''')
+        
+        with ui.row().classes('w-full gap-4 items-center'):
+            rate = ui.number('Interest Rate (%)', value=10, min=0, max=50, step=0.1, format='%.2f').classes('w-40')
+            n_max = ui.number('Periods', value=30, min=1, max=120, precision=0).classes('w-32')
+            ui.button('Download CSV', icon='download', on_click=lambda: download()).props('outline')
+
+        @ui.refreshable
+        def show_table():
+            frame = FACTORS.table(rate.value / 100).head(int(n_max.value))
+            columns = [{'name': 'n', 'label': 'n', 'field': 'n'}] + [
+                {'name': c, 'label': c, 'field': c} for c in FACTORS.factors]
+            rows = [{'n': int(n), **{c: f'{v:.4f}' for c, v in row.items()}} for n, row in frame.iterrows()]
+            ui.table(columns=columns, rows=rows, row_key='n').props('dense').classes('w-full')
+
+        def download():
+            frame = FACTORS.table(rate.value / 100).head(int(n_max.value))
+            ui.download(frame.round(6).to_csv().encode(), f'factors_{rate.value:g}pct.csv')
+
+        show_table()
+        rate.on('update:model-value', show_table.refresh)
+        n_max.on('update:model-value', show_table.refresh)
+
+def parse_series(text):
+    # Comma-separated amounts; "x*k" repeats x for k years
+    values = []
+    for token in (text or '').replace(';', ',').split(','):
+        if not token.strip():
+            continue
+        amount, _, repeat = token.partition('*')
+        values.extend([float(amount)] * (int(repeat) if repeat.strip() else 1))
+    return values
+
+def parse_alternatives(text):
+    # One alternative per line: "Name: -5000, 1500*5, 500"; names key the result rows, so they must be unique
+    names, flows = [], []
+    for k, line in enumerate(l for l in text.splitlines() if l.strip()):
+        name, _, values = line.rpartition(':')
+        name = name.strip() or f'Alt {k + 1}'
+        if name in names:
+            raise ValueError(f'"{name}" names more than one alternative.')
+        try:
+            flows.append(parse_series(values))
+        except ValueError:
+            raise ValueError(f'Could not read the cash flows of "{name}".') from None
+        names.append(name)
+    return names, flows
+
 def project_comparison_module():
     with ui.card().classes('w-full p-6 shadow-lg'):
         ui.label('Project Comparison: PW Analysis').classes('text-h5 q-mb-md')
-        ui.markdown('Compare two projects with different cash flows over the same period.')
+        ui.markdown('''
+        Compare any number of mutually exclusive alternatives. Enter one alternative per line as
+        `Name: year 0, year 1, ...` (use `amount*k` to repeat an amount for k years).
+        Alternatives with equal lives are ranked by **PW**; unequal lives are ranked by **AW**.
+        ''')
         
         with ui.row().classes('w-full gap-4'):
             rate = ui.number('Discount Rate (%)', value=10, format='%.1f').classes('w-32')
-            years = ui.number('Life Span (Years)', value=5, precision=0).classes('w-32')
 
-        with ui.row().classes('w-full gap-8 q-mt-md'):
-            with ui.column().classes('flex-1 p-4 bg-gray-50 rounded'):
-                ui.label('Project A').classes('font-bold border-b w-full mb-2')
-                cost_a = ui.number('Initial Cost ($)', value=5000)
-                benefit_a = ui.number('Annual Benefit ($)', value=1500)
-            
-            with ui.column().classes('flex-1 p-4 bg-gray-50 rounded'):
-                ui.label('Project B').classes('font-bold border-b w-full mb-2')
-                cost_b = ui.number('Initial Cost ($)', value=8000)
-                benefit_b = ui.number('Annual Benefit ($)', value=2200)
+        alternatives = ui.textarea('Alternatives (cash flows by year)',
+                                   value='Project A: -5000, 1500*5\nProject B: -8000, 2200*5').classes('w-full q-mt-md')
 
         with ui.row().classes('w-full gap-4 q-mt-md items-center'):
             inflation = ui.slider(min=0, max=10, value=0, step=0.1).classes('flex-1')
             ui.label('Inflation:').bind_text_from(inflation, 'value', backward=lambda v: f'Inflation: {v}%')
             ui.icon('info', size='1rem').tooltip('Adjusts discount rate to "Real" rate: i_real = (i - f)/(1 + f)')
 
+        with ui.expansion('Year-by-Year Rates (optional)', icon='timeline').classes('w-full'):
+            ui.markdown('Leave blank to use the single rate and inflation above. The last value repeats for later years; `x*k` repeats a value for k years.')
+            with ui.row().classes('w-full gap-4'):
+                rate_curve = ui.input('Discount Rate by Year (%)', placeholder='e.g. 6, 7, 8*3').classes('flex-1')
+                inflation_curve = ui.input('Inflation by Year (%)', placeholder='e.g. 4, 3, 2').classes('flex-1')
+
         def calculate_pw():
-            i_nom = rate.value / 100
-            f = inflation.value / 100
-            # Fisher relation: (1+i_nom) = (1+i_real)(1+f) -> i_real = (1+i_nom)/(1+f) - 1
-            i = (1 + i_nom) / (1 + f) - 1
-            n = int(years.value)
-            factor = (((1 + i)**n - 1) / (i * (1 + i)**n)) if i > 0 else n
-            pw_a = -cost_a.value + benefit_a.value * factor
-            pw_b = -cost_b.value + benefit_b.value * factor
+            try:
+                names, flows = parse_alternatives(alternatives.value)
+            except ValueError as e:
+                ui.notify(f'{e} Use "Name: -5000, 1500*5".', type='warning')
+                return
+            try:
+                rates_by_year = parse_series(rate_curve.value)
+                inflation_by_year = parse_series(inflation_curve.value)
+            except ValueError:
+                ui.notify('Could not read the year-by-year rates. Use "6, 7, 8*3".', type='warning')
+                return
+            if not names:
+                return
+            if rates_by_year or inflation_by_year:
+                # Per-period Fisher real rates, discounted with one cumulative product
+                discount = cashflow.DiscountCurve(np.array(rates_by_year or [rate.value]) / 100,
+                                                  np.array(inflation_by_year or [inflation.value]) / 100)
+                table = portfolio.rank(flows, discount, names=names)
+            else:
+                # Fisher relation: (1+i_nom) = (1+i_real)(1+f) -> i_real = (1+i_nom)/(1+f) - 1
+                table = portfolio.rank(flows, rate.value / 100, inflation.value / 100, names=names)
+            measure = 'PW' if table['life'].nunique() == 1 else 'AW'
             
-            chart.options['series'][0]['data'] = [round(pw_a, 2), round(pw_b, 2)]
+            chart.options['xAxis']['data'] = table['alternative'].tolist()
+            chart.options['yAxis']['name'] = 'Net Present Worth ($)' if measure == 'PW' else 'Annual Worth ($)'
+            chart.options['series'][0]['data'] = table[measure].round(2).tolist()
             chart.update()
             
-            verdict.text = f'Project {"B" if pw_b > pw_a else "A"} is better by PW analysis.'
-            verdict.classes('text-green-600' if (pw_b > pw_a if pw_b > 0 else pw_a > 0) else 'text-red-400')
+            results.rows = [
+                {'rank': int(r['rank']), 'alternative': r['alternative'], 'life': int(r['life']),
+                 'PW': f"${r['PW']:,.2f}", 'AW': f"${r['AW']:,.2f}", 'FW': f"${r['FW']:,.2f}"}
+                for r in table.to_dict('records')
+            ]
+            best = table.iloc[0]
+            verdict.text = f'{best["alternative"]} is best by {measure} analysis.'
+            verdict.classes('text-green-600' if best[measure] > 0 else 'text-red-400')
 
         button = ui.button('Calculate & Compare', on_click=calculate_pw).classes('w-full q-mt-md')
         
         chart = ui.echart({
-            'xAxis': {'type': 'category', 'data': ['Project A', 'Project B']},
+            'xAxis': {'type': 'category', 'data': []},
             'yAxis': {'type': 'value', 'name': 'Net Present Worth ($)'},
-            'series': [{'data': [0, 0], 'type': 'bar'}]
+            'series': [{'data': [], 'type': 'bar'}]
         }).classes('w-full h-48 q-mt-md')
         
+        results = ui.table(columns=[{'name': c, 'label': c.title() if c.islower() else c, 'field': c}
+                                    for c in ['rank', 'alternative', 'life', 'PW', 'AW', 'FW']],
+                           rows=[], row_key='alternative').classes('w-full q-mt-md')
         verdict = ui.label('').classes('text-xl font-bold text-center w-full q-mt-md')
 
 def irr_visualizer_tool():
@@ -256,37 +344,29 @@ def irr_visualizer_tool():
             a = annual_benefit.value
             n = int(life_span.value)
             
-            rates = np.linspace(0.01, 0.5, 50) # 1% to 50%
-            npv_data = []
-            
-            for r in rates:
-                factor = ((1 + r)**n - 1) / (r * (1 + r)**n)
-                npv = -c0 + a * factor
-                npv_data.append([round(r*100, 2), round(npv, 2)])
+            rates = cashflow.rate_grid(0.01, 0.5, 246) # 1% to 50% in 0.2% steps
+            flows = cashflow.uniform_flows(c0, a, n)
+            npv = cashflow.npv_profile(flows, rates)[0]
             
-            chart.options['series'][0]['data'] = npv_data
+            chart.options['series'][0]['data'] = np.column_stack((np.round(rates * 100, 2), np.round(npv, 2))).tolist()
             chart.update()
             
-            # Binary search for IRR
-            low, high = 0.0001, 1.0
-            for _ in range(20):
-                mid = (low + high) / 2
-                f = ((1+mid)**n - 1) / (mid * (1+mid)**n)
-                if -c0 + a*f > 0: low = mid
-                else: high = mid
-            
-            irr_label.text = f'{low*100:.2f}%'
+            result = irr.irr(flows)
+            if result.missing[0]:
+                irr_label.text = 'No IRR (NPV never crosses zero)'
+            else:
+                irr_label.text = f'{result.irr[0]*100:.2f}%'
 
         update()
 
 def depreciation_tool():
     with ui.card().classes('w-full p-6 shadow-lg'):
-        ui.label('Depreciation Methods: SL, SYD, DB, & MACRS').classes('text-h5 q-mb-md')
+        ui.label('Depreciation Methods: SL, SYD, DDB, & MACRS').classes('text-h5 q-mb-md')
         
         with ui.row().classes('w-full gap-4'):
             cost = ui.number('Initial Cost ($)', value=10000, min=0).classes('w-32')
             salvage = ui.number('Salvage ($)', value=1000, min=0).classes('w-32')
-            life = ui.select([3, 5, 7, 10], value=5, label='Life (Years)').classes('w-32')
+            life = ui.select([3, 5, 7, 10, 15, 20], value=5, label='Life (Years)').classes('w-32')
             
             ui.button('Compare', on_click=lambda: update()).classes('q-mb-sm')
 
@@ -299,37 +379,18 @@ def depreciation_tool():
             'series': [
                 {'name': 'Straight Line (SL)', 'type': 'bar', 'data': []},
                 {'name': 'SYD', 'type': 'bar', 'data': []},
+                {'name': 'Double Declining Balance (DDB)', 'type': 'bar', 'data': []},
                 {'name': 'MACRS (GDS)', 'type': 'bar', 'data': []}
             ]
         }).classes('w-full h-80 q-mt-md')
 
         def update():
-            c = cost.value
-            s = salvage.value
-            n = int(life.value)
-            
-            # SL
-            sl = [(c - s) / n] * n
-            
-            # SYD
-            syd_sum = n * (n + 1) / 2
-            syd = [(n - y + 1) / syd_sum * (c - s) for y in range(1, n + 1)]
-            
-            # MACRS
-            macrs_pcts = {
-                3: [33.33, 44.45, 14.81, 7.41],
-                5: [20.00, 32.00, 19.20, 11.52, 11.52, 5.76],
-                7: [14.29, 24.49, 17.49, 12.49, 8.93, 8.92, 8.93, 4.46],
-                10: [10.00, 18.00, 14.40, 11.52, 9.22, 7.37, 6.55, 6.55, 6.56, 6.55, 3.28]
-            }
-            m = [round(c * (p/100), 2) for p in macrs_pcts[n]]
+            result = depreciation.schedules(cost.value, salvage.value, int(life.value))
+            max_len = result['SL'][0].shape[1]
             
-            # Sync x-axis
-            max_len = max(n, len(m))
             chart.options['xAxis']['data'] = [f'Yr {i}' for i in range(1, max_len + 1)]
-            chart.options['series'][0]['data'] = [round(v, 2) for v in sl + [0]*(max_len-n)]
-            chart.options['series'][1]['data'] = [round(v, 2) for v in syd + [0]*(max_len-n)]
-            chart.options['series'][2]['data'] = m
+            for k, method in enumerate(depreciation.METHODS):
+                chart.options['series'][k]['data'] = np.round(result[method][0][0], 2).tolist()
             chart.update()
 
         update()
@@ -345,6 +406,7 @@ def loan_amortization_tool():
                 years_ui = ui.number('Term (Years)', value=30, precision=0)
                 
                 ui.button('Generate Table', icon='table_view', on_click=lambda: update_table()).classes('w-full q-mt-md')
+                ui.button('Download Monthly Schedule', icon='download', on_click=lambda: download_schedule()).classes('w-full').props('outline')
 
             with ui.column().classes('flex-1'):
                 chart = ui.echart({
@@ -360,37 +422,21 @@ def loan_amortization_tool():
                 }).classes('w-full h-96')
 
         def update_table():
-            p = principal.value
-            r = (rate_ui.value / 100) / 12 # Monthly
-            n = int(years_ui.value) * 12 # Monthly periods
-            
-            if r == 0:
-                payment = p / n
-            else:
-                payment = p * (r * (1 + r)**n) / ((1 + r)**n - 1)
-            
-            p_comp = []
-            i_comp = []
-            balance = p
+            n_years = int(years_ui.value)
+            sched = amortization.schedule(principal.value, rate_ui.value / 100, n_years)
             
             # Record yearly totals to keep chart readable
-            for year in range(1, int(years_ui.value) + 1):
-                y_p = 0
-                y_i = 0
-                for _ in range(12):
-                    interest = balance * r
-                    prin = payment - interest
-                    y_p += prin
-                    y_i += interest
-                    balance -= prin
-                p_comp.append(round(y_p, 2))
-                i_comp.append(round(y_i, 2))
+            totals = amortization.yearly_totals(sched)
             
-            chart.options['xAxis']['data'] = [f'Yr {i}' for i in range(1, int(years_ui.value) + 1)]
-            chart.options['series'][0]['data'] = p_comp
-            chart.options['series'][1]['data'] = i_comp
+            chart.options['xAxis']['data'] = [f'Yr {i}' for i in range(1, n_years + 1)]
+            chart.options['series'][0]['data'] = np.round(totals['principal'][0], 2).tolist()
+            chart.options['series'][1]['data'] = np.round(totals['interest'][0], 2).tolist()
             chart.update()
 
+        def download_schedule():
+            frame = next(amortization.iter_schedule_frames(principal.value, rate_ui.value / 100, int(years_ui.value)))
+            ui.download(frame.drop(columns='loan_id').round(2).to_csv(index=False).encode(), 'amortization_schedule.csv')
+
         update_table()
 
 def incremental_irr_tool():
@@ -399,21 +445,18 @@ def incremental_irr_tool():
         ui.markdown(r'''
         Used to determine if the **additional investment** in a more expensive project is justified.
         We calculate the IRR of the *difference* in cash flows ($\Delta CF = CF_B - CF_A$).
+        With several alternatives, they are sorted by first cost and each challenger is compared with the current defender.
         ''')
         
         with ui.row().classes('w-full gap-8'):
             with ui.column().classes('w-80 space-y-4'):
                 with ui.column().classes('w-full p-4 bg-gray-50 rounded shadow-inner'):
-                    ui.label('Project A (Lower Cost)').classes('font-bold border-b w-full mb-2')
-                    c_a = ui.number('Cost ($)', value=5000).classes('w-full')
-                    b_a = ui.number('Annual Benefit ($)', value=1500).classes('w-full')
-                
-                with ui.column().classes('w-full p-4 bg-gray-50 rounded shadow-inner'):
-                    ui.label('Project B (Higher Cost)').classes('font-bold border-b w-full mb-2')
-                    c_b = ui.number('Cost ($)', value=8000).classes('w-full')
-                    b_b = ui.number('Annual Benefit ($)', value=2200).classes('w-full')
+                    ui.label('Alternatives').classes('font-bold border-b w-full mb-2')
+                    alternatives = ui.textarea('Name: year 0, year 1, ...',
+                                               value='Project A: -5000, 1500*10\nProject B: -8000, 2200*10').classes('w-full')
                 
-                n_ui = ui.number('Shared Life (Years)', value=10).classes('w-full')
+                marr_ui = ui.number('MARR (%)', value=10, format='%.1f').classes('w-full')
+                do_nothing = ui.checkbox('Include "Do nothing"', value=True)
                 ui.button('Determine Incremental IRR', icon='trending_up', on_click=lambda: calculate()).classes('w-full')
 
             with ui.column().classes('flex-1 items-center justify-center p-8 bg-white rounded shadow-md border border-gray-200'):
@@ -433,41 +476,155 @@ def incremental_irr_tool():
                     }]
                 }).classes('w-full h-80')
 
+        trail_table = ui.table(columns=[{'name': c, 'label': l, 'field': c} for c, l in [
+            ('step', 'Step'), ('defender', 'Defender'), ('challenger', 'Challenger'), ('delta_first_cost', 'ΔFirst Cost'),
+            ('delta_irr', 'ΔIRR'), ('decision', 'Decision')]], rows=[], row_key='step').classes('w-full q-mt-md')
+
         def calculate():
-            dc0 = c_b.value - c_a.value
-            da = b_b.value - b_a.value
-            n = int(n_ui.value)
-            
-            if dc0 <= 0 or da <= 0:
-                res_label.text = "Incremental cost or benefit must be positive for IRR calculation."
+            try:
+                names, flows = parse_alternatives(alternatives.value)
+            except ValueError as e:
+                ui.notify(f'{e} Use "Name: -5000, 1500*10".', type='warning')
                 return
-
-            # Solve for r: -dc0 + da * factor = 0
-            # factor = ((1+r)**n - 1) / (r * (1+r)**n)
-            low, high = 0.0001, 1.0
-            for _ in range(20):
-                mid = (low + high) / 2
-                f = ((1+mid)**n - 1) / (mid * (1+mid)**n)
-                if -dc0 + da*f > 0: low = mid
-                else: high = mid
+            if not names:
+                return
+            marr = marr_ui.value / 100
+            result = incremental.incremental_analysis(flows, marr, names=names, do_nothing=do_nothing.value)
+            trail = result.trail
             
-            res_label.text = f'Incremental IRR (ΔB/ΔC): {low*100:.2f}%'
+            trail_table.rows = [
+                {'step': k + 1, 'defender': r['defender'], 'challenger': r['challenger'],
+                 'delta_first_cost': f"${r['delta_first_cost']:,.0f}",
+                 'delta_irr': f"{r['delta_irr']*100:.2f}%" if r['roots'] == 1 else f"{r['roots']} roots (ΔPW used)",
+                 'decision': r['decision']}
+                for k, r in enumerate(trail.to_dict('records'))
+            ]
+            res_label.text = f'Choose {result.chosen} at MARR = {marr_ui.value:.1f}%'
+            if trail.empty:
+                return
             
-            # Update Chart
-            years = [str(i) for i in range(n + 1)]
-            # Cash flows: Year 0 is -dc0 (cost difference), Year 1-N is +da (benefit difference)
-            flows = [-dc0] + [da] * n
+            # Chart the final comparison: Year 0 is the cost difference, later years the benefit difference
+            last = trail.iloc[-1]
+            matrix = cashflow.as_matrix(flows)
+            challenger = matrix[names.index(last['challenger'])]
+            defender = np.zeros_like(challenger) if last['defender'] == incremental.DO_NOTHING else matrix[names.index(last['defender'])]
+            delta = challenger - defender
             
             # Color coding: Red for negative, Green for positive
-            colors = ['#ef4444' if x < 0 else '#22c55e' for x in flows]
+            colors = ['#ef4444' if x < 0 else '#22c55e' for x in delta]
             
-            chart.options['title']['text'] = f'Incremental Cash Flow (IRR: {low*100:.2f}%)'
-            chart.options['xAxis']['data'] = years
+            rate_text = f"IRR: {last['delta_irr']*100:.2f}%" if last['roots'] == 1 else f"{last['roots']} IRR roots"
+            chart.options['title']['text'] = f"Incremental Cash Flow ({last['challenger']} - {last['defender']}, {rate_text})"
+            chart.options['xAxis']['data'] = [str(i) for i in range(len(delta))]
             chart.options['series'][0]['data'] = [
-                {'value': x, 'itemStyle': {'color': c}} for x, c in zip(flows, colors)
+                {'value': round(float(x), 2), 'itemStyle': {'color': c}} for x, c in zip(delta, colors)
             ]
             chart.update()
             
-            irr = low * 100
-            res_label.text = f'Incremental IRR (ΔB/ΔC): {irr:.2f}%'
-            ui.notify(f'If MARR < {irr:.1f}%, choose Project B.')
+            ui.notify(f'{len(trail)} comparisons: {(trail["decision"] == "accept").sum()} challengers accepted.')
+
+def risk_analysis_tool():
+    with ui.card().classes('w-full p-6 shadow-lg'):
+        ui.label('Monte Carlo Risk Analysis').classes('text-h5 q-mb-md')
+        ui.markdown('''
+        Uncertain inputs are sampled many times and the **NPV** and **IRR** of every scenario are computed.
+        The result is a distribution of outcomes rather than a single number, e.g. the **probability that NPV < 0**.
+        ''')
+
+        with ui.row().classes('w-full gap-8'):
+            with ui.column().classes('w-80'):
+                ui.label('First Cost ($): min / most likely / max').classes('font-bold')
+                with ui.row().classes('w-full no-wrap'):
+                    cost_lo = ui.number('Min', value=8000, min=0).classes('w-24')
+                    cost_mode = ui.number('Mode', value=10000, min=0).classes('w-24')
+                    cost_hi = ui.number('Max', value=13000, min=0).classes('w-24')
+                ui.label('Annual Benefit ($): min / most likely / max').classes('font-bold')
+                with ui.row().classes('w-full no-wrap'):
+                    benefit_lo = ui.number('Min', value=1800, min=0).classes('w-24')
+                    benefit_mode = ui.number('Mode', value=2500, min=0).classes('w-24')
+                    benefit_hi = ui.number('Max', value=3000, min=0).classes('w-24')
+                ui.label('Life (Years): uniform between').classes('font-bold')
+                with ui.row().classes('w-full no-wrap'):
+                    life_lo = ui.number('From', value=6, min=1, precision=0).classes('w-24')
+                    life_hi = ui.number('To', value=10, min=1, precision=0).classes('w-24')
+                ui.label('Discount Rate (%): normal').classes('font-bold')
+                with ui.row().classes('w-full no-wrap'):
+                    rate_mean = ui.number('Mean', value=8, format='%.2f').classes('w-24')
+                    rate_sd = ui.number('Std. dev.', value=1, min=0, format='%.2f').classes('w-24')
+                ui.label('Correlation: First Cost vs. Annual Benefit').classes('font-bold')
+                cost_benefit_corr = ui.slider(min=-0.9, max=0.9, step=0.1, value=0).props('label-always')
+                scenarios = ui.select([10_000, 100_000, 1_000_000, 10_000_000, 100_000_000], value=100_000, label='Scenarios').classes('w-full')
+                run_btn = ui.button('Run Simulation', icon='casino', on_click=lambda: run_simulation()).classes('w-full q-mt-md')
+                cancel_btn = ui.button('Cancel', icon='stop', color='negative', on_click=lambda: state.update(cancel=True)).classes('w-full')
+                cancel_btn.disable()
+                progress = ui.linear_progress(value=0, show_value=False).classes('q-mt-sm')
+                progress_label = ui.label('').classes('text-xs text-gray-500')
+
+            with ui.column().classes('flex-1'):
+                with ui.row().classes('w-full justify-around p-4 bg-blue-50 rounded border'):
+                    loss_label = ui.label('P(NPV < 0): -').classes('text-h6 font-black text-red-700')
+                    mean_label = ui.label('Mean NPV: -').classes('text-h6 font-black text-blue-800')
+                    irr_label = ui.label('Median IRR: -').classes('text-h6 font-black text-green-700')
+                pct_label = ui.label('').classes('text-sm text-gray-600 q-mt-sm')
+
+                chart = ui.echart({
+                    'title': {'text': 'Distribution of NPV', 'left': 'center'},
+                    'tooltip': {'trigger': 'axis'},
+                    'xAxis': {'type': 'category', 'data': [], 'name': 'NPV ($)', 'nameLocation': 'middle', 'nameGap': 30},
+                    'yAxis': {'type': 'value', 'name': 'Probability (%)'},
+                    'series': [{'type': 'bar', 'data': [], 'barCategoryGap': '0%'}],
+                }).classes('w-full h-80')
+
+        state = {'running': False, 'cancel': False}
+
+        def show(result):
+            loss_label.text = f'P(NPV < 0): {result.p_loss*100:.1f}%'
+            mean_label.text = f'Mean NPV: ${result.npv_mean:,.0f}'
+            irr_label.text = f'Median IRR: {result.irr_percentiles[50]*100:.2f}%' if result.irr_percentiles else 'Median IRR: n/a'
+            p = result.npv_percentiles
+            pct_label.text = f'NPV P5 ${p[5]:,.0f} | P50 ${p[50]:,.0f} | P95 ${p[95]:,.0f} | Std. dev. ${result.npv_std:,.0f}'
+
+            # Bars are red where the bin lies below zero NPV
+            counts, edges = result.npv_hist
+            mids = (edges[:-1] + edges[1:]) / 2
+            chart.options['xAxis']['data'] = [f'{m:,.0f}' for m in mids]
+            chart.options['series'][0]['data'] = [
+                {'value': round(float(c) / result.n * 100, 3), 'itemStyle': {'color': '#ef4444' if m < 0 else '#3b82f6'}}
+                for c, m in zip(counts, mids)
+            ]
+            chart.update()
+
+        async def run_simulation():
+            if state['running']:
+                return
+            if cost_lo.value > cost_hi.value or benefit_lo.value > benefit_hi.value or life_lo.value > life_hi.value:
+                ui.notify('Each minimum must not exceed its maximum.', type='warning')
+                return
+            inputs = {
+                'first_cost': ('triangular', cost_lo.value, min(max(cost_mode.value, cost_lo.value), cost_hi.value), cost_hi.value),
+                'annual_benefit': ('triangular', benefit_lo.value, min(max(benefit_mode.value, benefit_lo.value), benefit_hi.value), benefit_hi.value),
+                'life': ('integers', int(life_lo.value), int(life_hi.value)),
+                'rate': ('normal', rate_mean.value / 100, rate_sd.value / 100),
+            }
+            n = int(scenarios.value)
+            # Inputs are sampled together through a Gaussian copula when they are correlated
+            correlations = {('first_cost', 'annual_benefit'): cost_benefit_corr.value}
+            plan = risk.prepare(n, inputs, correlations=correlations)
+            sizes = plan['sizes']
+            total = risk.RiskAccumulator(plan['ranges'])
+
+            def progressed(redraw):
+                progress.value = total.n / n
+                progress_label.text = f'{total.n:,} of {n:,} scenarios'
+                if redraw:
+                    show(total.summary())
+
+            # Chunks run in worker processes so the page stays responsive; results refresh as they arrive
+            await run_chunks(risk.summarize_chunk, [(plan, k) for k in range(len(sizes))],
+                             total.merge, progressed, state, (run_btn, cancel_btn))
+            if total.n:
+                show(total.summary())
+            if total.n < n:
+                ui.notify(f'Simulation cancelled after {total.n:,} scenarios.', type='warning')
+
+        ui.timer(0, run_simulation, once=True)
@@ -1,4 +1,53 @@
+import re
 from nicegui import ui
+import numpy as np
+from cven_app.engine import lp, schedule, schedule_risk, sensitivity, tableau
+from cven_app.modules.runner import run_chunks
+
+# The example arrow diagram of the network tab: most likely durations, or low, most likely, high
+ACTIVITIES = '''A -> B: 3, 4, 6
+A -> C: 1, 2, 4
+B -> D: 4, 5, 9
+C -> B: 1
+C -> E: 6, 8, 10
+D -> F: 2, 3, 6
+E -> D: 1, 2, 4
+E -> F: 4, 6, 9'''
+
+def parse_arrows(text):
+    # (from event, to event, low, most likely, high) of lines like "A -> B: 4" or "A -> B: 3, 4, 6"
+    arrows = []
+    number = r'\s*(\d+(?:\.\d*)?|\.\d+)\s*'
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        match = re.fullmatch(rf'\s*(\w+)\s*(?:->|→)\s*(\w+)\s*:{number}(?:,{number},{number})?', line)
+        if match is None:
+            raise ValueError(f'Cannot read "{line.strip()}"; use "A -> B: 4" or "A -> B: 3, 4, 6"')
+        if match[4] is None:
+            arrows.append((match[1], match[2], *[float(match[3])] * 3))
+        else:
+            arrows.append((match[1], match[2], float(match[3]), float(match[4]), float(match[5])))
+    if not arrows:
+        raise ValueError('Enter at least one activity')
+    return arrows
+
+def number_text(v):
+    # Tableau entries to four significant digits, without a "-0"
+    return f'{v:.4g}' if abs(v) > 1e-9 else '0'
+
+def range_text(v):
+    # A range end, with infinite ends as ∞
+    return number_text(v) if abs(v) < float('inf') else ('∞' if v > 0 else '-∞')
+
+def big_m_text(value, m):
+    # An objective-row entry value + m M, e.g. "2M - 3"
+    if abs(m) <= 1e-9:
+        return number_text(value)
+    term = 'M' if abs(m - 1) <= 1e-9 else '-M' if abs(m + 1) <= 1e-9 else f'{m:.4g}M'
+    if abs(value) <= 1e-9:
+        return term
+    return f'{term} {"-" if value < 0 else "+"} {abs(value):.4g}'
 
 def content():
     ui.label('Optimization Modeling').classes('text-h3 q-my-md')
@@ -85,62 +134,37 @@ def graphical_lp_tool():
                 def update():
                     v_b1 = b1.value
                     v_b2 = b2.value
-                    v_c1 = c1.value
-                    v_c2 = c2.value
                     
                     # Constraint lines
                     # C1: x1 + x2 = b1 -> (0, b1), (b1, 0)
                     chart.options['series'][0]['data'] = [[0, v_b1], [v_b1, 0]]
                     # C2: 2x1 + x2 = b2 -> (0, b2), (b2/2, 0)
                     chart.options['series'][1]['data'] = [[0, v_b2], [v_b2/2, 0]]
-                    
-                    # Corner points for feasible region
-                    # 1. (0, 0)
-                    # 2. (0, min(b1, b2))
-                    # 3. Intersection of C1 and C2:
-                    #    x1 + x2 = b1
-                    #    2x1 + x2 = b2
-                    #    Subtracting: x1 = b2 - b1
-                    #    Then: x2 = b1 - (b2 - b1) = 2b1 - b2
-                    inter_x = v_b2 - v_b1
-                    inter_y = 2*v_b1 - v_b2
-                    
-                    corners = [[0, 0]]
-                    if v_b1 < v_b2: # C1 starts lower on Y
-                         corners.append([0, v_b1])
-                    else:
-                         corners.append([0, v_b2])
-                    
-                    # Add intersection if it's in the first quadrant
-                    if inter_x > 0 and inter_y > 0:
-                        corners.append([inter_x, inter_y])
-                        
-                    if v_b1 < v_b2/2: # C1 ends lower on X
-                        corners.append([v_b1, 0])
-                    else:
-                        corners.append([v_b2/2, 0])
-                    
-                    # Sort corners by angle to ensure polygon is drawn correctly
-                    # (Simplified here since we know the order for 2 constraints)
-                    feasible_data = sorted(corners, key=lambda p: (p[1]/p[0] if p[0]>0 else 999), reverse=True)
-                    feasible_data.append([0,0]) # Close the loop
-                    
-                    chart.options['series'][2]['data'] = feasible_data
-                    
-                    # Solve
-                    best_z = -1
-                    best_p = [0, 0]
-                    for px, py in corners:
-                        z = v_c1 * px + v_c2 * py
-                        if z > best_z:
-                            best_z = z
-                            best_p = [px, py]
-                    
+
+                    # Solved by the general simplex engine, like an LP of any size
+                    problem = lp.LinearProgram([c1.value, c2.value], [[1, 1], [2, 1]], [v_b1, v_b2], maximize=True)
+                    result = lp.solve(problem)
+
+                    # Feasible region: the box cut by every constraint, traced from the origin up the x2 axis
+                    # so the area under the line fills the region
+                    corners = lp.feasible_polygon(problem, (100, 100))
+                    chart.options['series'][2]['data'] = [corners[0], *corners[:0:-1], corners[0]] if corners else []
+
+                    if not result.optimal:
+                        chart.options['series'][3]['data'] = []
+                        chart.update()
+                        opt_label.text = f'No optimal solution ({result.status})'
+                        dual_label.text = ''
+                        return
+                    best_p = result.x.tolist()
                     chart.options['series'][3]['data'] = [best_p]
                     chart.update()
-                    opt_label.text = f'Optimal Solution: ({best_p[0]:.1f}, {best_p[1]:.1f}) | Max Z = {best_z:.1f}'
+                    opt_label.text = f'Optimal Solution: ({best_p[0]:.1f}, {best_p[1]:.1f}) | Max Z = {result.objective:.1f}'
+                    dual_label.text = (f'Shadow prices: b1 = {result.duals[0]:.2f}, b2 = {result.duals[1]:.2f} '
+                                       f'| {result.iterations} simplex pivots')
 
                 opt_label = ui.label('').classes('text-lg font-bold text-center w-full q-mt-md text-green-700')
+                dual_label = ui.label('').classes('text-sm text-gray-600 text-center w-full')
                 
                 for s in [c1, c2, b1, b2]:
                     s.on('update:model-value', update)
@@ -161,6 +185,7 @@ def sensitivity_analysis_tool():
                 ui.separator().classes('q-my-md')
                 ui.label('Fixed Parameters').classes('text-xs text-gray-500')
                 ui.label('c1=3, c2=5, b2=80')
+                ui.label('Max Z = c1*x1 + c2*x2, x1 + x2 ≤ b1, 2x1 + x2 ≤ b2').classes('text-xs text-gray-500')
 
             with ui.column().classes('flex-1'):
                 chart = ui.echart({
@@ -169,10 +194,10 @@ def sensitivity_analysis_tool():
                     'yAxis': {'type': 'value', 'name': 'Optimal Z'},
                     'series': [{
                         'type': 'line',
+                        'name': 'Optimal Z',
                         'data': [],
-                        'smooth': True,
                         'lineStyle': {'color': '#3b82f6', 'width': 3},
-                        'markPoint': {'data': [{'type': 'max', 'name': 'Max'}]}
+                        'markPoint': {'data': []}
                     }],
                     'tooltip': {'trigger': 'axis'}
                 }).classes('w-full h-64')
@@ -182,41 +207,49 @@ def sensitivity_analysis_tool():
                     with ui.card().classes('bg-blue-50 p-2 items-center'):
                         ui.label('Shadow Price (b1)').classes('text-xs uppercase')
                         sp_label = ui.label('0.0').classes('text-h6 font-bold')
+                    with ui.card().classes('bg-blue-50 p-2 items-center'):
+                        ui.label('Valid for b1 in').classes('text-xs uppercase')
+                        range_label = ui.label('').classes('text-h6 font-bold')
+                    with ui.card().classes('bg-blue-50 p-2 items-center'):
+                        ui.label('Shadow Price (b2)').classes('text-xs uppercase')
+                        sp2_label = ui.label('0.0').classes('text-h6 font-bold')
+
+                ranging_table = ui.table(columns=[
+                    {'name': 'item', 'label': '', 'field': 'item', 'align': 'left'},
+                    {'name': 'value', 'label': 'Value', 'field': 'value'},
+                    {'name': 'rate', 'label': 'Shadow Price / Reduced Cost', 'field': 'rate'},
+                    {'name': 'range', 'label': 'Basis Optimal For', 'field': 'range'},
+                ], rows=[]).classes('w-full')
+                pivots_label = ui.label('').classes('text-xs text-gray-500')
 
         def calculate_sensitivity():
-            # Fixed values
-            v_c1, v_c2 = 3, 5
-            v_b2 = 80
-            
-            # Range for b1
-            b1_range = list(range(10, 101, 2))
-            z_values = []
-            
-            for v_b1 in b1_range:
-                # Same corner logic as above
-                inter_x = v_b2 - v_b1
-                inter_y = 2*v_b1 - v_b2
-                corners = [[0, 0], [0, min(v_b1, v_b2)], [v_b2/2 if v_b2/2 < v_b1 else v_b1, 0]]
-                if inter_x > 0 and inter_y > 0:
-                    corners.append([inter_x, inter_y])
-                
-                z = max(v_c1 * px + v_c2 * py for px, py in corners)
-                z_values.append([v_b1, round(z, 2)])
-            
-            chart.options['series'][0]['data'] = z_values
+            # One solve at the current b1, then the whole Z-vs-b1 curve by dual simplex pivots from its basis
+            problem = lp.LinearProgram([3, 5], [[1, 1], [2, 1]], [base_b1.value, 80], maximize=True)
+            result = lp.solve(problem)
+            ranges = sensitivity.ranging(problem, result)
+            curve = sensitivity.parametric_rhs(problem, 0, 10, 100, result)
+
+            chart.options['series'][0]['data'] = [[b, round(z, 2)] for b, z in zip(curve.b, curve.objective)]
+            chart.options['series'][0]['markPoint']['data'] = [
+                {'coord': [base_b1.value, round(result.objective, 2)], 'value': round(result.objective, 1)}]
             chart.update()
-            
-            # Local shadow price (numerical derivative near current slider value)
-            curr_b = base_b1.value
-            def get_z(b):
-                ix = v_b2 - b
-                iy = 2*b - v_b2
-                crs = [[0, 0], [0, min(b, v_b2)], [v_b2/2 if v_b2/2 < b else b, 0]]
-                if ix > 0 and iy > 0: crs.append([ix, iy])
-                return max(v_c1 * px + v_c2 * py for px, py in crs)
-            
-            sp = (get_z(curr_b + 0.1) - get_z(curr_b)) / 0.1
-            sp_label.text = f'{sp:.1f}'
+
+            sp_label.text = f'{result.duals[0]:.1f}'
+            sp2_label.text = f'{result.duals[1]:.1f}'
+            range_label.text = f'[{range_text(ranges.rhs_low[0])}, {range_text(ranges.rhs_high[0])}]'
+            rows = []
+            for i, name in enumerate(['b1 (x1 + x2 ≤ b1)', 'b2 (2x1 + x2 ≤ b2)']):
+                rows.append({'item': name, 'value': number_text(problem.b[i]), 'rate': number_text(result.duals[i]),
+                             'range': f'[{range_text(ranges.rhs_low[i])}, {range_text(ranges.rhs_high[i])}]'})
+            for j, name in enumerate(['c1', 'c2']):
+                rows.append({'item': f'{name} (x{j + 1} = {result.x[j]:.4g})', 'value': number_text(problem.c[j]),
+                             'rate': number_text(result.reduced_costs[j]),
+                             'range': f'[{range_text(ranges.cost_low[j])}, {range_text(ranges.cost_high[j])}]'})
+            ranging_table.rows = rows
+            ranging_table.update()
+            breaks = curve.b[1:-1][np.abs(np.diff(curve.duals)) > 1e-9]
+            pivots_label.text = (f'Curve from 1 solve and {curve.pivots} dual simplex pivots; '
+                                 f'breakpoints at b1 = {", ".join(number_text(b) for b in breaks) or "none"}')
 
         base_b1.on('update:model-value', calculate_sensitivity)
         calculate_sensitivity()
@@ -229,117 +262,259 @@ def network_module():
         It calculates early/late starts and identifies "Slack" for each task.
         ''')
 
-        # Define graph
-        nodes = [
-            {'name': 'A', 'x': 50, 'y': 250},
-            {'name': 'B', 'x': 200, 'y': 100},
-            {'name': 'C', 'x': 200, 'y': 400},
-            {'name': 'D', 'x': 350, 'y': 100},
-            {'name': 'E', 'x': 350, 'y': 400},
-            {'name': 'F', 'x': 500, 'y': 250},
-        ]
-        
-        links = [
-            {'source': 'A', 'target': 'B', 'weight': 4},
-            {'source': 'A', 'target': 'C', 'weight': 2},
-            {'source': 'B', 'target': 'D', 'weight': 5},
-            {'source': 'C', 'target': 'B', 'weight': 1},
-            {'source': 'C', 'target': 'E', 'weight': 8},
-            {'source': 'D', 'target': 'F', 'weight': 3},
-            {'source': 'E', 'target': 'D', 'weight': 2},
-            {'source': 'E', 'target': 'F', 'weight': 6},
-        ]
-
-        chart = ui.echart({
-            'title': {'text': 'Node-Link Diagram', 'left': 'center'},
-            'tooltip': {},
-            'series': [{
-                'type': 'graph',
-                'layout': 'none',
-                'symbolSize': 40,
-                'roam': True,
-                'label': {'show': True},
-                'edgeSymbol': ['circle', 'arrow'],
-                'edgeSymbolSize': [4, 10],
-                'edgeLabel': {'show': True, 'formatter': '{@weight}'},
-                'data': [{'name': n['name'], 'x': n['x'], 'y': n['y']} for n in nodes],
-                'links': [{'source': l['source'], 'target': l['target'], 'weight': l['weight']} for l in links],
-                'lineStyle': {'opacity': 0.9, 'width': 2, 'curveness': 0}
-            }]
-        }).classes('w-full h-96')
+        with ui.row().classes('w-full gap-4 items-start'):
+            activities = ui.textarea('Activities (from -> to: duration, or low, likely, high)',
+                                     value=ACTIVITIES).classes('w-64').props('rows=10')
+
+            chart = ui.echart({
+                'title': {'text': 'Node-Link Diagram', 'left': 'center'},
+                'tooltip': {},
+                'series': [{
+                    'type': 'graph',
+                    'layout': 'none',
+                    'symbolSize': 40,
+                    'roam': True,
+                    'label': {'show': True},
+                    'edgeSymbol': ['circle', 'arrow'],
+                    'edgeSymbolSize': [4, 10],
+                    'edgeLabel': {'show': True, 'formatter': '{@weight}'},
+                    'data': [],
+                    'links': [],
+                    'lineStyle': {'opacity': 0.9, 'width': 2, 'curveness': 0}
+                }]
+            }).classes('flex-1 h-96')
+
+        def read_network():
+            # The network of the activities box (most likely durations) and its three-point estimates
+            arrows = parse_arrows(activities.value)
+            network = schedule.Network.from_arrows([(t, h, mode) for t, h, _, mode, _ in arrows])
+            return arrows, network, [np.array(v) for v in zip(*[a[2:] for a in arrows])]
 
         def solve_cpm():
-            # Forward Pass: ES (Earliest Start)
-            es = {n['name']: 0 for n in nodes}
-            for n_name in ['A', 'B', 'C', 'D', 'E', 'F']:
-                incoming = [l for l in links if l['target'] == n_name]
-                if incoming:
-                    es[n_name] = max(es[l['source']] + l['weight'] for l in incoming)
-            
-            # Backward Pass: LS (Latest Start)
-            duration = es['F']
-            ls = {n['name']: duration for n in nodes}
-            for n_name in reversed(['A', 'B', 'C', 'D', 'E', 'F']):
-                outgoing = [l for l in links if l['source'] == n_name]
-                if outgoing:
-                    ls[n_name] = min(ls[l['target']] - l['weight'] for l in outgoing)
-            
-            slack = {name: ls[name] - es[name] for name in es}
-            
-            new_links = []
-            for l in links:
-                is_critical = (slack[l['source']] == 0 and slack[l['target']] == 0 and 
-                              es[l['target']] - es[l['source']] == l['weight'])
-                new_links.append({
-                    'source': l['source'],
-                    'target': l['target'],
-                    'weight': l['weight'],
-                    'lineStyle': {'color': '#ef4444' if is_critical else '#ccc', 'width': 4 if is_critical else 2}
-                })
-            
-            chart.options['series'][0]['links'] = new_links
+            try:
+                arrows, network, _ = read_network()
+            except ValueError as e:
+                ui.notify(str(e), type='warning')
+                return
+            result = network.cpm()
+
+            # Events laid out by their topological level, left to right
+            events = list(dict.fromkeys([a[0] for a in arrows] + [a[1] for a in arrows]))
+            index = {name: k for k, name in enumerate(events)}
+            levels = schedule.Network(np.zeros(len(events)), [(index[a[0]], index[a[1]]) for a in arrows]).levels
+            early = {name: 0.0 for name in events}
+            late = {name: result.duration for name in events}
+            for (t, h, *_), es, ef, ls in zip(arrows, result.es, result.ef, result.ls):
+                early[t], early[h] = es, max(early[h], ef)
+                late[t] = min(late[t], ls)
+            nodes = []
+            for level in range(levels.max() + 1):
+                names = [name for name in events if levels[index[name]] == level]
+                for k, name in enumerate(names):
+                    nodes.append({'name': name, 'x': 50 + 150 * level, 'y': 250 + 150 * (k - (len(names) - 1) / 2),
+                                  'value': f'early {early[name]:g}, late {late[name]:g}'})
+            chart.options['series'][0]['data'] = nodes
+            chart.options['series'][0]['links'] = [{
+                'source': t, 'target': h, 'weight': d,
+                'lineStyle': {'color': '#ef4444' if critical else '#ccc', 'width': 4 if critical else 2}
+            } for (t, h, _, d, _), critical in zip(arrows, result.critical)]
             chart.update()
-            res_label.text = f'Project Duration: {duration} | Critical Path Highlighted in Red'
-            ui.notify(f"Node Info (ES/LS/Slack): " + ", ".join([f"{k}: {es[k]}/{ls[k]}/{slack[k]}" for k in es]))
+            res_label.text = f'Project Duration: {result.duration:g} | Critical Path Highlighted in Red'
+            cpm_table.rows = [{'activity': name, 'duration': f'{d:g}', 'es': f'{es:g}', 'ef': f'{ef:g}', 'ls': f'{ls:g}',
+                               'lf': f'{lf:g}', 'tf': f'{tf:g}', 'ff': f'{ff:g}', 'critical': 'Yes' if critical else '',
+                               'criticality': ''}
+                              for name, (_, _, _, d, _), es, ef, ls, lf, tf, ff, critical in
+                              zip(result.names, arrows, result.es, result.ef, result.ls, result.lf,
+                                  result.total_float, result.free_float, result.critical)]
+            cpm_table.update()
 
         ui.button('Run CPM Analysis', icon='alt_route', on_click=solve_cpm).classes('w-full q-mt-md')
         res_label = ui.label('').classes('text-center w-full font-bold text-red-600 q-mt-md')
+        cpm_table = ui.table(columns=[{'name': key, 'label': label, 'field': key} for key, label in [
+            ('activity', 'Activity'), ('duration', 'Duration'), ('es', 'ES'), ('ef', 'EF'), ('ls', 'LS'),
+            ('lf', 'LF'), ('tf', 'Total Float'), ('ff', 'Free Float'), ('critical', 'Critical'),
+            ('criticality', 'Criticality Index')]],
+            rows=[], row_key='activity').classes('w-full')
+
+        ui.separator().classes('q-my-md')
+        ui.label('Schedule Risk (Monte Carlo PERT)').classes('text-h6')
+        ui.markdown('''
+        Give activities a range as `low, most likely, high` to sample their durations. Every sample is a full CPM
+        pass; the **criticality index** is the share of samples in which an activity was critical.
+        ''')
+        with ui.row().classes('w-full gap-4 items-start'):
+            with ui.column().classes('w-64'):
+                risk_kind = ui.select({'pert': 'Beta-PERT', 'triangular': 'Triangular'}, value='pert',
+                                      label='Duration Distribution').classes('w-full')
+                samples = ui.number('Samples', value=20_000, min=1000, max=10_000_000, step=1000).classes('w-full')
+                deadline = ui.number('Deadline', value=18, min=0).classes('w-full')
+                risk_btn = ui.button('Run Risk Analysis', icon='play_arrow', on_click=lambda: run_risk()).classes('w-full q-mt-md')
+                cancel_btn = ui.button('Cancel', icon='stop', color='negative', on_click=lambda: state.update(cancel=True)).classes('w-full')
+                cancel_btn.disable()
+                progress = ui.linear_progress(value=0, show_value=False).classes('q-mt-sm')
+                progress_label = ui.label('').classes('text-xs text-gray-500')
+
+            with ui.column().classes('flex-1'):
+                with ui.row().classes('w-full justify-between q-mb-md p-4 bg-gray-50 rounded border'):
+                    with ui.column().classes('items-center'):
+                        ui.label('Mean Duration').classes('text-xs uppercase text-gray-500')
+                        mean_label = ui.label('-').classes('text-xl font-bold')
+                    with ui.column().classes('items-center'):
+                        ui.label('P50 / P80 / P95').classes('text-xs uppercase text-gray-500')
+                        percentile_label = ui.label('-').classes('text-xl font-bold')
+                    with ui.column().classes('items-center'):
+                        ui.label('P(Finish by Deadline)').classes('text-xs uppercase text-gray-500')
+                        deadline_label = ui.label('-').classes('text-xl font-bold text-blue-600')
+                    with ui.column().classes('items-center'):
+                        ui.label('Classical PERT').classes('text-xs uppercase text-gray-500')
+                        pert_label = ui.label('-').classes('text-xl font-bold text-green-600')
+                risk_chart = ui.echart({
+                    'title': {'text': 'Project Duration Distribution', 'left': 'center'},
+                    'tooltip': {'trigger': 'axis'},
+                    'grid': {'left': '3%', 'right': '4%', 'bottom': '10%', 'containLabel': True},
+                    'xAxis': {'type': 'category', 'name': 'Project Duration', 'nameLocation': 'middle', 'nameGap': 25},
+                    'yAxis': [{'type': 'value', 'name': 'Frequency'},
+                              {'type': 'value', 'name': 'Cumulative %', 'max': 100}],
+                    'series': [{
+                        'type': 'bar', 'barWidth': '95%', 'data': [],
+                        'itemStyle': {'color': '#3b82f6', 'borderRadius': [4, 4, 0, 0]}
+                    }, {
+                        'name': 'Cumulative %', 'type': 'line', 'yAxisIndex': 1, 'smooth': True, 'symbol': 'none',
+                        'data': [], 'itemStyle': {'color': '#ef4444'}
+                    }]
+                }).classes('w-full h-80')
+
+        state = {'running': False, 'cancel': False}
+
+        def show_risk(result, estimate, exact=False):
+            # While running, percentiles and the deadline probability come off the fixed histogram; exact ones at the end
+            p50, p80, p95 = result.percentile([50, 80, 95], exact)
+            mean_label.text = f'{result.mean:.2f}'
+            percentile_label.text = f'{p50:.1f} / {p80:.1f} / {p95:.1f}'
+            deadline_label.text = f'{100 * result.probability(float(deadline.value or 0), exact):.1f}%'
+            pert_label.text = f'{estimate[0]:.2f} ± {estimate[1]:.2f}'
+            counts, bins = result.histogram.regroup(30)
+            risk_chart.options['xAxis']['data'] = [f'{v:.1f}' for v in bins[:-1]]
+            risk_chart.options['series'][0]['data'] = counts.tolist()
+            risk_chart.options['series'][1]['data'] = np.round(100 * np.cumsum(counts) / result.n, 1).tolist()
+            risk_chart.update()
+            for row, share in zip(cpm_table.rows, result.criticality):
+                row['criticality'] = f'{100 * share:.1f}%'
+            cpm_table.update()
+
+        async def run_risk():
+            if state['running']:
+                return
+            try:
+                arrows, network, (low, mode, high) = read_network()
+                estimate = schedule_risk.pert_estimate(network, low, mode, high)
+            except ValueError as e:
+                ui.notify(str(e), type='warning')
+                return
+            solve_cpm()
+            n, kind = int(samples.value), risk_kind.value
+            entropy, sizes = schedule_risk.plan(n, activities=network.n)
+            at = network.order
+            args = (network, low[at], mode[at], high[at], kind, entropy)
+            result = schedule_risk.ScheduleRisk(network.names,
+                                                *schedule_risk.duration_range(network, low[at], high[at]))
+
+            def progressed(redraw):
+                progress.value = result.n / n
+                progress_label.text = f'{result.n:,} of {n:,} samples'
+                if redraw:
+                    show_risk(result, estimate)
+
+            # Chunks of samples are merged in order, as in schedule_risk.simulate
+            await run_chunks(schedule_risk.simulate_chunk, [(*args, k, size) for k, size in enumerate(sizes)],
+                             result.merge, progressed, state, (risk_btn, cancel_btn))
+            if result.n:
+                show_risk(result, estimate, exact=True)
+            if result.n < n:
+                ui.notify(f'Risk analysis cancelled after {result.n:,} samples.', type='warning')
+
+        solve_cpm()
 
 def simplex_tableau_tool():
     with ui.card().classes('w-full p-6 shadow-lg'):
         ui.label('Simplex Tableau Visualizer').classes('text-h5 q-mb-md')
         ui.markdown('''
-        The Simplex algorithm moves between corner points. This tool shows the tableau for: 
-        **Max Z = 3x1 + 5x2** subject to **x1 + x2 ≤ 50** and **2x1 + x2 ≤ 80**.
+        The Simplex algorithm moves between corner points. Enter any linear program (variables are nonnegative) and
+        step through its tableaux. Rows with ≥ or = need artificial variables (a1, a2, ...), which the **two-phase**
+        method drives to zero first and the **Big-M** method penalizes with a large cost M.
         ''')
-        
-        with ui.row().classes('w-full justify-center'):
-            step = ui.number('Simplex Step', value=0, min=0, max=2, precision=0).classes('w-32')
+
+        with ui.row().classes('w-full gap-4 items-start'):
+            with ui.column().classes('w-80'):
+                goal = ui.select({'max': 'Maximize', 'min': 'Minimize'}, value='max', label='Goal').classes('w-full')
+                objective = ui.input('Objective', value='3x1 + 5x2').classes('w-full')
+                method = ui.select({'two-phase': 'Two-phase', 'big-m': 'Big M'}, value='two-phase',
+                                   label='Method').classes('w-full')
+            constraints = ui.textarea('Constraints (one per line)',
+                                      value='x1 + x2 <= 50\n2x1 + x2 <= 80').classes('w-96')
+            ui.button('Solve', on_click=lambda: solve()).classes('self-center')
+
+        state = {'simplex': None}
+
+        with ui.row().classes('w-full justify-center items-center'):
+            ui.button(icon='chevron_left', on_click=lambda: step.set_value(max(int(step.value or 0) - 1, 0)))
+            step = ui.number('Simplex Step', value=0, min=0, max=0, precision=0).classes('w-32')
+            ui.button(icon='chevron_right', on_click=lambda: step.set_value(min(int(step.value or 0) + 1, step.max)))
             ui.label('Change step to see pivoting iterations').classes('text-gray-500 self-center')
-        
+        status_label = ui.label('').classes('text-lg font-bold text-center w-full text-green-700')
+
         @ui.refreshable
         def show_tableau():
-            s = int(step.value)
-            columns = [{'name': c, 'label': c, 'field': c} for c in ['Basis', 'x1', 'x2', 's1', 's2', 'RHS']]
-            if s == 0:
-                rows = [
-                    {'Basis': 's1', 'x1': 1, 'x2': 1, 's1': 1, 's2': 0, 'RHS': 50},
-                    {'Basis': 's2', 'x1': 2, 'x2': 1, 's1': 0, 's2': 1, 'RHS': 80},
-                    {'Basis': 'Z', 'x1': -3, 'x2': -5, 's1': 0, 's2': 0, 'RHS': 0}
-                ]
-            elif s == 1:
-                rows = [
-                    {'Basis': 'x2', 'x1': 1, 'x2': 1, 's1': 1, 's2': 0, 'RHS': 50},
-                    {'Basis': 's2', 'x1': 1, 'x2': 0, 's1': -1, 's2': 1, 'RHS': 30},
-                    {'Basis': 'Z', 'x1': 2, 'x2': 0, 's1': 5, 's2': 0, 'RHS': 250}
-                ]
+            simplex = state['simplex']
+            if simplex is None:
+                return
+            t = simplex.tableau(int(step.value or 0))
+            if 1 in simplex.costs:
+                phase = 'Phase 1 (minimize W, the sum of the artificials)' if t.phase == 1 else 'Phase 2'
+            else:
+                phase = 'Big M' if simplex.artificial.any() else 'Simplex'
+            if t.pivot is not None:
+                row, col = t.pivot
+                move = f'Next pivot: {t.columns[col]} enters, {t.basis[row]} leaves (pivot element in brackets)'
+            elif t.step < len(simplex.steps):
+                move = 'Next: phase 2 starts from this basis with the original objective'
+            else:
+                move = f'Final tableau: {simplex.status}'
+            ui.label(f'Step {t.step} of {len(simplex.steps)} | {phase} | {move}').classes('text-gray-600')
+            # Columns and rows are keyed by position, so no variable name can clash with another field
+            columns = [{'name': 'Basis', 'label': 'Basis', 'field': 'Basis'}]
+            columns += [{'name': f'c{j}', 'label': c, 'field': f'c{j}'} for j, c in enumerate(t.columns)]
+            rows = []
+            for i, (name, values) in enumerate(zip(t.basis, t.rows)):
+                row = {'row': i, 'Basis': name}
+                for j, v in enumerate(values):
+                    row[f'c{j}'] = f'[{number_text(v)}]' if t.pivot == (i, j) else number_text(v)
+                rows.append(row)
+            row = {'row': len(rows), 'Basis': t.objective_label}
+            for j, (v, m) in enumerate(zip(t.objective, t.objective_m)):
+                row[f'c{j}'] = big_m_text(v, m)
+            rows.append(row)
+            ui.table(columns=columns, rows=rows, row_key='row').classes('w-full')
+
+        def solve():
+            try:
+                problem = lp.parse(objective.value, constraints.value, maximize=goal.value == 'max')
+                simplex = tableau.TableauSimplex(problem, method.value)
+            except ValueError as e:
+                ui.notify(str(e), type='warning')
+                return
+            state['simplex'] = simplex
+            step.max = len(simplex.steps)
+            if simplex.status == 'optimal':
+                x, z = simplex.solution()
+                values = ', '.join(f'{name} = {v:.4g}' for name, v in zip(problem.names, x) if abs(v) > 1e-9) or 'all zero'
+                status_label.text = f'Optimal: {values} | {"Max" if problem.maximize else "Min"} Z = {z:.4g}'
             else:
-                rows = [
-                    {'Basis': 'x2', 'x1': 0, 'x2': 1, 's1': 2, 's2': -1, 'RHS': 20},
-                    {'Basis': 'x1', 'x1': 1, 'x2': 0, 's1': -1, 's2': 1, 'RHS': 30},
-                    {'Basis': 'Z', 'x1': 0, 'x2': 0, 's1': 7, 's2': -2, 'RHS': 190}
-                ]
-            ui.table(columns=columns, rows=rows).classes('w-full')
+                status_label.text = f'The problem is {simplex.status.replace("_", " ")}'
+            if step.value == 0:
+                show_tableau.refresh()
+            step.set_value(0)
 
+        solve()
         show_tableau()
-        step.on('update:model-value', show_tableau.refresh)
+        step.on_value_change(show_tableau.refresh)
@@ -0,0 +1,42 @@
+import asyncio
+import os
+import time
+from nicegui import run
+
+# Chunks evaluated concurrently per step of a long run (one per core)
+WORKERS = os.cpu_count() or 1
+# Seconds between redraws while a run is in progress
+REDRAW_INTERVAL = 0.25
+
+async def run_chunks(fn, arg_sets, merge, on_progress, state, buttons):
+    # Runs fn(*args) for every entry of arg_sets, WORKERS at a time in worker processes, and passes the
+    # results to merge in order, so a run matches its engine's serial simulate exactly. A single chunk
+    # runs inline. After every step on_progress(redraw) is called, with redraw true at most every
+    # REDRAW_INTERVAL seconds. state['cancel'] stops the run between steps; the (run, cancel) buttons
+    # are toggled while it runs and restored however it ends.
+    run_btn, cancel_btn = buttons
+    state.update(running=True, cancel=False)
+    run_btn.disable()
+    cancel_btn.enable()
+    shown = 0.0
+    try:
+        for start in range(0, len(arg_sets), WORKERS):
+            if state['cancel']:
+                break
+            batch = arg_sets[start:start + WORKERS]
+            if len(arg_sets) == 1:
+                parts = [fn(*batch[0])]
+            else:
+                parts = await asyncio.gather(*(run.cpu_bound(fn, *args) for args in batch))
+            if any(part is None for part in parts):  # app shutting down
+                break
+            for part in parts:
+                merge(part)
+            redraw = time.monotonic() - shown > REDRAW_INTERVAL
+            on_progress(redraw)
+            if redraw:
+                shown = time.monotonic()
+    finally:
+        state['running'] = False
+        run_btn.enable()
+        cancel_btn.disable()
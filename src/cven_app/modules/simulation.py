@@ -1,5 +1,40 @@
-from nicegui import ui
+import re
+import time
+from nicegui import run, ui
 import numpy as np
+from cven_app.engine import correlated, des, distributions, montecarlo, pareto, reliability
+from cven_app.modules.runner import run_chunks
+
+# Replications per worker task in the discrete-event tool
+DES_BLOCK = 5
+# Designs drawn in the Pareto chart; past this, a uniform random sample of all designs evaluated
+CHART_POINTS = 5000
+STRATEGY_LABELS = {'random': 'Pseudo-random', 'antithetic': 'Antithetic Variates',
+                   'lhs': 'Latin Hypercube', 'sobol': 'Sobol (scrambled)'}
+FAMILY_LABELS = {name: dist.label for name, dist in distributions.REGISTRY.items() if dist.interactive}
+
+def parse_values(text):
+    # Every number in a CSV or whitespace-separated file; headers and other text are skipped
+    values = []
+    for token in re.split(r'[\s,;]+', text):
+        try:
+            values.append(float(token))
+        except ValueError:
+            pass
+    values = np.array(values)
+    return values[np.isfinite(values)]
+
+def structure_text(structure):
+    # Readable form of a reliability structure, e.g. 'Intake → 2 of (Pump 1, Pump 2, Pump 3) → (Grid ∥ Generator)'
+    if isinstance(structure, str):
+        return structure
+    kind, *parts = structure
+    if kind == 'k_of_n':
+        k, *parts = parts
+        return f"{k} of ({', '.join(structure_text(part) for part in parts)})"
+    texts = [structure_text(part) if isinstance(part, str) or part[0] == 'k_of_n' else f'({structure_text(part)})'
+             for part in parts]
+    return (' → ' if kind == 'series' else ' ∥ ').join(texts)
 
 def content():
     ui.label('Systems & Simulation').classes('text-h3 q-my-md')
@@ -10,12 +45,18 @@ def content():
     with ui.tabs().classes('w-full') as tabs:
         t1 = ui.tab('Monte Carlo Simulation')
         t2 = ui.tab('Pareto Frontier')
+        t3 = ui.tab('Discrete-Event Simulation')
+        t4 = ui.tab('System Reliability')
 
     with ui.tab_panels(tabs, value=t1).classes('w-full bg-transparent'):
         with ui.tab_panel(t1):
             monte_carlo_tool()
         with ui.tab_panel(t2):
             pareto_frontier_tool()
+        with ui.tab_panel(t3):
+            discrete_event_tool()
+        with ui.tab_panel(t4):
+            reliability_tool()
 
 def monte_carlo_tool():
     with ui.card().classes('w-full p-6 shadow-lg'):
@@ -24,36 +65,57 @@ def monte_carlo_tool():
         with ui.row().classes('w-full gap-8'):
             with ui.column().classes('w-80'):
                 ui.label('1. Define Input Distribution').classes('font-bold')
-                dist_type = ui.select(['Normal', 'Uniform', 'Poisson'], value='Normal', label='Distribution Type').classes('w-full')
-                
-                # Dynamic parameters based on distribution type
-                params_container = ui.column().classes('w-full')
-                
+                # Families and their parameter sliders come from the distribution registry
+                dist_type = ui.select(FAMILY_LABELS, value='normal', label='Distribution Type').classes('w-full')
+                controls = {}
+                fitted = {}   # parameters fitted to uploaded data, by family (and the empirical spec)
+
                 @ui.refreshable
                 def show_params():
-                    if dist_type.value == 'Normal':
-                        mean = ui.slider(min=0, max=1000, value=500).props('label-always')
-                        ui.label(f'Mean (μ):').bind_text_from(mean, 'value', backward=lambda v: f'Mean (μ): {v}')
-                        std = ui.slider(min=1, max=200, value=50).props('label-always')
-                        ui.label(f'Std Dev (σ):').bind_text_from(std, 'value', backward=lambda v: f'Std Dev (σ): {v}')
-                        return {'type': 'normal', 'loc': mean, 'scale': std}
-                    elif dist_type.value == 'Uniform':
-                        low = ui.slider(min=0, max=500, value=400).props('label-always')
-                        ui.label(f'Min:').bind_text_from(low, 'value', backward=lambda v: f'Min: {v}')
-                        high = ui.slider(min=501, max=1000, value=600).props('label-always')
-                        ui.label(f'Max:').bind_text_from(high, 'value', backward=lambda v: f'Max: {v}')
-                        return {'type': 'uniform', 'low': low, 'high': high}
-                    else:
-                        lam = ui.slider(min=1, max=50, value=10).props('label-always')
-                        ui.label(f'Lambda (λ):').bind_text_from(lam, 'value', backward=lambda v: f'Lambda (λ): {v}')
-                        return {'type': 'poisson', 'lam': lam}
-
-                params_info = show_params()
-                dist_type.on('update:model-value', show_params.refresh)
+                    controls.clear()
+                    if dist_type.value == 'empirical':
+                        ui.label(f"{len(fitted['empirical']) - 1:,} quantiles of the uploaded data").classes('text-sm text-gray-600')
+                        return
+                    dist = distributions.family(dist_type.value)
+                    values = fitted.get(dist.name, {})
+                    for param in dist.params:
+                        value = values.get(param.name, param.default)
+                        # Fitted values may fall outside the default slider range
+                        slider = ui.slider(min=min(param.min, value), max=max(param.max, value), step=param.step,
+                                           value=value).props('label-always')
+                        ui.label().bind_text_from(slider, 'value', backward=lambda v, label=param.label: f'{label}: {v:g}')
+                        controls[param.name] = slider
+
+                show_params()
+                dist_type.on_value_change(show_params.refresh)
+
+                def current_spec():
+                    if dist_type.value == 'empirical':
+                        return fitted['empirical']
+                    return distributions.family(dist_type.value).spec({name: s.value for name, s in controls.items()})
+
+                ui.label('Fit to Observed Data (optional)').classes('font-bold q-mt-md')
+                ui.upload(label='Observations (CSV or text)', auto_upload=True, max_files=1,
+                          on_upload=lambda e: fit_upload(e)).props('accept=".csv,.txt"').classes('w-full')
+                fit_table = ui.table(columns=[
+                    {'name': 'label', 'label': 'Distribution', 'field': 'label', 'align': 'left'},
+                    {'name': 'params', 'label': 'MLE Parameters', 'field': 'params', 'align': 'left'},
+                    {'name': 'aic', 'label': 'AIC', 'field': 'aic'},
+                    {'name': 'ks', 'label': 'K-S', 'field': 'ks'},
+                ], rows=[], row_key='kind').props('dense flat').classes('w-full')
+                fit_table.set_visibility(False)
+                # Clicking a fit switches to it (with its fitted parameters)
+                fit_table.on('rowClick', lambda e: dist_type.set_value(e.args[1]['kind']))
 
                 ui.separator().classes('q-my-md')
-                iterations = ui.number('Iterations', value=2000, min=100, max=10000, step=100).classes('w-full')
+                iterations = ui.number('Iterations', value=2000, min=100, max=1_000_000_000, step=100).classes('w-full')
+                seed_input = ui.number('Seed (blank = random)', value=None, min=0, precision=0).classes('w-full')
+                strategy_select = ui.select(STRATEGY_LABELS, value='random', label='Sampling Strategy').classes('w-full')
                 run_btn = ui.button('Run Simulation', icon='play_arrow', on_click=lambda: run_sim()).classes('w-full q-mt-md')
+                cancel_btn = ui.button('Cancel', icon='stop', color='negative', on_click=lambda: state.update(cancel=True)).classes('w-full')
+                cancel_btn.disable()
+                progress = ui.linear_progress(value=0, show_value=False).classes('q-mt-sm')
+                progress_label = ui.label('').classes('text-xs text-gray-500')
 
             with ui.column().classes('flex-1'):
                 stats_row = ui.row().classes('w-full justify-between q-mb-md p-4 bg-gray-50 rounded border')
@@ -67,6 +129,9 @@ def monte_carlo_tool():
                     with ui.column().classes('items-center'):
                         ui.label('Std Deviation').classes('text-xs uppercase text-gray-500')
                         std_label = ui.label('-').classes('text-xl font-bold text-blue-600')
+                    with ui.column().classes('items-center'):
+                        ui.label('Std Error of Mean').classes('text-xs uppercase text-gray-500')
+                        se_label = ui.label('-').classes('text-xl font-bold text-green-600')
 
                 chart = ui.echart({
                     'title': {'text': 'Outcome Distribution', 'left': 'center'},
@@ -79,37 +144,123 @@ def monte_carlo_tool():
                         'barWidth': '95%',
                         'data': [],
                         'itemStyle': {'color': '#3b82f6', 'borderRadius': [4, 4, 0, 0]}
+                    }, {
+                        'name': 'Expected', 'type': 'line', 'smooth': True, 'symbol': 'none', 'data': [],
+                        'itemStyle': {'color': '#ef4444'}
                     }]
                 }).classes('w-full h-80')
 
-        def run_sim():
-            n = int(iterations.value)
-            p = show_params() # Get current slider references from refreshable
-            
-            # Extract values from sliders/numbers correctly
-            # Note: show_params returns the dict with component REFs
-            # we need to ensure we get .value
-            current_type = dist_type.value
-            if current_type == 'Normal':
-                data = np.random.normal(p['loc'].value, p['scale'].value, n)
-            elif current_type == 'Uniform':
-                data = np.random.uniform(p['low'].value, p['high'].value, n)
-            else:
-                data = np.random.poisson(p['lam'].value, n)
+                convergence_chart = ui.echart({
+                    'title': {'text': 'Convergence by Sampling Strategy', 'left': 'center'},
+                    'tooltip': {'trigger': 'axis'},
+                    'legend': {'bottom': 0},
+                    'grid': {'left': '3%', 'right': '4%', 'bottom': '15%', 'containLabel': True},
+                    'xAxis': {'type': 'log', 'name': 'Samples', 'nameLocation': 'middle', 'nameGap': 25},
+                    'yAxis': {'type': 'log', 'name': 'Std Error of Mean'},
+                    'series': [{'name': label, 'type': 'line', 'data': []} for label in STRATEGY_LABELS.values()],
+                }).classes('w-full h-80')
+                convergence_label = ui.label('').classes('text-sm text-gray-600')
+
+        state = {'running': False, 'cancel': False}
 
+        def show(summary, spec):
             # Statistics
-            mean_label.text = f'{np.mean(data):.2f}'
-            p95_label.text = f'{np.percentile(data, 95):.2f}'
-            std_label.text = f'{np.std(data):.2f}'
+            mean_label.text = f'{summary.stats.mean:.2f}'
+            p95_label.text = f'{summary.percentile(95):.2f}'
+            std_label.text = f'{summary.stats.std():.2f}'
+            se = summary.standard_error()
+            se_label.text = '-' if np.isnan(se) else f'{se:.3g}'
 
             # Histogram bins
-            counts, bins = np.histogram(data, bins=30)
+            counts, bins = summary.histogram.regroup(30)
             chart.options['xAxis']['data'] = [f'{bins[i]:.1f}' for i in range(len(bins)-1)]
             chart.options['series'][0]['data'] = counts.tolist()
+            # Counts the input distribution predicts for each bin
+            chart.options['series'][1]['data'] = np.round(summary.n * np.diff(distributions.cdf(spec, bins)), 1).tolist()
             chart.update()
 
+        async def run_sim():
+            if state['running']:
+                return
+            n = int(iterations.value)
+            spec = current_spec()
+
+            seed = None if seed_input.value is None else int(seed_input.value)
+            strategy = strategy_select.value
+            entropy, sizes = montecarlo.plan(n, seed, strategy=strategy)
+            seed_input.props(f'hint="Seed used: {entropy}"')
+            summary = montecarlo.empty_summary(spec, strategy)
+
+            def progressed(redraw):
+                progress.value = summary.n / n
+                progress_label.text = f'{summary.n:,} of {n:,} samples'
+                if redraw:
+                    show(summary, spec)
+
+            # Samples are summarized chunk by chunk, so memory does not grow with n, and the
+            # result matches montecarlo.simulate(spec, n, seed, strategy=strategy) exactly
+            await run_chunks(montecarlo.summarize_chunk, [(spec, entropy, k, size, strategy) for k, size in enumerate(sizes)],
+                             summary.merge, progressed, state, (run_btn, cancel_btn))
+            if summary.n:
+                show(summary, spec)
+            if summary.n < n:
+                ui.notify(f'Simulation cancelled after {summary.n:,} samples.', type='warning')
+            else:
+                await show_convergence(spec)
+
+        async def show_convergence(spec):
+            # Standard error vs. sample size for every strategy on the same input
+            sizes = [2**k for k in range(7, 17)]
+            errors = await run.cpu_bound(montecarlo.convergence, spec, sizes)
+            if errors is None:  # app shutting down
+                return
+            for series, strategy in zip(convergence_chart.options['series'], STRATEGY_LABELS):
+                # A zero error (e.g. antithetic pairs on a symmetric input) cannot be drawn on a log axis
+                series['data'] = [[size, se] for size, se in zip(sizes, errors[strategy]) if se > 0]
+            convergence_chart.update()
+            # Equal error needs (SE ratio)^2 times fewer samples than pseudo-random
+            ratios = []
+            for strategy, label in list(STRATEGY_LABELS.items())[1:]:
+                se = errors[strategy][-1]
+                ratios.append(f'{label}: exact' if se == 0 else f"{label}: {(errors['random'][-1] / se) ** 2:,.0f}x")
+            convergence_label.text = f'Fewer samples needed for the same error at n = {sizes[-1]:,}: ' + ', '.join(ratios)
+
+        async def fit_upload(e):
+            values = parse_values(await e.file.text())
+            if len(values) < 2:
+                ui.notify('No numeric observations found in the file.', type='warning')
+                return
+            try:
+                fits = await run.cpu_bound(distributions.fit, values)
+            except ValueError as err:
+                ui.notify(f'Could not fit the data: {err}', type='warning')
+                return
+            if fits is None:  # app shutting down
+                return
+            # Only families with sliders can be selected (all-equal data fit only the constant family)
+            fits = [f for f in fits if distributions.family(f.kind).interactive]
+            fitted.clear()
+            for f in fits:
+                names = [param.name for param in distributions.family(f.kind).params]
+                fitted[f.kind] = {name: float(f'{value:.4g}') for name, value in zip(names, f.params)}
+            fitted['empirical'] = distributions.empirical(values)
+            fit_table.rows = [{'kind': f.kind, 'label': distributions.family(f.kind).label,
+                               'params': ', '.join(f'{v:.4g}' for v in f.params),
+                               'aic': f'{f.aic:,.1f}', 'ks': f'{f.ks:.4f}'} for f in fits]
+            fit_table.rows.append({'kind': 'empirical', 'label': 'Empirical', 'params': f'{len(values):,} values',
+                                   'aic': '-', 'ks': '0'})
+            fit_table.set_visibility(True)
+            fit_table.update()
+            dist_type.set_options({**FAMILY_LABELS, 'empirical': 'Empirical (uploaded data)'})
+            best = fits[0].kind if fits else 'empirical'
+            dist_type.set_value(best)
+            # Rebuild the sliders with the fitted values (even if the family is unchanged) before running
+            await show_params.refresh()
+            ui.notify(f'Best fit by AIC: {distributions.family(best).label} ({len(values):,} observations).')
+            await run_sim()
+
         # Initial run
-        run_sim()
+        ui.timer(0, run_sim, once=True)
 
 def pareto_frontier_tool():
     with ui.card().classes('w-full p-6 shadow-lg'):
@@ -117,32 +268,45 @@ def pareto_frontier_tool():
         ui.markdown('''
         In engineering, we often want to **Minimize Cost** while **Maximizing Reliability**. 
         The **Pareto Frontier** consists of all designs where you cannot improve one objective without making the other worse.
+        New designs are added to a running archive, so the frontier improves as more designs are evaluated.
+
+        In the **pump station** design space each design picks a tier and a number of units for the intake, pumps, power
+        supply and controls; its reliability is simulated from component failures (see System Reliability), all designs
+        sharing the same simulated failures so they are compared fairly.
         ''')
 
+        sources = {'station': 'Pump station (simulated reliability)', 'sample': 'Correlated sample (illustrative)'}
+
         with ui.row().classes('w-full gap-8'):
             with ui.column().classes('w-80'):
                 ui.label('1. Design Space Parameters').classes('font-bold')
-                num_designs = ui.slider(min=50, max=500, value=200).props('label-always')
-                ui.label('Number of Designs:').bind_text_from(num_designs, 'value')
+                source = ui.select(sources, value='station', label='Designs', on_change=lambda: reset()).classes('w-full')
+                num_designs = ui.slider(min=50, max=20000, step=50, value=200).props('label-always')
+                ui.label('Designs per Batch:').bind_text_from(num_designs, 'value')
                 
-                ui.separator().classes('q-my-md')
-                ui.label('2. Trade-off Strength').classes('font-bold')
-                correlation = ui.slider(min=-100, max=100, value=-50).props('label-always')
-                ui.label('Correlation (Cost vs Reliability):').bind_text_from(correlation, 'value', backward=lambda v: f'{v}%')
+                with ui.column().classes('w-full').bind_visibility_from(source, 'value', value='sample'):
+                    ui.separator().classes('q-my-md')
+                    ui.label('2. Trade-off Strength').classes('font-bold')
+                    correlation = ui.slider(min=-100, max=100, value=-50).props('label-always')
+                    ui.label('Correlation (Cost vs Reliability):').bind_text_from(correlation, 'value', backward=lambda v: f'{v}%')
                 
-                ui.button('Generate New Designs', icon='refresh', on_click=lambda: generate()).classes('w-full q-mt-md')
+                ui.button('Generate New Designs', icon='add', on_click=lambda: generate()).classes('w-full q-mt-md')
+                ui.button('Reset Archive', icon='restart_alt', on_click=lambda: reset()).props('outline').classes('w-full')
+                ui.switch('Stream designs (one batch per second)', on_change=lambda e: setattr(streamer, 'active', e.value))
+                archive_label = ui.label('').classes('text-sm text-gray-600 q-mt-sm')
 
             with ui.column().classes('flex-1'):
                 chart = ui.echart({
                     'title': {'text': 'Cost vs. Reliability Trade-off', 'left': 'center'},
                     'tooltip': {'trigger': 'item', 'formatter': 'Cost: {@[0]} <br/> Reliability: {@[1]}'},
-                    'xAxis': {'type': 'value', 'name': 'Cost ($)', 'nameLocation': 'middle', 'nameGap': 25},
-                    'yAxis': {'type': 'value', 'name': 'Reliability (%)', 'min': 0, 'max': 100},
+                    'xAxis': {'type': 'value', 'name': 'Cost ($k)', 'nameLocation': 'middle', 'nameGap': 25, 'scale': True},
+                    'yAxis': {'type': 'value', 'name': 'Reliability (%)', 'scale': True},
                     'series': [
                         {
                             'name': 'All Designs',
                             'type': 'scatter',
                             'data': [],
+                            'large': True,
                             'itemStyle': {'color': '#94a3b8', 'opacity': 0.6}
                         },
                         {
@@ -153,41 +317,354 @@ def pareto_frontier_tool():
                             'lineStyle': {'color': '#ef4444', 'width': 3},
                             'itemStyle': {'color': '#ef4444', 'borderWidth': 2},
                             'symbol': 'circle',
-                            'symbolSize': 8
+                            'symbolSize': 8,
+                            # The third value of a frontier point describes the design
+                            'tooltip': {'formatter': 'Cost: {@[0]} <br/> Reliability: {@[1]} <br/> {@[2]}'}
                         }
                     ],
                     'legend': {'bottom': 0}
                 }).classes('w-full h-80')
 
-        def generate():
-            n = int(num_designs.value)
-            corr = correlation.value / 100
-            
+        archive = {'front': pareto.ParetoArchive(2, maximize=[False, True]), 'designs': 0, 'labels': {}, 'busy': False}
+        rng = np.random.default_rng()
+        # Every batch of pump station designs is simulated on the same component failures (common random numbers)
+        states_seed = int(rng.integers(2**63))
+
+        def reset():
+            archive.update(front=pareto.ParetoArchive(2, maximize=[False, True]), designs=0, labels={})
+            station = source.value == 'station'
+            chart.options['xAxis']['name'] = 'Cost ($k)' if station else 'Cost ($)'
+            chart.options['yAxis'].update(min=None if station else 0, max=None if station else 100)
+            chart.options['series'][0]['data'] = []
+            chart.options['series'][1]['data'] = []
+            chart.update()
+            archive_label.text = ''
+
+        async def sample_batch(n):
+            # (cost, reliability %) of n designs, with a description of each pump station design
+            if source.value == 'station':
+                stages = reliability.PUMP_STATION
+                result = await run.cpu_bound(reliability.design_batch, stages, n, int(rng.integers(2**63)),
+                                             reliability.DESIGN_REALIZATIONS, states_seed)
+                if result is None:  # app shutting down
+                    return None, None
+                designs, costs, works = result
+                batch = np.column_stack((costs, 100 * works)).round(4)
+                return batch, lambda i: reliability.describe_design(stages, designs[i])
+
             # Generate correlated random data
             # Cost (X) and Reliability (Y)
             # We want them generally inversely correlated for a clear frontier
-            mean = [500, 70]
-            cov = [[10000, corr * 100 * 10], [corr * 100 * 10, 100]]
-            data = np.random.multivariate_normal(mean, cov, n)
+            # The sampler's Cholesky factor is cached per correlation, so repeated batches reuse it
+            corr = correlation.value / 100
+            sampler = correlated.CorrelatedSampler([('normal', 500, 100), ('normal', 70, 10)], [[1, corr], [corr, 1]])
+            data = sampler.sample(n, rng)
             
             # Clip values to realistic bounds
             costs = np.clip(data[:, 0], 100, 1000)
-            reliability = np.clip(data[:, 1], 10, 99)
-            
-            points = list(zip(costs, reliability))
-            
-            # Find Pareto Frontier (Assuming Min X, Max Y)
+            works = np.clip(data[:, 1], 10, 99)
+            return np.column_stack((costs, works)).round(2), lambda i: 'Illustrative design'
+
+        async def generate():
+            if archive['busy']:
+                return
+            n = int(num_designs.value)
+            archive['busy'] = True
+            try:
+                batch, describe = await sample_batch(n)
+            finally:
+                archive['busy'] = False
+            if batch is None:
+                return
+
+            # Update the Pareto Frontier archive (Min cost, Max reliability)
             # A point (x1, y1) dominates (x2, y2) if x1 <= x2 and y1 >= y2 (and at least one strict)
-            sorted_points = sorted(points, key=lambda p: p[0]) # Sort by increasing cost
-            pareto_set = []
-            max_y = -1
-            for x, y in sorted_points:
-                if y > max_y:
-                    pareto_set.append([float(x), float(y)])
-                    max_y = y
+            added, removed = archive['front'].insert_many(batch)
+            archive['designs'] += n
+
+            # Describe the designs that joined the front (all of them are on the batch's own front)
+            if len(added):
+                candidates = np.flatnonzero(pareto.nondominated(batch, maximize=[False, True]))
+                joined = {tuple(point) for point in added.tolist()}
+                for i in candidates:
+                    if tuple(batch[i].tolist()) in joined:
+                        archive['labels'][tuple(batch[i].tolist())] = describe(i)
             
-            chart.options['series'][0]['data'] = [[float(x), float(y)] for x, y in points]
-            chart.options['series'][1]['data'] = pareto_set
+            # Push only the new designs while they fit, and the frontier only when it changed
+            points = batch.tolist()
+            shown = chart.options['series'][0]['data']
+            seen = archive['designs'] - n
+            if archive['designs'] <= CHART_POINTS:
+                shown.extend(points)
+                chart.run_chart_method('appendData', {'seriesIndex': 0, 'data': points})
+            else:
+                # Reservoir sampling: design t (from 0) takes a random slot with probability CHART_POINTS / (t + 1)
+                fill = max(CHART_POINTS - seen, 0)
+                shown.extend(points[:fill])
+                t = seen + np.arange(fill, n)
+                taken = np.flatnonzero(rng.random(t.size) * (t + 1) < CHART_POINTS) + fill
+                for i, slot in zip(taken, rng.integers(0, CHART_POINTS, taken.size)):
+                    shown[slot] = points[i]
+                chart.run_chart_method('setOption', {'series': [{'data': shown}]})
+            if len(added) or len(removed):
+                front = archive['front'].points.tolist() # sorted by increasing cost
+                archive['labels'] = {tuple(point): archive['labels'].get(tuple(point), '') for point in front}
+                front = [[*point, archive['labels'][tuple(point)]] for point in front]
+                chart.options['series'][1]['data'] = front
+                chart.run_chart_method('setOption', {'series': [{}, {'data': front}]})
+            archive_label.text = (f"{archive['designs']:,} designs evaluated | frontier: {len(archive['front'])} designs "
+                                  f"(+{len(added)} / -{len(removed)} in last batch)")
+            if archive['designs'] > CHART_POINTS:
+                archive_label.text += f' | chart shows a random {CHART_POINTS:,}'
+
+        streamer = ui.timer(1.0, generate, active=False)
+        ui.timer(0, generate, once=True)
+
+def discrete_event_tool():
+    with ui.card().classes('w-full p-6 shadow-lg'):
+        ui.label('Discrete-Event Simulation: Queues and Equipment Cycles').classes('text-h5 q-mb-md')
+        ui.markdown('''
+        A **discrete-event simulation** follows every vehicle or truck through the system: an event calendar jumps from one
+        arrival, service start or departure to the next. Each **replication** is an independent run of the same day, and the
+        spread across replications gives a **95% confidence interval** for each result.
+        ''')
+
+        scenarios = {'queue': 'Toll Plaza (booths in parallel)', 'haul': 'Earthmoving (loader and trucks)'}
+        # Output measures per scenario: (key, label, scale, format)
+        measures = {
+            'queue': [('served', 'Vehicles served', 1, '{:,.0f}'), ('mean_wait', 'Mean wait in queue (s)', 60, '{:.1f}'),
+                      ('max_wait', 'Longest wait (s)', 60, '{:.0f}'), ('mean_queue', 'Mean queue length (veh)', 1, '{:.2f}'),
+                      ('max_queue', 'Longest queue (veh)', 1, '{:.1f}'), ('utilization', 'Booth utilization (%)', 100, '{:.1f}')],
+            'haul': [('loads', 'Loads delivered', 1, '{:,.1f}'), ('production_rate', 'Loads per hour', 60, '{:.2f}'),
+                     ('mean_cycle', 'Mean truck cycle (min)', 1, '{:.2f}'), ('mean_truck_wait', 'Mean wait at loader (min)', 1, '{:.2f}'),
+                     ('loader_utilization', 'Loader utilization (%)', 100, '{:.1f}')],
+        }
+
+        with ui.row().classes('w-full gap-8'):
+            with ui.column().classes('w-80'):
+                ui.label('1. System').classes('font-bold')
+                scenario = ui.select(scenarios, value='queue', label='Scenario').classes('w-full')
+
+                @ui.refreshable
+                def show_params():
+                    if scenario.value == 'queue':
+                        rate = ui.slider(min=60, max=3000, step=60, value=900).props('label-always')
+                        ui.label('Arrivals (veh/hr):').bind_text_from(rate, 'value', backward=lambda v: f'Arrivals (veh/hr): {v}')
+                        service = ui.slider(min=2, max=60, value=10).props('label-always')
+                        ui.label('Mean service time (s):').bind_text_from(service, 'value', backward=lambda v: f'Mean service time (s): {v}')
+                        booths = ui.slider(min=1, max=12, value=3).props('label-always')
+                        ui.label('Open booths:').bind_text_from(booths, 'value', backward=lambda v: f'Open booths: {v}')
+                        controls.update(rate=rate, service=service, booths=booths)
+                        return
+                    trucks = ui.slider(min=1, max=20, value=6).props('label-always')
+                    ui.label('Trucks:').bind_text_from(trucks, 'value', backward=lambda v: f'Trucks: {v}')
+                    load = ui.slider(min=1, max=10, step=0.5, value=3).props('label-always')
+                    ui.label('Mean load time (min):').bind_text_from(load, 'value', backward=lambda v: f'Mean load time (min): {v}')
+                    haul = ui.slider(min=2, max=60, value=10).props('label-always')
+                    ui.label('Haul time, loaded (min):').bind_text_from(haul, 'value', backward=lambda v: f'Haul time, loaded (min): {v}')
+                    back = ui.slider(min=2, max=60, value=8).props('label-always')
+                    ui.label('Return time, empty (min):').bind_text_from(back, 'value', backward=lambda v: f'Return time, empty (min): {v}')
+                    controls.update(trucks=trucks, load=load, haul=haul, back=back)
+
+                # Slider references of the current scenario, replaced whenever the panel is redrawn
+                controls = {}
+                show_params()
+                scenario.on_value_change(show_params.refresh)
+
+                ui.separator().classes('q-my-md')
+                ui.label('2. Experiment').classes('font-bold')
+                hours = ui.number('Hours simulated per replication', value=8, min=0.5, max=1000).classes('w-full')
+                replications = ui.number('Replications', value=30, min=2, max=10_000, precision=0).classes('w-full')
+                run_btn = ui.button('Run Replications', icon='play_arrow', on_click=lambda: run_des()).classes('w-full q-mt-md')
+                cancel_btn = ui.button('Cancel', icon='stop', color='negative', on_click=lambda: state.update(cancel=True)).classes('w-full')
+                cancel_btn.disable()
+                progress = ui.linear_progress(value=0, show_value=False).classes('q-mt-sm')
+                progress_label = ui.label('').classes('text-xs text-gray-500')
+
+            with ui.column().classes('flex-1'):
+                results_table = ui.table(columns=[
+                    {'name': 'measure', 'label': 'Measure', 'field': 'measure', 'align': 'left'},
+                    {'name': 'mean', 'label': 'Mean', 'field': 'mean'},
+                    {'name': 'ci', 'label': '95% CI (±)', 'field': 'ci'},
+                ], rows=[], row_key='measure').classes('w-full')
+                events_label = ui.label('').classes('text-sm text-gray-600')
+                chart = ui.echart({
+                    'title': {'text': 'Replication Results', 'left': 'center'},
+                    'tooltip': {'trigger': 'axis'},
+                    'xAxis': {'type': 'category', 'data': [], 'name': '', 'nameLocation': 'middle', 'nameGap': 25},
+                    'yAxis': {'type': 'value', 'name': 'Replications'},
+                    'series': [{'type': 'bar', 'data': [], 'barCategoryGap': '5%', 'itemStyle': {'color': '#8b5cf6'}}],
+                }).classes('w-full h-80')
+
+        state = {'running': False, 'cancel': False}
+
+        def model_params():
+            c = controls
+            if scenario.value == 'queue':
+                # Poisson arrivals; booth service times vary +/-50% around the mean (times in minutes)
+                mean = c['service'].value / 60
+                return {'arrival': ('exponential', 60 / c['rate'].value), 'service': ('triangular', 0.5 * mean, mean, 1.5 * mean),
+                        'servers': int(c['booths'].value)}
+            load, haul, back = c['load'].value, c['haul'].value, c['back'].value
+            return {'trucks': int(c['trucks'].value), 'load': ('triangular', 0.7 * load, load, 1.6 * load),
+                    'haul': ('triangular', 0.85 * haul, haul, 1.3 * haul), 'dump': ('uniform', 1.0, 2.0),
+                    'back': ('triangular', 0.85 * back, back, 1.3 * back)}
+
+        def show(result, model, elapsed):
+            rows = []
+            for key, label, scale, fmt in measures[model]:
+                rows.append({'measure': label, 'mean': fmt.format(result.mean(key) * scale),
+                             'ci': fmt.format(result.half_width(key) * scale) if result.n > 1 else '-'})
+            results_table.rows = rows
+            results_table.update()
+            events_label.text = f'{result.n:,} replications | {result.events:,} events | {result.events / max(elapsed, 1e-9):,.0f} events/s'
+
+            # Spread of the headline measure across replications
+            key, label, scale, _ = measures[model][1]
+            values = np.asarray(result.values[key], dtype=float) * scale
+            values = values[np.isfinite(values)]
+            counts, edges = np.histogram(values, bins=min(20, max(len(values) // 3, 1)))
+            chart.options['xAxis']['data'] = [f'{(a + b) / 2:.2f}' for a, b in zip(edges[:-1], edges[1:])]
+            chart.options['xAxis']['name'] = label
+            chart.options['series'][0]['data'] = counts.tolist()
             chart.update()
 
-        generate()
+        async def run_des():
+            if state['running']:
+                return
+            model, params = scenario.value, model_params()
+            params['horizon'] = float(hours.value) * 60
+            params['warmup'] = 0.0
+            n = int(replications.value)
+            result = des.Replications(model, np.random.SeedSequence().entropy)
+
+            def progressed(redraw):
+                progress.value = result.n / n
+                progress_label.text = f'{result.n:,} of {n:,} replications'
+                if redraw:
+                    show(result, model, time.monotonic() - started)
+
+            # Blocks of replications run in worker processes, so the page stays responsive
+            started = time.monotonic()
+            await run_chunks(des.run_replications,
+                             [(model, params, result.entropy, k, min(k + DES_BLOCK, n)) for k in range(0, n, DES_BLOCK)],
+                             result.extend, progressed, state, (run_btn, cancel_btn))
+            if result.n:
+                show(result, model, time.monotonic() - started)
+            if result.n < n:
+                ui.notify(f'Run cancelled after {result.n:,} replications.', type='warning')
+
+        ui.timer(0, run_des, once=True)
+
+def reliability_tool():
+    with ui.card().classes('w-full p-6 shadow-lg'):
+        ui.label('System Reliability: Series, Parallel and k-out-of-n Systems').classes('text-h5 q-mb-md')
+        ui.markdown('''
+        An infrastructure system works if enough of its components work: a **series** chain needs every part, a **parallel**
+        group needs one, and a **k-out-of-n** group needs any k. Each realization samples which components fail; the share
+        of realizations in which the system fails estimates its **failure probability**, shown with a 95% confidence
+        interval next to the exact value. **Birnbaum importance** is how much more often the system works when a component
+        works than when it fails — the components where upgrades pay off most.
+        ''')
+
+        systems = {name: label for name, (label, _, _) in reliability.SYSTEMS.items()}
+
+        with ui.row().classes('w-full gap-8'):
+            with ui.column().classes('w-80'):
+                ui.label('1. System').classes('font-bold')
+                system_select = ui.select(systems, value='pump_station', label='System').classes('w-full')
+
+                @ui.refreshable
+                def show_params():
+                    _, structure, defaults = reliability.SYSTEMS[system_select.value]
+                    ui.label(structure_text(structure)).classes('text-sm text-gray-600')
+                    ui.label('2. Component Failure Probabilities').classes('font-bold q-mt-md')
+                    controls.clear()
+                    for name in reliability.components(structure):
+                        controls[name] = ui.number(name, value=defaults[name], min=0, max=1, step=0.001,
+                                                   format='%.4g').props('dense').classes('w-full')
+
+                # Number inputs of the current system, replaced whenever the panel is redrawn
+                controls = {}
+                show_params()
+                system_select.on_value_change(show_params.refresh)
+
+                ui.separator().classes('q-my-md')
+                ui.label('3. Experiment').classes('font-bold')
+                realizations = ui.number('Realizations', value=1_000_000, min=1000, max=10_000_000_000, step=1000).classes('w-full')
+                seed_input = ui.number('Seed (blank = random)', value=None, min=0, precision=0).classes('w-full')
+                run_btn = ui.button('Simulate System', icon='play_arrow', on_click=lambda: run_reliability()).classes('w-full q-mt-md')
+                cancel_btn = ui.button('Cancel', icon='stop', color='negative', on_click=lambda: state.update(cancel=True)).classes('w-full')
+                cancel_btn.disable()
+                progress = ui.linear_progress(value=0, show_value=False).classes('q-mt-sm')
+                progress_label = ui.label('').classes('text-xs text-gray-500')
+
+            with ui.column().classes('flex-1'):
+                with ui.row().classes('w-full justify-between q-mb-md p-4 bg-gray-50 rounded border'):
+                    with ui.column().classes('items-center'):
+                        ui.label('Failure Probability').classes('text-xs uppercase text-gray-500')
+                        failure_label = ui.label('-').classes('text-xl font-bold')
+                    with ui.column().classes('items-center'):
+                        ui.label('95% Confidence Interval').classes('text-xs uppercase text-gray-500')
+                        interval_label = ui.label('-').classes('text-xl font-bold text-blue-600')
+                    with ui.column().classes('items-center'):
+                        ui.label('Exact').classes('text-xs uppercase text-gray-500')
+                        exact_label = ui.label('-').classes('text-xl font-bold text-green-600')
+                    with ui.column().classes('items-center'):
+                        ui.label('Reliability').classes('text-xs uppercase text-gray-500')
+                        reliability_label = ui.label('-').classes('text-xl font-bold')
+                throughput_label = ui.label('').classes('text-sm text-gray-600')
+
+                chart = ui.echart({
+                    'title': {'text': 'Birnbaum Importance', 'left': 'center'},
+                    'tooltip': {'trigger': 'axis'},
+                    'grid': {'left': '3%', 'right': '4%', 'bottom': '3%', 'containLabel': True},
+                    'xAxis': {'type': 'value', 'name': 'P(works | component works) − P(works | component fails)',
+                              'nameLocation': 'middle', 'nameGap': 25},
+                    'yAxis': {'type': 'category', 'data': [], 'inverse': True},
+                    'series': [{'type': 'bar', 'data': [], 'itemStyle': {'color': '#f59e0b'}}],
+                }).classes('w-full h-80')
+
+        state = {'running': False, 'cancel': False}
+
+        def show(result, exact, elapsed):
+            f = result.failure_probability
+            lo, hi = result.interval()
+            failure_label.text = f'{f:.4g}'
+            interval_label.text = f'{lo:.4g} – {hi:.4g}'
+            exact_label.text = f'{exact:.4g}'
+            reliability_label.text = f'{100 * (1 - f):.4f}%'
+            throughput_label.text = (f'{result.n:,} realizations | {result.failures:,} system failures | '
+                                     f'{result.n / max(elapsed, 1e-9):,.0f} realizations/s')
+            chart.options['yAxis']['data'] = list(result.components)
+            chart.options['series'][0]['data'] = [None if np.isnan(v) else round(float(v), 5) for v in result.importance()]
+            chart.update()
+
+        async def run_reliability():
+            if state['running']:
+                return
+            _, structure, _ = reliability.SYSTEMS[system_select.value]
+            p = {name: min(max(float(control.value or 0), 0.0), 1.0) for name, control in controls.items()}
+            n = int(realizations.value)
+            seed = None if seed_input.value is None else int(seed_input.value)
+            entropy, sizes = reliability.plan(n, seed)
+            seed_input.props(f'hint="Seed used: {entropy}"')
+            exact = reliability.exact(structure, p)
+            result = reliability.Reliability(reliability.components(structure))
+
+            def progressed(redraw):
+                progress.value = result.n / n
+                progress_label.text = f'{result.n:,} of {n:,} realizations'
+                if redraw:
+                    show(result, exact, time.monotonic() - started)
+
+            # The result matches reliability.simulate(structure, p, n, seed) exactly
+            started = time.monotonic()
+            await run_chunks(reliability.simulate_chunk, [(structure, p, entropy, k, size) for k, size in enumerate(sizes)],
+                             result.merge, progressed, state, (run_btn, cancel_btn))
+            if result.n:
+                show(result, exact, time.monotonic() - started)
+            if result.n < n:
+                ui.notify(f'Simulation cancelled after {result.n:,} realizations.', type='warning')
+
+        ui.timer(0, run_reliability, once=True)
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from cven_app.engine import depreciation
+
+
+def test_ddb_book_value_flat_after_life():
+    # A life-4 asset alongside a life-8 one, and a MACRS asset whose schedule runs one year past its life
+    for cost, salvage, life in (([1000, 1000], [0, 0], [4, 8]), (1000, 0, 5), ([5000, 800], [500, 0], [3, 7])):
+        expense, book = depreciation.schedules(cost, salvage, life)['DDB']
+        for row, n in enumerate(np.atleast_1d(life)):
+            assert np.all(expense[row, n:] == 0)
+            assert np.all(book[row, n - 1:] == book[row, n - 1])
+
+
+def test_expense_adds_up_to_book_value():
+    result = depreciation.schedules([1000, 2500], [100, 0], [5, 7])
+    for method in ('SL', 'SYD', 'DDB', 'MACRS'):
+        expense, book = result[method]
+        assert np.allclose(book, np.array([[1000], [2500]]) - np.cumsum(expense, axis=1))
+    sl, syd = result['SL'][1], result['SYD'][1]
+    assert np.allclose(sl[0, 4], 100) and np.allclose(syd[0, 4], 100)
+    assert np.allclose(result['MACRS'][1][:, -1], 0, atol=1e-9)
+
+
+def test_depreciate_drops_years_past_each_schedule():
+    assets = pd.DataFrame({'cost': [1000.0, 1000.0], 'salvage': [0.0, 0.0], 'life': [3, 5]})
+    table = depreciation.depreciate(assets, methods=('DDB',))
+    assert table.loc[0].index.tolist() == [1, 2, 3, 4]
+    assert table.loc[1].index.tolist() == [1, 2, 3, 4, 5, 6]
+    assert np.allclose(table.loc[0, 'DDB_book'].iloc[2:], table.loc[0, 'DDB_book'].iloc[2])
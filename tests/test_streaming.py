@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from cven_app.engine import distributions, montecarlo
+from cven_app.engine.streaming import DIGEST_COMPRESSION, FixedHistogram, RunningStats, TDigest
+
+QS = [0.1, 1, 5, 25, 50, 75, 95, 99, 99.9]
+
+
+def odd_chunks(x, sizes=(1, 7, 333, 1000)):
+    # Uneven pieces, repeating ``sizes`` until ``x`` is used up
+    start, k = 0, 0
+    while start < x.size:
+        yield x[start:start + sizes[k % len(sizes)]]
+        start += sizes[k % len(sizes)]
+        k += 1
+
+
+def within_centroid(x, estimates, qs, compression=DIGEST_COMPRESSION):
+    # Each estimate's rank is off by less than the width of a t-digest centroid at its q:
+    # 2 pi sqrt(q (1 - q)) / compression under the arcsine scale, narrow in the tails
+    q = np.asarray(qs) / 100
+    error = np.abs(np.searchsorted(np.sort(x), estimates) / x.size - q)
+    return np.all(error < 2 * np.pi * np.sqrt(q * (1 - q)) / compression + 1 / x.size)
+
+
+@pytest.fixture
+def x():
+    return np.random.default_rng(322).lognormal(3, 0.8, 12_345)
+
+
+def test_running_stats_matches_numpy(x):
+    stats = RunningStats()
+    for part in odd_chunks(x):
+        stats.update(part)
+    assert stats.n == x.size
+    assert stats.mean == pytest.approx(np.mean(x), rel=1e-12)
+    assert stats.variance() == pytest.approx(np.var(x), rel=1e-10)
+    assert stats.variance(ddof=1) == pytest.approx(np.var(x, ddof=1), rel=1e-10)
+    assert (stats.min, stats.max) == (x.min(), x.max())
+
+
+def test_running_stats_merge_in_any_grouping(x):
+    parts = []
+    for piece in odd_chunks(x, (5, 2_000, 11)):
+        part = RunningStats()
+        part.update(piece)
+        parts.append(part)
+    left, right = RunningStats(), RunningStats()
+    for part in parts[:3]:
+        left.merge(part)
+    for part in parts[3:]:
+        right.merge(part)
+    left.merge(RunningStats())
+    left.merge(right)
+    assert left.n == x.size
+    assert left.mean == pytest.approx(np.mean(x), rel=1e-12)
+    assert left.variance() == pytest.approx(np.var(x), rel=1e-10)
+
+
+def test_tdigest_quantiles_match_percentile(x):
+    digest = TDigest()
+    for part in odd_chunks(x):
+        digest.update(part)
+    assert digest.n == x.size
+    estimates = digest.quantile(np.asarray(QS) / 100)
+    assert within_centroid(x, estimates, QS)
+    assert np.allclose(estimates, np.percentile(x, QS), rtol=0.01)
+    assert digest.quantile([0.0, 1.0]).tolist() == [x.min(), x.max()]
+
+
+def test_tdigest_merge_matches_single_stream(x):
+    whole = TDigest()
+    whole.update(x)
+    merged = TDigest()
+    for part in odd_chunks(x, (999, 4_001)):
+        piece = TDigest()
+        piece.update(part)
+        merged.merge(piece)
+    assert merged.n == x.size
+    assert within_centroid(x, merged.quantile(np.asarray(QS) / 100), QS)
+    assert np.allclose(merged.quantile(np.asarray(QS) / 100), whole.quantile(np.asarray(QS) / 100), rtol=0.01)
+
+
+def test_fixed_histogram_matches_np_histogram(x):
+    lo, hi = np.percentile(x, [2, 98])
+    hist = FixedHistogram(lo, hi, 40)
+    # The right edge itself belongs to the last bin
+    values = np.append(x, hi)
+    for part in odd_chunks(values):
+        hist.update(part)
+    assert hist.counts.tolist() == np.histogram(values, bins=hist.edges)[0].tolist()
+    assert hist.under == np.sum(values < lo)
+    assert hist.over == np.sum(values > hi)
+    assert hist.n == values.size
+
+
+def exact_samples(spec, n, seed, chunk_size):
+    # Same generator calls as montecarlo.simulate, kept in memory
+    entropy, sizes = montecarlo.plan(n, seed, chunk_size)
+    return np.concatenate([distributions.draw(spec, montecarlo.chunk_rng(entropy, k), size)
+                           for k, size in enumerate(sizes)])
+
+
+@pytest.mark.parametrize('spec', [('normal', 500, 50), ('uniform', 400, 600), ('triangular', 1, 2, 5)])
+def test_simulate_matches_exact_samples(spec):
+    n, chunk_size = 10_001, 777
+    summary = montecarlo.simulate(spec, n, seed=322, chunk_size=chunk_size, workers=1)
+    x = exact_samples(spec, n, 322, chunk_size)
+    assert summary.n == n
+    assert summary.stats.mean == pytest.approx(np.mean(x), rel=1e-12)
+    assert summary.stats.variance() == pytest.approx(np.var(x), rel=1e-10)
+    assert summary.histogram.counts.tolist() == np.histogram(x, bins=summary.histogram.edges)[0].tolist()
+    assert within_centroid(x, summary.percentile(QS), QS)
+
+
+def test_discrete_percentiles_are_exact():
+    spec, n, chunk_size = ('poisson', 10), 10_001, 777
+    summary = montecarlo.simulate(spec, n, seed=322, chunk_size=chunk_size, workers=1)
+    x = exact_samples(spec, n, 322, chunk_size)
+    assert summary.histogram.counts.tolist() == np.histogram(x, bins=summary.histogram.edges)[0].tolist()
+    assert np.array_equal(summary.percentile(QS), np.percentile(x, QS, method='inverted_cdf'))
+
+
+def fingerprint(summary):
+    return (summary.stats.n, summary.stats.mean, summary.stats.m2, summary.units.n, summary.units.mean,
+            summary.units.m2, summary.digest.means.tobytes(), summary.digest.weights.tobytes(),
+            summary.histogram.counts.tobytes())
+
+
+@pytest.mark.parametrize('strategy', ['random', 'antithetic'])
+def test_workers_give_bit_identical_summaries(monkeypatch, strategy):
+    # Lower the threshold so a small run goes through the process pool
+    monkeypatch.setattr(montecarlo, 'PARALLEL_THRESHOLD', 0)
+    spec, n, chunk_size = ('triangular', 1, 2, 5), 50_001, 4_999
+    serial = montecarlo.simulate(spec, n, seed=322, chunk_size=chunk_size, workers=1, strategy=strategy)
+    for workers in (2, 3):
+        parallel = montecarlo.simulate(spec, n, seed=322, chunk_size=chunk_size, workers=workers, strategy=strategy)
+        assert fingerprint(parallel) == fingerprint(serial)